@@ -0,0 +1,262 @@
+"""
+Renderers de columnas de las tablas CRUD
+
+get_td_html resolvía cada celda de cada fila desde cero: get_attr, una cadena
+de isinstance y comparaciones por nombre de campo y, en la columna id, un
+reverse() por fila. Aquí ese trabajo se hace una sola vez por columna:
+
+* cada (modelo, campo) tiene un renderer especializado registrado con
+  `registrar`, o el genérico (booleanos, fechas y texto)
+* la URL de detalle de la columna id se resuelve al compilar con una pk
+  ficticia y en cada fila solo se sustituye la pk
+* las columnas compiladas se guardan en caché por (modelo, campo, url), de modo
+  que cada vista las compila en su primera petición
+
+Los renderers reciben (obj, valor) y devuelven HTML ya escapado. Solo se
+registran para campos cuyo valor no es booleano ni fecha y hora (que el
+renderer genérico muestra como insignia y dd/mm/yyyy).
+
+* registrar: decorador que asocia un renderer a (modelo, campo)
+* compilar_columna / compilar: funciones obj -> HTML de una columna o de varias
+* renderizar_fila: celdas <td> de una fila con las columnas compiladas
+"""
+from datetime import date, datetime
+from functools import lru_cache
+
+from django.conf import settings
+from django.urls import NoReverseMatch, reverse
+from django.utils.html import conditional_escape, format_html
+
+from apps.espacios.models import Espacio
+from apps.reservas.models import Reserva
+from apps.usuarios.models import Usuario
+
+# Pk ficticia con la que se resuelve la URL de detalle al compilar
+MARCADOR = 987654321
+
+CELDA = '<td class="py-4"><div class="text-sm text-base-content">{}</div></td>'
+
+# Longitud máxima del nombre del espacio y de su ubicación en la columna espacio
+MAX_NOMBRE_ESPACIO = 15
+
+_renderers = {}
+
+
+def registrar(modelo, *campos):
+    """
+    Decorador que registra un renderer(obj, valor) para los `campos` de
+    `modelo` (y sus subclases); con modelo None vale para cualquier modelo.
+    """
+    def decorador(renderer):
+        for campo in campos:
+            _renderers[(modelo, campo)] = renderer
+        return renderer
+    return decorador
+
+
+def por_defecto(obj, valor):
+    """Renderer genérico: insignia para booleanos, dd/mm/yyyy para fechas y hora, o el texto."""
+    if isinstance(valor, bool):
+        if valor:
+            return '<span class="badge badge-lg badge-success"><i class="fa-solid fa-check"></i></span>'
+        return '<span class="badge badge-lg badge-error"><i class="fa-solid fa-xmark"></i></span>'
+    if isinstance(valor, datetime):
+        return valor.strftime('%d/%m/%Y')
+    if valor is None:
+        return conditional_escape(obj)
+    return conditional_escape(valor)
+
+
+def _avatar(username, email):
+    return format_html(
+        '<div class="flex items-center gap-3">'
+            '<div class="">'
+                '<div class="h-8 w-8 p-1 flex justify-center items-center bg-secondary text-secondary-content rounded-full">'
+                    '<span class="text-xs">{}</span>'
+                '</div>'
+            '</div>'
+            '<div class="text-start">'
+                '<div class="font-bold">{}</div>'
+                '<div class="text-sm opacity-50">{}</div>'
+            '</div>'
+        '</div>',
+        username[:2].upper(), username, email
+    )
+
+
+def _negrita(texto):
+    return format_html('<div><div class="font-semibold">{}</div></div>', texto)
+
+
+def _recortar(texto):
+    return texto[:MAX_NOMBRE_ESPACIO] + '...' if len(texto) > MAX_NOMBRE_ESPACIO else texto
+
+
+@registrar(None, 'usuario')
+def render_usuario(obj, usuario):
+    if not usuario:
+        return por_defecto(obj, usuario)
+    return _avatar(usuario.username or '', usuario.email or '')
+
+
+@registrar(Reserva, 'espacio')
+def render_espacio_reserva(obj, espacio):
+    if not espacio:
+        return por_defecto(obj, espacio)
+    return format_html(
+        '<div>'
+            '<div class="font-semibold">{}</div>'
+            '<div class="text-sm opacity-50">{} - Piso {}</div>'
+        '</div>',
+        _recortar(espacio.nombre or ''), _recortar(espacio.ubicacion.nombre or ''), espacio.piso
+    )
+
+
+@registrar(Reserva, 'fecha_uso')
+def render_fecha_uso(obj, fecha):
+    if not fecha:
+        return por_defecto(obj, fecha)
+    inicio, fin = obj.hora_inicio, obj.hora_fin
+    return format_html(
+        '<div>'
+            '<div class="font-semibold">{}</div>'
+            '<div class="text-sm opacity-50">{} - {}</div>'
+        '</div>',
+        fecha.strftime('%d/%m/%Y'),
+        inicio.strftime('%I:%M %p') if inicio else '',
+        fin.strftime('%I:%M %p') if fin else '',
+    )
+
+
+@registrar(Reserva, 'aprobado_por')
+def render_aprobado_por(obj, aprobado):
+    return _negrita(aprobado.username if aprobado else '-')
+
+
+# Clase de la insignia de cada estado de reserva
+CLASES_ESTADO = {
+    Reserva.Estado.APROBADA: 'success',
+    Reserva.Estado.PENDIENTE: 'warning',
+    Reserva.Estado.RECHAZADA: 'error',
+}
+
+
+@registrar(Reserva, 'estado')
+def render_estado(obj, estado):
+    if estado == Reserva.Estado.APROBADA and obj.fecha_uso == date.today() \
+            and obj.hora_inicio and obj.hora_fin \
+            and obj.hora_inicio < datetime.now().time() < obj.hora_fin:
+        return '<p class="badge p-1 badge-lg badge-success text-base-100">En uso</p>'
+    return format_html(
+        '<p class="badge p-1 badge-lg badge-{} text-base-100">{}</p>',
+        CLASES_ESTADO.get(estado, ''), str(estado).capitalize()
+    )
+
+
+@registrar(Espacio, 'nombre')
+def render_nombre_espacio(obj, nombre):
+    return format_html(
+        '<div>'
+            '<div class="font-semibold">{}</div>'
+            '<div class="text-sm opacity-50">{}</div>'
+        '</div>',
+        nombre, obj.tipo
+    )
+
+
+@registrar(Espacio, 'ubicacion')
+def render_ubicacion_espacio(obj, ubicacion):
+    return _negrita(ubicacion.nombre if ubicacion else '')
+
+
+@registrar(Usuario, 'username', 'email')
+def render_usuario_propio(obj, valor):
+    return format_html(
+        '<div class="flex items-center gap-3">'
+            '<div class="">'
+                '<div class="h-8 flex items-center justify-center bg-secondary text-secondary-content rounded-full w-8">'
+                    '<span class="text-xs">{}</span>'
+                '</div>'
+            '</div>'
+            '<div class="text-start">'
+                '<div class="font-bold">{}</div>'
+                '<div class="text-sm opacity-50">{}</div>'
+            '</div>'
+        '</div>',
+        obj.username[:2].upper(), obj.username, obj.email
+    )
+
+
+@registrar(Usuario, 'ubicacion')
+def render_ubicacion_usuario(obj, ubicacion):
+    return _negrita(ubicacion.nombre if ubicacion else '-')
+
+
+# Clase de la insignia de cada grupo (anotación group de UsuarioListView)
+CLASES_GRUPO = {
+    settings.GRUPOS.MODERADOR: 'success',
+    settings.GRUPOS.USUARIO: 'warning',
+}
+
+
+@registrar(Usuario, 'group')
+def render_grupo(obj, grupo):
+    return format_html(
+        '<div><div class="badge badge-lg badge-{} text-base-100 min-w-24">{}</div></div>',
+        CLASES_GRUPO.get(grupo, 'error'), str(grupo).capitalize()
+    )
+
+
+def _columna_id(nombre_url):
+    """Columna id: botón que abre el detalle, con la URL resuelta una sola vez."""
+    plantilla = None
+    if nombre_url:
+        try:
+            plantilla = reverse(nombre_url, args=[MARCADOR]).split(str(MARCADOR), 1)
+        except NoReverseMatch:
+            pass
+
+    def renderer(obj, pk):
+        if plantilla is None:
+            return conditional_escape(pk)
+        return format_html(
+            '<button onclick="generic_modal.showModal()"class="cursor-pointer link link-primary" '
+            'hx-get={} hx-target="#generic_modal_content" hx-swap="innerHTML">{}</button>',
+            f'{plantilla[0]}{pk}{plantilla[1]}', pk
+        )
+    return renderer
+
+
+def _buscar_renderer(modelo, campo):
+    for clase in (*modelo.__mro__, None):
+        renderer = _renderers.get((clase, campo))
+        if renderer is not None:
+            return renderer
+    return por_defecto
+
+
+@lru_cache(maxsize=None)
+def compilar_columna(modelo, campo, nombre_url=None):
+    """
+    Función obj -> HTML de la columna `campo` de `modelo`. `nombre_url` es la
+    URL de detalle (crud_urls['view']) que enlaza la columna id.
+    """
+    renderer = _columna_id(nombre_url) if campo == 'id' else _buscar_renderer(modelo, campo)
+
+    def celda(obj):
+        try:
+            valor = getattr(obj, campo)
+        except Exception:
+            return conditional_escape(obj)
+        return renderer(obj, valor)
+    return celda
+
+
+def compilar(modelo, campos, nombre_url=None):
+    """Columnas compiladas de una tabla, en el orden de `campos`."""
+    return [compilar_columna(modelo, campo, nombre_url) for campo in campos]
+
+
+def renderizar_fila(columnas, obj):
+    """Celdas <td> de `obj` con las columnas compiladas (HTML ya escapado)."""
+    return ''.join([CELDA.format(columna(obj)) for columna in columnas])
@@ -0,0 +1,588 @@
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as dtime, timedelta
+
+import django
+from asgiref.sync import sync_to_async
+from auditlog.context import set_actor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections
+from django.template import Context, engines
+from django.test import AsyncClient, Client, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.espacios.views import EspacioListView
+from apps.logs.views import LogListView
+from apps.reservas.bulk import MOTIVO_ESPACIO_NO_DISPONIBLE, rechazar_reservas_espacio
+from apps.reservas.models import Reserva
+from apps.reservas.rollup import recalcular
+from apps.reservas.views import ReservaListView, qs_condiciones
+from apps.usuarios.models import Usuario
+from apps.usuarios.views import UsuarioListView
+from library.utils.benchmark import (
+    base_de_datos_temporal, medir, poblar, poblar_dia, poblar_espacio, poblar_logs,
+)
+
+
+def por_rol(datos, opciones, peticion, roles=None):
+    """
+    Mide `peticion(client)` con un cliente autenticado como cada rol.
+    `roles` limita los roles medidos (por defecto todos).
+    """
+    resultados = {}
+    for rol, usuario in datos.items():
+        if roles is not None and rol not in roles:
+            continue
+        client = Client()
+        client.force_login(usuario)
+        resultados[rol] = medir(lambda: peticion(client), repeticiones=opciones['repeticiones'])
+    return resultados
+
+
+def escenario_dashboard(datos, opciones):
+    """Mide la vista Dashboard (/inicio/) para cada rol."""
+    url = reverse('dashboard')
+    return por_rol(datos, opciones, lambda client: client.get(url))
+
+
+def escenario_calendario(datos, opciones):
+    """Mide el conteo mensual del calendario (api/mes/) para cada rol."""
+    hoy = date.today()
+    params = {
+        'start': hoy.replace(day=1).isoformat(),
+        'end': (hoy.replace(day=1) + timedelta(days=41)).isoformat(),
+    }
+    url = reverse('reservas_monthly_count')
+    return por_rol(datos, opciones, lambda client: client.get(url, params))
+
+
+def escenario_reservas_fecha(datos, opciones):
+    """Mide las tarjetas de reservas de un día (api/fecha/) para cada rol."""
+    url = reverse('reservas_by_date')
+    params = {'fecha_uso': date.today().isoformat()}
+    return por_rol(datos, opciones, lambda client: client.get(url, params))
+
+
+def escenario_reservas_lista(datos, opciones):
+    """
+    Mide la tabla de reservas (ReservaListView) para cada rol: primera página,
+    ordenada por estado y filtrada por nombre de usuario.
+    """
+    url = reverse('reserva')
+    casos = {
+        'pagina': {},
+        'ordenada': {'ordering': '-estado'},
+        'filtrada': {'usuario': datos['usuario'].username[:4]},
+    }
+    resultados = {}
+    for caso, params in casos.items():
+        for rol, r in por_rol(datos, opciones, lambda client: client.get(url, params)).items():
+            resultados[f'{rol}/{caso}'] = r
+    return resultados
+
+
+def escenario_logs(datos, opciones):
+    """Mide la tabla de actividad (LogListView) para cada rol."""
+    url = reverse('log')
+    return por_rol(datos, opciones, lambda client: client.get(url))
+
+
+def escenario_exportar_csv(datos, opciones):
+    """Mide la exportación completa a CSV de la tabla de reservas para cada rol."""
+    url = reverse('reserva')
+
+    def exportar(client):
+        response = client.get(url, {'export': 'csv'})
+        # La respuesta es en streaming: hay que consumirla para medir el trabajo real
+        return b''.join(response.streaming_content)
+
+    return por_rol(datos, opciones, exportar)
+
+
+def escenario_aprobar(datos, opciones):
+    """
+    Mide el flujo de aprobación (abrir el modal y enviar el formulario) para los
+    roles que pueden gestionar reservas. Cada ejecución aprueba una reserva pendiente distinta.
+    """
+    resultados = {}
+    for rol in ('admin', 'moderador'):
+        usuario = datos[rol]
+        pendientes = iter(list(
+            Reserva.objects
+            .filter(qs_condiciones(usuario), estado=Reserva.Estado.PENDIENTE,
+                    fecha_uso__gte=timezone.now().date())
+            .values_list('pk', flat=True)
+        ))
+        client = Client()
+        client.force_login(usuario)
+
+        def aprobar(client=client, pendientes=pendientes):
+            url = reverse('reserva_approve', args=[next(pendientes)])
+            client.get(url)
+            client.post(url, {'estado': Reserva.Estado.APROBADA, 'motivo_admin': 'Benchmark'})
+
+        resultados[rol] = medir(aprobar, repeticiones=opciones['repeticiones'])
+    return resultados
+
+
+def escenario_espacios_libres(datos, opciones):
+    """
+    Mide la búsqueda de espacios libres (api/espacios-libres/) con `--espacios`
+    espacios adicionales y un día completo de reservas aprobadas en ellos.
+    """
+    fecha = date.today() + timedelta(days=1)
+    poblar_dia(opciones['espacios'], fecha)
+    params = {'fecha_uso': fecha.isoformat(), 'hora_inicio': '10:00', 'hora_fin': '11:30'}
+    client = Client()
+    client.force_login(datos['usuario'])
+    url = reverse('espacios_libres')
+    return {
+        'sin_filtros': medir(lambda: client.get(url, params), repeticiones=opciones['repeticiones']),
+        'filtrado': medir(lambda: client.get(url, {**params, 'capacidad': 100, 'tipo': 'salon'}),
+                          repeticiones=opciones['repeticiones']),
+    }
+
+
+def rechazar_una_a_una(espacio, actor):
+    """Camino anterior de EspacioUpdateForm.save: un save() (y un log) por reserva."""
+    reservas = Reserva.objects.filter(
+        fecha_uso__gte=timezone.now().date(),
+        espacio=espacio.id,
+        estado__in=[Reserva.Estado.PENDIENTE, Reserva.Estado.APROBADA]
+    )
+    for reserva in reservas:
+        reserva.estado = Reserva.Estado.RECHAZADA
+        reserva.aprobado_por = actor
+        reserva.motivo_admin = MOTIVO_ESPACIO_NO_DISPONIBLE
+        reserva.save()
+
+
+def escenario_cascada_espacio(datos, opciones):
+    """
+    Compara el rechazo una a una con el rechazo masivo al deshabilitar un espacio
+    con `--afectadas` reservas futuras. Cada caso se ejecuta una vez sobre su propio espacio.
+    """
+    admin = datos['admin']
+    resultados = {}
+    for caso, rechazar in [('una_a_una', rechazar_una_a_una), ('masivo', rechazar_reservas_espacio)]:
+        espacio = poblar_espacio(opciones['afectadas'], nombre=f'Cascada {caso}')
+        with set_actor(admin):
+            resultados[caso] = medir(lambda: rechazar(espacio, admin), repeticiones=1,
+                                     calentamiento=0, memoria=False)
+    return resultados
+
+
+def peticiones_calendario(total):
+    """
+    Peticiones (url, params) que hace el calendario al navegar: conteos de un
+    mes y tarjetas de un día, repartidas por los próximos meses.
+    """
+    hoy = date.today()
+    peticiones = []
+    for i in range(total):
+        dia = hoy + timedelta(days=i % 90)
+        if i % 2:
+            peticiones.append((reverse('reservas_by_date'), {'fecha_uso': dia.isoformat()}))
+        else:
+            inicio = dia.replace(day=1)
+            peticiones.append((reverse('reservas_monthly_count'), {
+                'start': inicio.isoformat(), 'end': (inicio + timedelta(days=41)).isoformat(),
+            }))
+    return peticiones
+
+
+def resumen_carga(tiempos, segundos, errores):
+    percentiles = statistics.quantiles(tiempos, n=100) if len(tiempos) > 1 else tiempos * 99
+    return {
+        'peticiones': len(tiempos),
+        'errores': errores,
+        'segundos': round(segundos, 2),
+        'peticiones_por_s': round(len(tiempos) / segundos, 1),
+        'p50_ms': round(percentiles[49], 2),
+        'p95_ms': round(percentiles[94], 2),
+    }
+
+
+def carga_wsgi(clientes, peticiones):
+    """Cada cliente en su hilo, como un servidor WSGI con un hilo por petición en curso."""
+    def trabajador(client, propias):
+        tiempos, errores = [], 0
+        try:
+            for url, params in propias:
+                inicio = time.perf_counter()
+                errores += client.get(url, params).status_code != 200
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            connections.close_all()
+        return tiempos, errores
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(len(clientes)) as executor:
+        partes = list(executor.map(trabajador, clientes, [peticiones[i::len(clientes)] for i in range(len(clientes))]))
+    return resumen_carga([t for tiempos, _ in partes for t in tiempos],
+                         time.perf_counter() - inicio, sum(errores for _, errores in partes))
+
+
+def carga_asgi(clientes, peticiones):
+    """Cada cliente en su corrutina, todas en un mismo bucle de eventos (servidor ASGI)."""
+    async def trabajador(client, propias):
+        tiempos, errores = [], 0
+        for url, params in propias:
+            inicio = time.perf_counter()
+            errores += (await client.get(url, params)).status_code != 200
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return tiempos, errores
+
+    async def lanzar():
+        try:
+            return await asyncio.gather(*(
+                trabajador(client, peticiones[i::len(clientes)]) for i, client in enumerate(clientes)
+            ))
+        finally:
+            # Las conexiones abiertas en el hilo de sync_to_async sobreviven a la carga
+            # (CONN_MAX_AGE): se cierran para no dejar un lector retenido sobre el archivo
+            await sync_to_async(connections.close_all)()
+
+    inicio = time.perf_counter()
+    partes = asyncio.run(lanzar())
+    return resumen_carga([t for tiempos, _ in partes for t in tiempos],
+                         time.perf_counter() - inicio, sum(errores for _, errores in partes))
+
+
+def escenario_calendario_concurrente(datos, opciones):
+    """
+    Prueba de carga del calendario: `--concurrencia` clientes simultáneos (de
+    todos los roles) hacen en total repeticiones × concurrencia peticiones de
+    conteos y tarjetas, por el camino WSGI (hilos) y por el ASGI (corrutinas).
+    Cada camino empieza con la caché vacía.
+    """
+    concurrencia = opciones['concurrencia']
+    usuarios = list(datos.values())
+    peticiones = peticiones_calendario(opciones['repeticiones'] * concurrencia)
+    resultados = {}
+    for camino, cliente, cargar in [('wsgi', Client, carga_wsgi), ('asgi', AsyncClient, carga_asgi)]:
+        clientes = []
+        for i in range(concurrencia):
+            client = cliente()
+            client.force_login(usuarios[i % len(usuarios)])
+            clientes.append(client)
+        cache.clear()
+        resultados[camino] = cargar(clientes, peticiones)
+    return resultados
+
+
+# Configuración de SQLite sin el perfil de settings: la de Django por defecto.
+# journal_mode=DELETE deshace el WAL que el perfil deja guardado en el archivo.
+SQLITE_SIN_PERFIL = {'CONN_MAX_AGE': 0, 'OPTIONS': {'init_command': 'PRAGMA journal_mode=DELETE'}}
+
+
+def carga_escritura(clientes, operaciones):
+    """
+    Cada cliente en su hilo envía sus formularios (url, datos). Cuenta aparte
+    los OperationalError "database is locked", que el cliente de pruebas propaga.
+    """
+    def trabajador(client, propias):
+        tiempos, errores, bloqueos = [], 0, 0
+        try:
+            for url, datos in propias:
+                inicio = time.perf_counter()
+                try:
+                    errores += client.post(url, datos).status_code != 204
+                except OperationalError as e:
+                    if 'locked' not in str(e):
+                        raise
+                    bloqueos += 1
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            connections.close_all()
+        return tiempos, errores, bloqueos
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(len(clientes)) as executor:
+        partes = list(executor.map(trabajador, clientes, operaciones))
+    resumen = resumen_carga([t for tiempos, _, _ in partes for t in tiempos],
+                            time.perf_counter() - inicio, sum(errores for _, errores, _ in partes))
+    resumen['bloqueos'] = sum(bloqueos for _, _, bloqueos in partes)
+    return resumen
+
+
+def escenario_escrituras_concurrentes(datos, opciones):
+    """
+    Prueba de carga de escritura sobre una base SQLite en archivo:
+    `--concurrencia` hilos, cada uno con su cliente de administrador y su
+    espacio, crean `--repeticiones` reservas y aprueban otras tantas
+    pendientes, por las vistas y con auditoría. Se mide sin el perfil de
+    SQLite de settings (la configuración por defecto de Django) y con él;
+    para medirlo como bajo WSGI, con conexiones persistentes, se ejecuta con
+    DJANGO_CONN_MAX_AGE=600.
+    """
+    concurrencia, repeticiones = opciones['concurrencia'], opciones['repeticiones']
+    admin = datos['admin']
+    usuarios = list(Usuario.objects.filter(groups__name=settings.GRUPOS.USUARIO)[:12])
+    manana = timezone.now().date() + timedelta(days=1)
+
+    def franja(j, desde):
+        """Reserva j del espacio: 12 por día, cada una de un usuario y sin solaparse."""
+        return {
+            'usuario': usuarios[j % len(usuarios)], 'fecha_uso': desde + timedelta(days=j // 12),
+            'hora_inicio': dtime(8 + j % 12), 'hora_fin': dtime(9 + j % 12),
+        }
+
+    db = connections.settings[DEFAULT_DB_ALIAS]
+    original = {clave: db[clave] for clave in SQLITE_SIN_PERFIL}
+    resultados = {}
+    try:
+        for caso, configuracion in [('sin_perfil', SQLITE_SIN_PERFIL), ('perfil', original)]:
+            connections.close_all()
+            db.update(configuracion)
+            clientes, operaciones = [], []
+            for i in range(concurrencia):
+                client = Client()
+                client.force_login(admin)
+                clientes.append(client)
+                espacio = poblar_espacio(0, nombre=f'Concurrencia {caso} {i}')
+                # Las pendientes a aprobar, en días posteriores a las que se crean
+                desde = manana + timedelta(days=repeticiones // 12 + 1)
+                pendientes = Reserva.objects.bulk_create([
+                    Reserva(espacio=espacio, ubicacion_id=espacio.ubicacion_id, piso=espacio.piso,
+                            motivo='Benchmark', **franja(j, desde))
+                    for j in range(repeticiones)
+                ])
+                recalcular(espacio_id=espacio.pk)
+                propias = []
+                for j, pendiente in enumerate(pendientes):
+                    nueva = franja(j, manana)
+                    propias.append((reverse('reserva_create'), {
+                        'usuario': nueva['usuario'].pk, 'espacio': espacio.pk,
+                        'fecha_uso': nueva['fecha_uso'].isoformat(),
+                        'hora_inicio': nueva['hora_inicio'].strftime('%H:%M'),
+                        'hora_fin': nueva['hora_fin'].strftime('%H:%M'),
+                        'motivo': 'Benchmark',
+                    }))
+                    propias.append((reverse('reserva_approve', args=[pendiente.pk]), {
+                        'estado': Reserva.Estado.APROBADA, 'motivo_admin': 'Benchmark',
+                    }))
+                operaciones.append(propias)
+            resultados[caso] = carga_escritura(clientes, operaciones)
+    finally:
+        connections.close_all()
+        db.update(original)
+    return resultados
+
+
+# Tabla CRUD con el render anterior (get_td_html por celda) y con render_row
+PLANTILLAS_TABLA = {
+    'por_celda': (
+        '{% load utils %}{% for obj in object_list %}<tr>{% for col in cols %}'
+        '<td class="py-4"><div class="text-sm text-base-content">{% get_td_html obj col %}</div></td>'
+        '{% endfor %}</tr>{% endfor %}'
+    ),
+    'por_fila': '{% load utils %}{% for obj in object_list %}<tr>{% render_row obj %}</tr>{% endfor %}',
+}
+
+
+def escenario_tabla_filas(datos, opciones):
+    """
+    Microbenchmark del render de las celdas de las tablas CRUD: `--filas` filas
+    ya cargadas de cada tabla (como administrador), con get_td_html por celda y
+    con render_row. Añade filas_por_s a cada resultado.
+    """
+    factory = RequestFactory()
+    resultados = {}
+    for nombre, vista in [('reservas', ReservaListView), ('usuarios', UsuarioListView),
+                          ('espacios', EspacioListView), ('logs', LogListView)]:
+        view = vista()
+        view.setup(factory.get('/'))
+        view.request.user = datos['admin']
+        view.object_list = list(view.get_queryset()[:opciones['filas']])
+        contexto = Context(view.get_context_data(object_list=view.object_list))
+        for caso, fuente in PLANTILLAS_TABLA.items():
+            plantilla = engines['django'].from_string(fuente).template
+            r = medir(lambda: plantilla.render(contexto), repeticiones=opciones['repeticiones'], memoria=False)
+            r['filas_por_s'] = round(len(view.object_list) / r['media_ms'] * 1000)
+            resultados[f'{nombre}/{caso}'] = r
+    return resultados
+
+
+ESCENARIOS = {
+    'dashboard': escenario_dashboard,
+    'calendario': escenario_calendario,
+    'reservas_fecha': escenario_reservas_fecha,
+    'reservas_lista': escenario_reservas_lista,
+    'logs': escenario_logs,
+    'exportar_csv': escenario_exportar_csv,
+    'aprobar': escenario_aprobar,
+    'espacios_libres': escenario_espacios_libres,
+    'cascada_espacio': escenario_cascada_espacio,
+    'tabla_filas': escenario_tabla_filas,
+    'calendario_concurrente': escenario_calendario_concurrente,
+    'escrituras_concurrentes': escenario_escrituras_concurrentes,
+}
+
+# Escenarios de "todos": las vistas de lista, detalle y API. Los que modifican
+# o amplían los datos de forma masiva (espacios_libres, cascada_espacio), el
+# microbenchmark de render (tabla_filas) y las pruebas de carga
+# (calendario_concurrente, escrituras_concurrentes) se piden aparte.
+SUITE = [
+    'reservas_lista', 'calendario', 'reservas_fecha', 'dashboard',
+    'logs', 'exportar_csv', 'aprobar',
+]
+
+# Escenarios que necesitan la base de datos de pruebas en un archivo (con
+# SQLite en memoria no hay bloqueos de archivo ni WAL que medir)
+EN_ARCHIVO = {'escrituras_concurrentes'}
+
+
+def cantidad(valor):
+    """Entero con sufijo opcional k/m (10k, 100k, 1m)."""
+    valor = valor.strip().lower()
+    multiplicador = {'k': 1_000, 'm': 1_000_000}.get(valor[-1:], 1)
+    if multiplicador != 1:
+        valor = valor[:-1]
+    try:
+        return int(float(valor) * multiplicador)
+    except ValueError:
+        raise CommandError(f'Cantidad inválida: {valor!r} (usa p. ej. 10000, 100k o 1m).')
+
+
+def version_codigo():
+    """Commit actual (si es un repositorio git), para comparar resultados entre commits."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide consultas SQL, latencia y memoria pico de las vistas sobre una base de datos '
+        'temporal poblada con datos sintéticos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'escenarios',
+            nargs='+',
+            choices=sorted(ESCENARIOS) + ['todos'],
+            help=f'Escenarios a medir; "todos" equivale a: {", ".join(SUITE)}.'
+        )
+        parser.add_argument(
+            '--reservas',
+            type=cantidad,
+            default=100_000,
+            help='Número de reservas a generar; admite 10k, 100k, 1m (por defecto 100k).'
+        )
+        parser.add_argument(
+            '--logs',
+            type=cantidad,
+            default=20_000,
+            help='Número de logs de auditoría a generar (por defecto 20k).'
+        )
+        parser.add_argument(
+            '--afectadas',
+            type=int,
+            default=10_000,
+            help='Reservas del espacio que se deshabilita en cascada_espacio (por defecto 10000).'
+        )
+        parser.add_argument(
+            '--espacios',
+            type=int,
+            default=3000,
+            help='Espacios adicionales con un día completo de reservas en espacios_libres (por defecto 3000).'
+        )
+        parser.add_argument(
+            '--filas',
+            type=int,
+            default=100,
+            help='Filas de cada tabla que se renderizan en tabla_filas (por defecto 100).'
+        )
+        parser.add_argument(
+            '--concurrencia',
+            type=int,
+            default=8,
+            help='Clientes simultáneos en calendario_concurrente y escrituras_concurrentes (por defecto 8).'
+        )
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=20,
+            help='Número de ejecuciones medidas por caso (por defecto 20).'
+        )
+        parser.add_argument(
+            '--json',
+            metavar='RUTA',
+            help='Escribe los resultados en JSON en RUTA ("-" para la salida estándar).'
+        )
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1:
+            raise CommandError('--repeticiones debe ser mayor que 0.')
+
+        escenarios = []
+        for nombre in options['escenarios']:
+            for escenario in (SUITE if nombre == 'todos' else [nombre]):
+                if escenario not in escenarios:
+                    escenarios.append(escenario)
+
+        resultados = {}
+        archivo = bool(EN_ARCHIVO.intersection(escenarios))
+        with base_de_datos_temporal(archivo), override_settings(ALLOWED_HOSTS=['testserver']):
+            self.stderr.write(f"Generando {options['reservas']} reservas y {options['logs']} logs...")
+            datos = poblar(options['reservas'])
+            poblar_logs(options['logs'])
+            motor = connection.vendor
+
+            for escenario in escenarios:
+                self.stderr.write(f'Midiendo {escenario}...')
+                resultados[escenario] = ESCENARIOS[escenario](datos, options)
+
+        if options['json']:
+            informe = {
+                'commit': version_codigo(),
+                'fecha': timezone.now().isoformat(),
+                'reservas': options['reservas'],
+                'logs': options['logs'],
+                'repeticiones': options['repeticiones'],
+                'entorno': {
+                    'python': platform.python_version(),
+                    'django': django.get_version(),
+                    'base_de_datos': motor,
+                },
+                'resultados': resultados,
+            }
+            contenido = json.dumps(informe, indent=2, ensure_ascii=False)
+            if options['json'] == '-':
+                self.stdout.write(contenido)
+            else:
+                with open(options['json'], 'w', encoding='utf-8') as archivo:
+                    archivo.write(contenido + '\n')
+                self.stderr.write(self.style.SUCCESS(f"Resultados escritos en {options['json']}"))
+            return
+
+        for escenario, casos in resultados.items():
+            self.stdout.write(self.style.SUCCESS(f'Escenario: {escenario}'))
+            for caso, r in casos.items():
+                if 'peticiones_por_s' in r:
+                    self.stdout.write(
+                        f"  {caso:<20} peticiones={r['peticiones']} errores={r['errores']} "
+                        f"{r['peticiones_por_s']}/s p50={r['p50_ms']}ms p95={r['p95_ms']}ms"
+                        + (f" bloqueos={r['bloqueos']}" if 'bloqueos' in r else '')
+                    )
+                    continue
+                self.stdout.write(
+                    f"  {caso:<20} consultas={r['consultas']:<4} "
+                    f"p50={r['p50_ms']}ms p95={r['p95_ms']}ms media={r['media_ms']}ms"
+                    + (f" memoria={r['memoria_pico_kb']}KiB" if r['memoria_pico_kb'] is not None else '')
+                    + (f" filas/s={r['filas_por_s']}" if 'filas_por_s' in r else '')
+                )
@@ -1,10 +1,31 @@
 import random
 from django.core.management.base import BaseCommand
+from apps.core.search import reconstruir as reconstruir_busqueda
+from apps.core.seed import LOTE, insertar
 from apps.espacios.models import Espacio
 from apps.usuarios.models import Ubicacion, Usuario
 
 class Command(BaseCommand):
-    help = 'Crea 1000 espacios de prueba para poblar la base de datos.'
+    help = 'Crea espacios de prueba (10 por ubicación por defecto) para poblar la base de datos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--por-ubicacion',
+            type=int,
+            default=10,
+            help='Espacios a crear en cada ubicación (por defecto 10).'
+        )
+        parser.add_argument(
+            '--auditoria',
+            action='store_true',
+            help='Genera también los logs de auditoría de los espacios creados (por defecto no se auditan).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=LOTE,
+            help=f'Espacios por lote de inserción (por defecto {LOTE}).'
+        )
 
     def handle(self, *args, **kwargs):
         tipos = [choice[0] for choice in Espacio.Tipo.choices]
@@ -20,7 +41,7 @@ class Command(BaseCommand):
 
         espacios = []
         for ubic in ubicaciones:
-            for i in range(10):
+            for i in range(kwargs['por_ubicacion']):
                 nombre_random = f"Espacio en {ubic.nombre}-{i+1}"
                 espacio = Espacio(
                     nombre     = nombre_random,
@@ -32,7 +53,13 @@ class Command(BaseCommand):
                 )
                 espacios.append(espacio)
 
-        Espacio.objects.bulk_create(espacios)
+        espacios = insertar(
+            Espacio, espacios,
+            auditar=kwargs['auditoria'],
+            batch_size=kwargs['batch_size'],
+        )
+        # bulk_create no dispara señales: se reconstruye el índice de búsqueda
+        reconstruir_busqueda()
         self.stdout.write(self.style.SUCCESS(
             f'Se crearon {len(espacios)} espacios correctamente.'
         ))
@@ -4,6 +4,7 @@ from django.core.management.base import BaseCommand
 from django.db import IntegrityError
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from apps.core.seed import LOTE, PlanReservas, insertar_reservas
 from apps.reservas.models import Reserva
 from apps.espacios.models import Espacio
 from apps.usuarios.models import Usuario
@@ -24,15 +25,32 @@ class Command(BaseCommand):
             action='store_true',
             help='Muestra información detallada sobre errores y creación de reservas.'
         )
+        parser.add_argument(
+            '--masivo',
+            action='store_true',
+            help='Valida las reservas contra un plan en memoria y las inserta con bulk_create (para conjuntos grandes).'
+        )
+        parser.add_argument(
+            '--sin-auditoria',
+            action='store_true',
+            help='Con --masivo, no genera los logs de auditoría de las reservas creadas.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=LOTE,
+            help=f'Con --masivo, reservas por lote de inserción (por defecto {LOTE}).'
+        )
 
     def handle(self, *args, **kwargs):
         reservas_por_ubicacion = kwargs['total']
         verbose = kwargs.get('verbose', False)
+        masivo = kwargs.get('masivo', False)
         
         usuarios = list(Usuario.objects.filter(is_superuser=False))
         
         # Obtener ubicaciones únicas de espacios disponibles
-        ubicaciones = Espacio.objects.filter(disponible=True).values_list('ubicacion', flat=True).distinct()
+        ubicaciones = Espacio.objects.filter(disponible=True).order_by().values_list('ubicacion', flat=True).distinct()
         
         if not usuarios:
             self.stdout.write(self.style.ERROR('No hay usuarios en la base de datos. Crea usuarios primero (ej. con crear_usuarios_demo).'))
@@ -55,6 +73,15 @@ class Command(BaseCommand):
         self.stdout.write(f'Intentando crear {reservas_por_ubicacion} reservas pendientes en cada una de las {len(ubicaciones)} ubicaciones...')
         self.stdout.write(f'Total objetivo: {total_reservas_objetivo} reservas')
 
+        hoy = timezone.now().date()
+        if masivo:
+            # Sustituye a full_clean(): las validaciones se hacen contra el plan en memoria
+            plan = PlanReservas(
+                hoy + timedelta(days=1), hoy + timedelta(days=30),
+                Espacio.objects.filter(disponible=True).values_list('pk', flat=True),
+            )
+            pendientes_insertar = []
+
         # Iterar por cada ubicación
         for ubicacion in ubicaciones:
             espacios_ubicacion = list(Espacio.objects.filter(disponible=True, ubicacion=ubicacion))
@@ -72,7 +99,7 @@ class Command(BaseCommand):
                 
                 # Fechas aleatorias en el próximo mes
                 dias_futuro = random.randint(1, 30)
-                fecha_uso = timezone.now().date() + timedelta(days=dias_futuro)
+                fecha_uso = hoy + timedelta(days=dias_futuro)
 
                 # Horas aleatorias entre las 8am y 8pm, con más variación
                 start_hour = random.randint(8, 19)
@@ -99,6 +126,27 @@ class Command(BaseCommand):
                 ]
                 motivo = random.choice(motivos)
 
+                if masivo:
+                    intentos += 1
+                    intentos_ubicacion += 1
+                    error = plan.reservar(usuario.pk, espacio.pk, fecha_uso, hora_inicio, hora_fin)
+                    if error:
+                        errores_contados[error] += 1
+                        continue
+                    pendientes_insertar.append(Reserva(
+                        usuario=usuario,
+                        espacio=espacio,
+                        fecha_uso=fecha_uso,
+                        hora_inicio=hora_inicio,
+                        hora_fin=hora_fin,
+                        estado=Reserva.Estado.PENDIENTE,
+                        motivo=motivo,
+                        aprobado_por=None,
+                        motivo_admin=""
+                    ))
+                    reservas_ubicacion += 1
+                    continue
+
                 try:
                     # Crear instancia sin guardar para validar - SOLO PENDIENTES
                     reserva = Reserva(
@@ -159,6 +207,13 @@ class Command(BaseCommand):
             if verbose:
                 self.stdout.write(f'Reservas creadas en {ubicacion}: {reservas_ubicacion}/{reservas_por_ubicacion}')
 
+        if masivo:
+            reservas_creadas = len(insertar_reservas(
+                pendientes_insertar,
+                auditar=not kwargs['sin_auditoria'],
+                batch_size=kwargs['batch_size'],
+            ))
+
         # Mostrar resultados
         if reservas_creadas > 0:
             self.stdout.write(
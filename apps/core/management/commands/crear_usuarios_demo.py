@@ -1,7 +1,9 @@
 import random
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import Group
+from apps.core.seed import LOTE, insertar_usuarios
 from apps.usuarios.models import Ubicacion  # Asegúrate de importar correctamente tu modelo
 
 User = get_user_model()
@@ -9,8 +11,33 @@ User = get_user_model()
 class Command(BaseCommand):
     help = 'Crea 2 usuarios de cada grupo para cada ubicación existente'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--por-grupo',
+            type=int,
+            default=2,
+            help='Usuarios de cada grupo a crear en cada ubicación (por defecto 2).'
+        )
+        parser.add_argument(
+            '--masivo',
+            action='store_true',
+            help='Cifra la contraseña una sola vez e inserta los usuarios con bulk_create (para conjuntos grandes).'
+        )
+        parser.add_argument(
+            '--sin-auditoria',
+            action='store_true',
+            help='Con --masivo, no genera los logs de auditoría de los usuarios creados.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=LOTE,
+            help=f'Con --masivo, usuarios por lote de inserción (por defecto {LOTE}).'
+        )
+
     def handle(self, *args, **kwargs):
         password = '1234jose'
+        por_grupo = kwargs['por_grupo']
 
         # Definir o crear ubicaciones
         nombres_ubicaciones = ['edf1', 'edf2', 'edf3', 'edf4']
@@ -27,10 +54,14 @@ class Command(BaseCommand):
             return
         self.stdout.write(self.style.SUCCESS(f'Grupos encontrados: {[g.name for g in grupos]}'))
 
-        # Para cada ubicación, crear 2 usuarios por cada grupo
+        if kwargs['masivo']:
+            self.crear_masivo(ubicaciones, grupos, password, por_grupo, kwargs)
+            return
+
+        # Para cada ubicación, crear `por_grupo` usuarios por cada grupo
         for ubicacion in ubicaciones:
             for grupo in grupos:
-                for i in range(1, 3):  # Crear dos usuarios
+                for i in range(1, por_grupo + 1):
                     base_username = f"{grupo.name.lower()}{i}_{ubicacion.nombre.lower()}"
                     username = base_username
                     suffix = 1
@@ -60,3 +91,40 @@ class Command(BaseCommand):
                     self.stdout.write(self.style.SUCCESS(
                         f'Usuario {username} creado en grupo {grupo.name} con ubicación {ubicacion.nombre}'
                     ))
+
+    def crear_masivo(self, ubicaciones, grupos, password, por_grupo, kwargs):
+        # El cifrado de la contraseña es lo más costoso de create_user: se hace una vez para todos
+        password = make_password(password)
+        # Los nombres se comprueban en memoria en vez de con una consulta por usuario
+        existentes = set(User.objects.values_list('username', flat=True))
+
+        usuarios, grupos_usuarios = [], []
+        for ubicacion in ubicaciones:
+            for grupo in grupos:
+                es_admin = grupo.name.lower() == 'admin'
+                for i in range(1, por_grupo + 1):
+                    base_username = f"{grupo.name.lower()}{i}_{ubicacion.nombre.lower()}"
+                    username = base_username
+                    suffix = 1
+                    while username in existentes:
+                        suffix += 1
+                        username = f"{base_username}{suffix}"
+                    existentes.add(username)
+
+                    usuarios.append(User(
+                        username=username,
+                        email=f"{username}@example.com",
+                        password=password,
+                        ubicacion=ubicacion,
+                        piso=1,
+                        is_staff=es_admin,
+                        is_superuser=es_admin,
+                    ))
+                    grupos_usuarios.append(grupo)
+
+        creados = insertar_usuarios(
+            usuarios, grupos_usuarios,
+            auditar=not kwargs['sin_auditoria'],
+            batch_size=kwargs['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Se crearon {len(creados)} usuarios.'))
@@ -0,0 +1,97 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+
+from apps.core.ordering import faltantes, indice_para, indices_requeridos
+
+PLANTILLA_MIGRACION = '''# Generada por "python manage.py indices_ordenamiento --migracion {app}"
+# Índices Lower() para el ordenamiento de las tablas (ver apps.core.ordering).
+# Solo tocan la base de datos: no forman parte del estado de los modelos.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+{dependencias}
+    ]
+
+    operations = [
+{operaciones}
+    ]
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Lista los índices Lower() que necesita el ordenamiento de las tablas (SmartOrderingMixin) '
+        'y, con --migracion, genera una migración que crea los que faltan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--migracion',
+            metavar='APP',
+            help='Etiqueta de la app en la que escribir la migración (p. ej. logs).'
+        )
+
+    def handle(self, *args, **options):
+        pendientes = faltantes(connection)
+        for requisito in indices_requeridos():
+            estado = self.style.ERROR('FALTA') if requisito in pendientes else self.style.SUCCESS('OK')
+            self.stdout.write(
+                f'{estado:<5} {requisito.model._meta.label}: Lower({requisito.campo}) '
+                f'({requisito.vista.__name__}, columna "{requisito.columna}")'
+            )
+
+        if not pendientes:
+            return
+
+        if not options['migracion']:
+            self.stdout.write('\nPara los modelos propios, añade a Meta.indexes:')
+            for requisito in pendientes:
+                indice = indice_para(requisito)
+                self.stdout.write(
+                    f"  {requisito.model._meta.label}: models.Index(Lower('{requisito.campo}'), name='{indice.name}')"
+                )
+            self.stdout.write('Para modelos de terceros usa --migracion <app>.')
+            return
+
+        self.escribir_migracion(options['migracion'], pendientes)
+
+    def escribir_migracion(self, app_label, pendientes):
+        try:
+            app_config = apps.get_app_config(app_label)
+        except LookupError as e:
+            raise CommandError(str(e))
+
+        loader = MigrationLoader(connection, ignore_no_migrations=True)
+        hojas = loader.graph.leaf_nodes(app_label)
+        dependencias = set(hojas)
+        operaciones = []
+        with connection.schema_editor(collect_sql=True) as schema_editor:
+            for requisito in pendientes:
+                indice = indice_para(requisito)
+                crear = str(indice.create_sql(requisito.model, schema_editor))
+                eliminar = str(indice.remove_sql(requisito.model, schema_editor))
+                operaciones.append(
+                    f'        migrations.RunSQL(\n'
+                    f'            {crear!r},\n'
+                    f'            reverse_sql={eliminar!r},\n'
+                    f'        ),'
+                )
+                # La tabla del modelo debe existir antes de crear el índice
+                dependencias.update(loader.graph.leaf_nodes(requisito.model._meta.app_label))
+
+        numero = max((int(nombre.split('_')[0]) for _, nombre in hojas), default=0) + 1
+        nombre = f'{numero:04d}_indices_ordenamiento'
+        ruta = f'{app_config.path}/migrations/{nombre}.py'
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(PLANTILLA_MIGRACION.format(
+                app=app_label,
+                dependencias='\n'.join(f'        {dep!r},' for dep in sorted(dependencias)),
+                operaciones='\n'.join(operaciones),
+            ))
+        self.stdout.write(self.style.SUCCESS(f'\nMigración creada: {ruta}'))
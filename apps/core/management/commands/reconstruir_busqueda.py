@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.search import reconstruir
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda (usuarios, ubicaciones y espacios) a partir de las tablas.'
+
+    def handle(self, *args, **options):
+        reconstruir()
+        self.stdout.write(self.style.SUCCESS('Índice de búsqueda reconstruido.'))
@@ -0,0 +1,31 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.reservas.rollup import recalcular
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen diario de reservas (ReservaDailyRollup) a partir de las reservas existentes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde',
+            type=date.fromisoformat,
+            help='Fecha inicial (YYYY-MM-DD) a reconstruir; por defecto todas.'
+        )
+        parser.add_argument(
+            '--hasta',
+            type=date.fromisoformat,
+            help='Fecha final (YYYY-MM-DD) a reconstruir; por defecto todas.'
+        )
+
+    def handle(self, *args, **options):
+        filtros = {}
+        if options['desde']:
+            filtros['fecha_uso__gte'] = options['desde']
+        if options['hasta']:
+            filtros['fecha_uso__lte'] = options['hasta']
+
+        filas = recalcular(**filtros)
+        self.stdout.write(self.style.SUCCESS(f'Resumen reconstruido: {filas} filas.'))
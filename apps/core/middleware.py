@@ -0,0 +1,42 @@
+"""
+Middlewares del proyecto
+
+* AuditlogMiddleware: el de django-auditlog, también asíncrono
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from auditlog.cid import set_cid
+from auditlog.context import set_extra_data
+from auditlog.middleware import AuditlogMiddleware as AuditlogMiddlewareBase
+
+
+class AuditlogMiddleware(AuditlogMiddlewareBase):
+    """
+    AuditlogMiddleware de django-auditlog con un camino asíncrono.
+
+    El original solo es síncrono: bajo ASGI, Django tendría que pasar cada
+    petición de la cadena de middlewares a un hilo (y de vuelta al bucle de
+    eventos para las vistas asíncronas). En el camino asíncrono el actor se
+    obtiene con request.auser(), que no bloquea el bucle de eventos. El
+    contexto de auditlog (cid y actor) vive en ContextVar, por lo que sigue
+    la petición a través de los await.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        set_cid(request)
+        if hasattr(request, 'auser'):
+            # Usuario ya cargado: get_extra_data no consulta desde el bucle de eventos
+            request.user = await request.auser()
+        with set_extra_data(context_data=self.get_extra_data(request)):
+            return await self.get_response(request)
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from apps.core.search import backend
+
+
+def instalar(apps, schema_editor):
+    backend(schema_editor.connection).instalar(schema_editor, apps)
+
+
+def desinstalar(apps, schema_editor):
+    backend(schema_editor.connection).desinstalar(schema_editor, apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0002_usuario_username_lower_idx'),
+        ('espacios', '0002_espacio_nombre_lower_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(instalar, desinstalar),
+    ]
@@ -0,0 +1,147 @@
+"""
+Índices para el ordenamiento de las tablas
+
+SmartOrderingMixin ordena las columnas de texto por Lower(campo), también a
+través de relaciones (p. ej. Lower('usuario__username')). Sin un índice sobre
+esa misma expresión cada página ordenada obliga a ordenar la tabla completa.
+
+Este módulo deduce, a partir de las vistas enrutadas que usan el mixin, qué
+índices Lower() hacen falta y comprueba si existen:
+
+* en Meta.indexes del modelo (modelos propios), o
+* en la base de datos con el nombre esperado (índices creados por migraciones
+  sin estado, necesarios para modelos de terceros como LogEntry)
+
+En los ordenamientos a través de relaciones el índice va en el modelo final;
+la base de datos recorre ese índice y llega a las filas por la clave foránea.
+
+* vistas_ordenables: vistas enrutadas que usan SmartOrderingMixin
+* indices_requeridos: (modelo, campo) de cada ordenamiento Lower()
+* nombre_indice / indice_para: nombre e Index esperados para un requisito
+* faltantes: requisitos sin índice
+* check_indices_ordenamiento: chequeo de sistema (core.W001)
+"""
+from collections import namedtuple
+
+from django.core.checks import Tags, Warning, register
+from django.db import connections, models
+from django.db.backends.utils import names_digest
+from django.db.models import F
+from django.db.models.functions import Lower
+from django.urls import URLPattern, URLResolver, get_resolver
+
+Requisito = namedtuple('Requisito', ['model', 'campo', 'vista', 'columna'])
+
+# Longitud máxima del nombre de un índice (models.Index.max_name_length)
+MAX_NOMBRE = 30
+
+
+def _vistas(patrones):
+    for patron in patrones:
+        if isinstance(patron, URLResolver):
+            yield from _vistas(patron.url_patterns)
+        elif isinstance(patron, URLPattern):
+            vista = getattr(patron.callback, 'view_class', None)
+            if vista is not None:
+                yield vista
+
+
+def vistas_ordenables():
+    from library.mixins.helpers import SmartOrderingMixin
+
+    vistas = []
+    for vista in _vistas(get_resolver().url_patterns):
+        if issubclass(vista, SmartOrderingMixin) and vista not in vistas:
+            vistas.append(vista)
+    return vistas
+
+
+def _campo_lower(expresion):
+    """Ruta del campo si la expresión es Lower(F(ruta)) (ascendente o descendente)."""
+    if isinstance(expresion, models.OrderBy):
+        expresion = expresion.expression
+    if isinstance(expresion, Lower):
+        origen = expresion.get_source_expressions()[0]
+        if isinstance(origen, F):
+            return origen.name
+    return None
+
+
+def _resolver(model, ruta):
+    """Modelo y nombre del campo final de una ruta con relaciones ('usuario__username')."""
+    *relaciones, campo = ruta.split('__')
+    for relacion in relaciones:
+        model = model._meta.get_field(relacion).related_model
+    return model, campo
+
+
+def indices_requeridos():
+    requisitos = []
+    vistos = set()
+    for vista in vistas_ordenables():
+        for columna, ordenamiento in vista.campos_ordenables().items():
+            for expresion in ordenamiento:
+                ruta = _campo_lower(expresion)
+                if ruta is None:
+                    continue
+                model, campo = _resolver(vista.model, ruta)
+                if (model, campo) in vistos:
+                    continue
+                vistos.add((model, campo))
+                requisitos.append(Requisito(model, campo, vista, columna))
+    return requisitos
+
+
+def nombre_indice(model, campo):
+    nombre = f'{model._meta.model_name}_{campo}_lower_idx'
+    if len(nombre) <= MAX_NOMBRE:
+        return nombre
+    sufijo = '_' + names_digest(model._meta.db_table, campo, length=8)
+    return nombre[:MAX_NOMBRE - len(sufijo)] + sufijo
+
+
+def indice_para(requisito):
+    return models.Index(Lower(requisito.campo), name=nombre_indice(requisito.model, requisito.campo))
+
+
+def _en_meta(model, campo):
+    return any(
+        [_campo_lower(expresion) for expresion in indice.expressions][:1] == [campo]
+        for indice in model._meta.indexes
+    )
+
+
+def _en_base_de_datos(model, campo, conexion):
+    with conexion.cursor() as cursor:
+        if model._meta.db_table not in conexion.introspection.table_names(cursor):
+            return False
+        restricciones = conexion.introspection.get_constraints(cursor, model._meta.db_table)
+    return nombre_indice(model, campo) in restricciones
+
+
+def faltantes(conexion=None):
+    """Requisitos sin índice; con `conexion` también se aceptan índices que solo existen en la BD."""
+    return [
+        r for r in indices_requeridos()
+        if not _en_meta(r.model, r.campo)
+        and not (conexion is not None and _en_base_de_datos(r.model, r.campo, conexion))
+    ]
+
+
+@register(Tags.database)
+def check_indices_ordenamiento(app_configs=None, databases=None, **kwargs):
+    """
+    Avisa de las columnas ordenables sin índice Lower(). Es un chequeo de base
+    de datos: se ejecuta en `migrate` y en `check --database default`.
+    """
+    errores = []
+    for alias in databases or ():
+        for requisito in faltantes(connections[alias]):
+            errores.append(Warning(
+                f'La columna "{requisito.columna}" de {requisito.vista.__name__} se ordena por '
+                f'Lower({requisito.campo}) y {requisito.model._meta.label} no tiene un índice que la sirva.',
+                hint='Ejecuta "python manage.py indices_ordenamiento" para ver cómo crearlo.',
+                obj=requisito.vista,
+                id='core.W001',
+            ))
+    return errores
@@ -0,0 +1,287 @@
+"""
+Perfilado de peticiones
+
+ProfilingMiddleware mide, para una muestra de las peticiones (o las que lo
+piden con la cabecera X-Profile), el tiempo total, cuántas consultas SQL se
+ejecutan y cuánto tardan, las consultas repetidas y el tiempo de renderizado
+de la plantilla. Los datos se agregan por nombre de vista (p. ej.
+'reserva', 'reservas_by_date') en histogramas que se consultan en
+/perfil/ (solo administradores).
+
+Las peticiones no perfiladas no pagan más que un sorteo y la lectura de una
+cabecera. Las consultas se registran con un envoltorio de ejecución que se
+instala en cada conexión y solo actúa cuando hay un perfil activo en el
+contexto (ContextVar), por lo que también cuenta las consultas que una vista
+asíncrona hace desde sync_to_async.
+
+Los agregados viven en la memoria de cada proceso: con varios procesos cada
+uno tiene los suyos.
+
+* huella: SQL normalizado para detectar la misma consulta repetida (N+1)
+* Histograma: conteos acumulados por cubetas fijas
+* RegistroPerfiles: agregados por vista (thread-safe)
+* registro: instancia global
+* ProfilingMiddleware: middleware síncrono y asíncrono
+"""
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Límites de las cubetas (en ms o en número de consultas); la última es "más"
+CUBETAS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+CUBETAS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+# Consultas repetidas que se guardan por vista (las más frecuentes)
+MAX_REPETIDAS = 20
+
+_perfil_actual = ContextVar('perfil_actual', default=None)
+
+_IN = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_NUMERO = re.compile(r'\b\d+\b')
+
+
+def huella(sql):
+    """
+    SQL normalizado: las listas IN de cualquier tamaño y los números
+    literales (LIMIT, OFFSET...) se reemplazan, de forma que la misma consulta
+    con otros parámetros tiene la misma huella.
+    """
+    return _NUMERO.sub('N', _IN.sub('(...)', sql))
+
+
+class Perfil:
+    """Mediciones de una petición."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.sql_ms = 0.0
+        self.render_ms = None
+        self.huellas = Counter()
+
+    def registrar_consulta(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - inicio) * 1000
+            self.consultas += 1
+            self.huellas[huella(sql)] += 1
+
+    def repetidas(self):
+        return {sql: veces for sql, veces in self.huellas.items() if veces > 1}
+
+
+def _envoltorio(execute, sql, params, many, context):
+    perfil = _perfil_actual.get()
+    if perfil is None:
+        return execute(sql, params, many, context)
+    return perfil.registrar_consulta(execute, sql, params, many, context)
+
+
+def instalar(connection):
+    if _envoltorio not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_envoltorio)
+
+
+def _al_conectar(sender, connection, **kwargs):
+    instalar(connection)
+
+
+connection_created.connect(_al_conectar, dispatch_uid='perfilado_instalar')
+
+
+class Histograma:
+    """Conteos por cubeta, total, suma y máximo de una medida."""
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.conteos = [0] * (len(limites) + 1)
+        self.total = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def agregar(self, valor):
+        i = 0
+        while i < len(self.limites) and valor > self.limites[i]:
+            i += 1
+        self.conteos[i] += 1
+        self.total += 1
+        self.suma += valor
+        self.maximo = max(self.maximo, valor)
+
+    def percentil(self, p):
+        """Límite superior de la cubeta en la que cae el percentil `p` (None si es la última)."""
+        objetivo = self.total * p / 100
+        acumulado = 0
+        for limite, conteo in zip((*self.limites, None), self.conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                return limite
+        return None
+
+    def como_dict(self):
+        etiquetas = [f'<={limite}' for limite in self.limites] + [f'>{self.limites[-1]}']
+        return {
+            'cubetas': dict(zip(etiquetas, self.conteos)),
+            'media': round(self.suma / self.total, 2) if self.total else None,
+            'maximo': round(self.maximo, 2),
+            'p50': self.percentil(50),
+            'p95': self.percentil(95),
+        }
+
+
+class EstadisticasVista:
+    def __init__(self):
+        self.peticiones = 0
+        self.total_ms = Histograma(CUBETAS_MS)
+        self.sql_ms = Histograma(CUBETAS_MS)
+        self.render_ms = Histograma(CUBETAS_MS)
+        self.consultas = Histograma(CUBETAS_CONSULTAS)
+        # Huella -> ejecuciones de más (las que sobran tras la primera), sumadas entre peticiones
+        self.repetidas = Counter()
+
+    def agregar(self, total_ms, perfil):
+        self.peticiones += 1
+        self.total_ms.agregar(total_ms)
+        self.sql_ms.agregar(perfil.sql_ms)
+        self.consultas.agregar(perfil.consultas)
+        if perfil.render_ms is not None:
+            self.render_ms.agregar(perfil.render_ms)
+        for sql, veces in perfil.repetidas().items():
+            if sql in self.repetidas or len(self.repetidas) < MAX_REPETIDAS:
+                self.repetidas[sql] += veces - 1
+
+    def como_dict(self):
+        return {
+            'peticiones': self.peticiones,
+            'total_ms': self.total_ms.como_dict(),
+            'sql_ms': self.sql_ms.como_dict(),
+            'render_ms': self.render_ms.como_dict(),
+            'consultas': self.consultas.como_dict(),
+            'repetidas': [
+                {'sql': sql, 'ejecuciones_de_mas': veces}
+                for sql, veces in self.repetidas.most_common()
+            ],
+        }
+
+
+class RegistroPerfiles:
+    """Estadísticas por nombre de vista, compartidas por los hilos del proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vistas = {}
+
+    def agregar(self, vista, total_ms, perfil):
+        with self._lock:
+            self._vistas.setdefault(vista, EstadisticasVista()).agregar(total_ms, perfil)
+
+    def resumen(self):
+        """Agregados por vista, de la más lenta (tiempo total acumulado) a la más rápida."""
+        with self._lock:
+            vistas = sorted(self._vistas.items(), key=lambda item: -item[1].total_ms.suma)
+            return {vista: estadisticas.como_dict() for vista, estadisticas in vistas}
+
+    def limpiar(self):
+        with self._lock:
+            self._vistas.clear()
+
+
+registro = RegistroPerfiles()
+
+
+class ProfilingMiddleware:
+    """
+    Perfila una fracción PROFILING_MUESTREO de las peticiones y las que traen
+    la cabecera X-Profile de un administrador; a estas últimas les añade una
+    cabecera Server-Timing con las medidas.
+
+    Debe ir después de AuthenticationMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        forzado = self.forzado(request)
+        if not (forzado or self.sorteado()):
+            return self.get_response(request)
+
+        for connection in connections.all(initialized_only=True):
+            instalar(connection)
+        perfil, token, inicio = self.iniciar(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _perfil_actual.reset(token)
+        return self.terminar(request, response, perfil, inicio, forzado)
+
+    async def __acall__(self, request):
+        # Resolver request.user consulta la base de datos: se hace en el hilo de la ORM
+        forzado = bool(request.headers.get('X-Profile')) and await sync_to_async(self.es_admin)(request)
+        if not (forzado or self.sorteado()):
+            return await self.get_response(request)
+
+        perfil, token, inicio = self.iniciar(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _perfil_actual.reset(token)
+        return self.terminar(request, response, perfil, inicio, forzado)
+
+    def sorteado(self):
+        muestreo = getattr(settings, 'PROFILING_MUESTREO', 0)
+        return muestreo > 0 and random.random() < muestreo
+
+    def forzado(self, request):
+        # Solo se mira el usuario si viene la cabecera
+        return bool(request.headers.get('X-Profile')) and self.es_admin(request)
+
+    def es_admin(self, request):
+        return request.user.is_authenticated and request.user.is_admin
+
+    def iniciar(self, request):
+        perfil = Perfil()
+        request._perfil = perfil
+        return perfil, _perfil_actual.set(perfil), time.perf_counter()
+
+    def terminar(self, request, response, perfil, inicio, forzado):
+        total_ms = (time.perf_counter() - inicio) * 1000
+        match = getattr(request, 'resolver_match', None)
+        registro.agregar(match.view_name if match else '<sin resolver>', total_ms, perfil)
+        if forzado:
+            medidas = [f'total;dur={total_ms:.1f}', f'sql;dur={perfil.sql_ms:.1f};desc="{perfil.consultas} consultas"']
+            if perfil.render_ms is not None:
+                medidas.append(f'render;dur={perfil.render_ms:.1f}')
+            response['Server-Timing'] = ', '.join(medidas)
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Las TemplateResponse se renderizan después de los process_template_response:
+        se anota la hora aquí y un callback posterior al renderizado calcula la duración.
+        """
+        perfil = getattr(request, '_perfil', None)
+        if perfil is not None:
+            inicio = time.perf_counter()
+
+            def medir_render(response):
+                perfil.render_ms = (time.perf_counter() - inicio) * 1000
+
+            response.add_post_render_callback(medir_render)
+        return response
+
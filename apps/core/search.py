@@ -0,0 +1,204 @@
+"""
+Búsqueda por subcadena indexada
+
+Los filtros "contiene" (icontains) se traducen en LIKE '%x%', que obliga a
+recorrer la tabla entera (y, en los filtros sobre relaciones, a hacerlo tras
+un join). Este módulo resuelve esas búsquedas con un índice según el motor:
+
+* SQLite: una tabla virtual FTS5 con tokenizador trigram por modelo, mantenida
+  por señales (ver signals.py) y reconstruible con `reconstruir_busqueda`
+* PostgreSQL: índices GIN con pg_trgm sobre UPPER(columna), que es la
+  expresión que Django genera para icontains
+* Otros motores: icontains sin índice
+
+La búsqueda siempre devuelve los pks que coinciden, de forma que un filtro
+sobre una relación (p. ej. reservas por usuario__username) se convierte en
+`usuario_id IN (...)`, resuelto con el índice de la clave foránea.
+
+* INDICES: modelos y campos indexados
+* backend: backend del motor de la conexión por defecto
+* buscar: subconsulta de pks de un modelo cuyo campo contiene un texto
+* reconstruir: vuelve a llenar el índice de los modelos (tras inserciones masivas)
+* BusquedaFilter: CharFilter de django-filter que enruta la búsqueda por el backend
+"""
+from django.apps import apps as global_apps
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django_filters import CharFilter
+
+# Modelos (app_label.Modelo) y campos de texto con búsqueda indexada
+INDICES = {
+    'usuarios.Usuario': ('username', 'email'),
+    'usuarios.Ubicacion': ('nombre',),
+    'espacios.Espacio': ('nombre',),
+}
+
+# El tokenizador trigram no puede buscar textos de menos de 3 caracteres
+MINIMO_TRIGRAM = 3
+
+
+def campos_indexados(model):
+    return INDICES.get(model._meta.label, ())
+
+
+def modelos_indexados(apps=global_apps):
+    """Modelos de INDICES; `apps` permite usar los modelos históricos en migraciones."""
+    return [apps.get_model(etiqueta) for etiqueta in INDICES]
+
+
+class BusquedaSimple:
+    """icontains sin índice; lo que hace Django por defecto."""
+
+    def instalar(self, schema_editor, apps=global_apps):
+        pass
+
+    def desinstalar(self, schema_editor, apps=global_apps):
+        pass
+
+    def buscar(self, model, campo, texto):
+        return model._default_manager.filter(**{f'{campo}__icontains': texto}).values('pk')
+
+    def indexar(self, instancias):
+        pass
+
+    def eliminar(self, model, pks):
+        pass
+
+    def reconstruir(self, model, conexion=connection):
+        pass
+
+
+class BusquedaSQLite(BusquedaSimple):
+    """Tablas FTS5 con tokenizador trigram (rowid = pk del modelo)."""
+
+    def tabla(self, model):
+        return f'busqueda_{model._meta.db_table}'
+
+    def instalar(self, schema_editor, apps=global_apps):
+        for model in modelos_indexados(apps):
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.tabla(model)} '
+                f'USING fts5({", ".join(campos_indexados(model))}, tokenize=\'trigram\')'
+            )
+            self.reconstruir(model, schema_editor.connection)
+
+    def desinstalar(self, schema_editor, apps=global_apps):
+        for model in modelos_indexados(apps):
+            schema_editor.execute(f'DROP TABLE IF EXISTS {self.tabla(model)}')
+
+    def buscar(self, model, campo, texto):
+        if len(texto) < MINIMO_TRIGRAM:
+            return super().buscar(model, campo, texto)
+        # Una frase entre comillas busca la subcadena exacta (sin distinguir mayúsculas)
+        frase = '"%s"' % texto.replace('"', '""')
+        return RawSQL(f'SELECT rowid FROM {self.tabla(model)} WHERE {campo} MATCH %s', (frase,))
+
+    def indexar(self, instancias):
+        if not instancias:
+            return
+        model = type(instancias[0])
+        campos = campos_indexados(model)
+        tabla = self.tabla(model)
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {tabla} WHERE rowid = %s', [(i.pk,) for i in instancias])
+            cursor.executemany(
+                f'INSERT INTO {tabla} (rowid, {", ".join(campos)}) '
+                f'VALUES (%s, {", ".join(["%s"] * len(campos))})',
+                [(i.pk, *(getattr(i, campo) or '' for campo in campos)) for i in instancias],
+            )
+
+    def eliminar(self, model, pks):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.tabla(model)} WHERE rowid = %s', [(pk,) for pk in pks])
+
+    def reconstruir(self, model, conexion=connection):
+        campos = campos_indexados(model)
+        tabla = self.tabla(model)
+        origen = ', '.join(
+            f"COALESCE({conexion.ops.quote_name(model._meta.get_field(campo).column)}, '')"
+            for campo in campos
+        )
+        with conexion.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {tabla}')
+            cursor.execute(
+                f'INSERT INTO {tabla} (rowid, {", ".join(campos)}) '
+                f'SELECT {conexion.ops.quote_name(model._meta.pk.column)}, {origen} '
+                f'FROM {conexion.ops.quote_name(model._meta.db_table)}'
+            )
+
+
+class BusquedaPostgres(BusquedaSimple):
+    """
+    Índices GIN trigram sobre UPPER(columna::text). Django filtra icontains con
+    esa misma expresión, así que basta el icontains de BusquedaSimple.
+    """
+
+    def indice(self, model, campo):
+        return f'{model._meta.db_table}_{campo}_trgm'
+
+    def instalar(self, schema_editor, apps=global_apps):
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for model in modelos_indexados(apps):
+            for campo in campos_indexados(model):
+                columna = schema_editor.quote_name(model._meta.get_field(campo).column)
+                schema_editor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {self.indice(model, campo)} ON {model._meta.db_table} '
+                    f'USING gin (UPPER({columna}::text) gin_trgm_ops)'
+                )
+
+    def desinstalar(self, schema_editor, apps=global_apps):
+        for model in modelos_indexados(apps):
+            for campo in campos_indexados(model):
+                schema_editor.execute(f'DROP INDEX IF EXISTS {self.indice(model, campo)}')
+
+
+BACKENDS = {
+    'sqlite': BusquedaSQLite,
+    'postgresql': BusquedaPostgres,
+}
+
+
+def backend(conexion=None):
+    return BACKENDS.get((conexion or connection).vendor, BusquedaSimple)()
+
+
+def buscar(model, campo, texto):
+    """
+    Subconsulta con los pks de `model` cuyo `campo` contiene `texto`
+    (sin distinguir mayúsculas), para usar con `__in`.
+    """
+    if campo not in campos_indexados(model):
+        return BusquedaSimple().buscar(model, campo, texto)
+    return backend().buscar(model, campo, texto)
+
+
+def reconstruir():
+    """Reconstruye el índice de todos los modelos de INDICES."""
+    busqueda = backend()
+    for model in modelos_indexados():
+        busqueda.reconstruir(model)
+
+
+class BusquedaFilter(CharFilter):
+    """
+    CharFilter "contiene" que usa el índice de búsqueda.
+
+    `field_name` es una ruta como la de icontains ('username', 'usuario__username',
+    'espacio__ubicacion__nombre'): el último tramo es el campo buscado y el resto
+    la relación por la que se filtra con los pks encontrados.
+    """
+
+    def filter(self, qs, value):
+        value = (value or '').strip()
+        if not value:
+            return qs
+
+        *relacion, campo = self.field_name.split('__')
+        model = qs.model
+        for parte in relacion:
+            model = model._meta.get_field(parte).related_model
+
+        pks = buscar(model, campo, value)
+        lookup = '__'.join([*relacion, 'in']) if relacion else 'pk__in'
+        qs = qs.filter(**{lookup: pks})
+        return qs.distinct() if self.distinct else qs
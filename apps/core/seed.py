@@ -0,0 +1,183 @@
+"""
+Carga masiva de datos de prueba
+
+Los comandos crear_*_demo crean los objetos uno a uno con full_clean() y
+save(): cada reserva consulta solapamientos y roles y escribe su log de
+auditoría. Para poblar conjuntos grandes este módulo ofrece un camino
+masivo:
+
+* las reservas se validan contra un plan en memoria (sin consultas por reserva)
+* se insertan con bulk_create por lotes, dentro de una transacción
+* los logs de creación se generan también con bulk_create (u omiten)
+* al final se mantiene lo que harían las señales: resumen diario, caché del
+  calendario e índice de búsqueda
+
+* PlanReservas: franjas planificadas por (espacio, fecha_uso) y claves (usuario, espacio, fecha_uso)
+* crear_logs_creacion: logs de creación (y su visibilidad) con bulk_create
+* insertar: bulk_create por lotes con logs de creación opcionales
+* insertar_reservas: insertar + resumen diario y caché del calendario
+* insertar_usuarios: insertar + grupos e índice de búsqueda
+"""
+from collections import defaultdict
+
+from auditlog.cid import get_cid
+from auditlog.diff import model_instance_diff
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils.encoding import smart_str
+
+from apps.core.search import reconstruir as reconstruir_busqueda
+from apps.reservas import cache as cache_calendario, rollup
+from apps.reservas.models import Reserva
+from apps.usuarios.models import Usuario
+
+# Tamaño de lote por defecto para bulk_create
+LOTE = 5000
+
+# Motivos de rechazo de PlanReservas.reservar (los mismos que cuenta crear_reservas_demo)
+SOLAPAMIENTO = 'solapamiento'
+CONSTRAINT_USUARIO = 'constraint_usuario'
+VALIDACION = 'validacion'
+
+
+class PlanReservas:
+    """
+    Reservas planificadas en memoria para un rango de fechas.
+
+    Se inicia con las reservas que ya existen en la base de datos (las
+    rechazadas no ocupan franja) y valida cada reserva nueva contra el plan:
+    hora de inicio menor que la de fin, sin solapamiento en el espacio y un
+    único (usuario, espacio, fecha_uso). La disponibilidad del espacio y que la
+    fecha no sea pasada quedan a cargo de quien elige los candidatos.
+    """
+
+    def __init__(self, desde, hasta, espacio_ids):
+        self._franjas = defaultdict(list)
+        self._claves = set()
+        existentes = Reserva.objects.filter(
+            fecha_uso__range=(desde, hasta), espacio_id__in=espacio_ids
+        ).values_list('usuario_id', 'espacio_id', 'fecha_uso', 'hora_inicio', 'hora_fin', 'estado')
+        for usuario_id, espacio_id, fecha_uso, inicio, fin, estado in existentes.iterator():
+            self._claves.add((usuario_id, espacio_id, fecha_uso))
+            if estado != Reserva.Estado.RECHAZADA:
+                self._franjas[(espacio_id, fecha_uso)].append((inicio, fin))
+
+    def reservar(self, usuario_id, espacio_id, fecha_uso, inicio, fin):
+        """
+        Añade la franja al plan si es válida.
+
+        Retorna:
+            str | None: motivo del rechazo (SOLAPAMIENTO, CONSTRAINT_USUARIO o
+            VALIDACION), o None si se añadió.
+        """
+        if inicio >= fin:
+            return VALIDACION
+        if (usuario_id, espacio_id, fecha_uso) in self._claves:
+            return CONSTRAINT_USUARIO
+        # Un espacio tiene pocas franjas por día: basta recorrerlas
+        franjas = self._franjas[(espacio_id, fecha_uso)]
+        if any(otro_inicio < fin and inicio < otro_fin for otro_inicio, otro_fin in franjas):
+            return SOLAPAMIENTO
+
+        self._claves.add((usuario_id, espacio_id, fecha_uso))
+        franjas.append((inicio, fin))
+        return None
+
+
+def crear_logs_creacion(instancias, actor=None, batch_size=LOTE):
+    """
+    Escribe con bulk_create un LogEntry de creación por instancia, con los
+    mismos cambios que registraría auditlog en un save(), y su visibilidad.
+
+    Retorna:
+        list: los LogEntry creados.
+    """
+    from apps.logs.visibility import registrar_visibilidad
+
+    if not instancias:
+        return []
+
+    content_type = ContentType.objects.get_for_model(type(instancias[0]))
+    cid = get_cid()
+    entradas = [
+        LogEntry(
+            content_type=content_type,
+            object_pk=str(instancia.pk),
+            object_id=instancia.pk if isinstance(instancia.pk, int) else None,
+            object_repr=smart_str(instancia),
+            action=LogEntry.Action.CREATE,
+            changes=model_instance_diff(
+                None, instancia, use_json_for_changes=settings.AUDITLOG_STORE_JSON_CHANGES
+            ),
+            actor=actor,
+            cid=cid,
+        )
+        for instancia in instancias
+    ]
+    LogEntry.objects.bulk_create(entradas, batch_size=batch_size)
+    registrar_visibilidad(entradas)
+    return entradas
+
+
+def insertar(model, instancias, auditar=True, batch_size=LOTE):
+    """
+    Inserta `instancias` con bulk_create en lotes de `batch_size` y, si
+    `auditar`, escribe sus logs de creación. No dispara señales.
+
+    Retorna:
+        list: las instancias creadas (con pk).
+    """
+    creadas = []
+    with transaction.atomic():
+        for inicio in range(0, len(instancias), batch_size):
+            lote = model.objects.bulk_create(instancias[inicio:inicio + batch_size])
+            if auditar:
+                crear_logs_creacion(lote, batch_size=batch_size)
+            creadas.extend(lote)
+    return creadas
+
+
+def insertar_reservas(reservas, auditar=True, batch_size=LOTE):
+    """
+    Inserta reservas ya validadas (p. ej. con PlanReservas), con la ubicación
+    y el piso de su espacio, y actualiza el resumen diario y la caché del
+    calendario de sus fechas.
+
+    Retorna:
+        list: las reservas creadas.
+    """
+    if not reservas:
+        return []
+
+    # bulk_create no dispara pre_save: la ubicación y el piso se copian aquí
+    for reserva in reservas:
+        reserva.sincronizar_ubicacion()
+
+    with transaction.atomic():
+        creadas = insertar(Reserva, reservas, auditar=auditar, batch_size=batch_size)
+        fechas = [reserva.fecha_uso for reserva in creadas]
+        rollup.recalcular(fecha_uso__range=(min(fechas), max(fechas)))
+        cache_calendario.invalidar_fechas(*set(fechas))
+    return creadas
+
+
+def insertar_usuarios(usuarios, grupos, auditar=True, batch_size=LOTE):
+    """
+    Inserta usuarios y los asigna a sus grupos (`grupos` es paralela a
+    `usuarios`) y reconstruye el índice de búsqueda. La contraseña debe
+    venir ya cifrada.
+
+    Retorna:
+        list: los usuarios creados.
+    """
+    with transaction.atomic():
+        creados = insertar(Usuario, usuarios, auditar=auditar, batch_size=batch_size)
+        Usuario.groups.through.objects.bulk_create(
+            [Usuario.groups.through(usuario_id=usuario.pk, group_id=grupo.pk)
+             for usuario, grupo in zip(creados, grupos)],
+            batch_size=batch_size,
+        )
+        reconstruir_busqueda()
+    return creados
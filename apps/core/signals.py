@@ -0,0 +1,25 @@
+"""
+Mantenimiento del índice de búsqueda (ver apps.core.search)
+
+Se conectan en CoreConfig.ready() para cada modelo de search.INDICES.
+Las inserciones masivas (bulk_create, update) no disparan señales: después
+de usarlas hay que llamar a search.reconstruir() o al comando reconstruir_busqueda.
+"""
+from django.db.models.signals import post_delete, post_save
+
+from apps.core import search
+
+
+def indexar_instancia(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.backend().indexar([instance])
+
+
+def eliminar_instancia(sender, instance, **kwargs):
+    search.backend().eliminar(sender, [instance.pk])
+
+
+def conectar():
+    for model in search.modelos_indexados():
+        post_save.connect(indexar_instancia, sender=model, dispatch_uid=f'busqueda_indexar_{model._meta.label}')
+        post_delete.connect(eliminar_instancia, sender=model, dispatch_uid=f'busqueda_eliminar_{model._meta.label}')
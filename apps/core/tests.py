@@ -1,3 +1,454 @@
-from django.test import TestCase
+import os
+from datetime import date, time, timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import Group
+from auditlog.context import set_actor
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.functions import Lower
+from django.template import engines
+from django.urls import reverse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+
+from apps.espacios.models import Espacio
+from apps.logs.models import LogVisibilidad
+from apps.reservas.models import Reserva, ReservaDailyRollup
+from apps.usuarios.models import Ubicacion, Usuario
+from apps.core.columns import compilar_columna
+from apps.core.profiling import Perfil, huella, registro
+from apps.core.ordering import check_indices_ordenamiento, faltantes, nombre_indice
+from apps.core.search import reconstruir
+from apps.core.seed import CONSTRAINT_USUARIO, SOLAPAMIENTO, VALIDACION, PlanReservas
+from apps.espacios.views import EspacioListView
+from apps.logs.views import LogListView
+from apps.reservas.views import ReservaListView
+from apps.usuarios.views import UsuarioListView
+from apps.reservas.filters import ReservaFilter
+from apps.usuarios.filters import UsuarioFilter
+from library.context_proccesors.dashboard_access import navlinks
+from library.mixins.helpers import ListCrudMixin
+from library.utils.utils import StatsCalculator, get_stats
+
+
+class StatsCalculatorTest(TestCase):
+    """Los conteos del dashboard se obtienen con una única consulta agregada"""
+
+    def setUp(self):
+        ubicacion = Ubicacion.objects.create(nombre='Sede Central')
+        self.usuario = Usuario.objects.create_user(
+            username='usuario', email='usuario@example.com', password='pass')
+        self.usuario.groups.add(Group.objects.get(name=settings.GRUPOS.USUARIO))
+        espacio = Espacio.objects.create(
+            nombre='Salon101', ubicacion=ubicacion, piso=1,
+            capacidad=30, tipo=Espacio.Tipo.SALON)
+
+        hoy = date.today()
+        fechas = [hoy, hoy + timedelta(days=400), hoy - timedelta(days=400)]
+        estados = [Reserva.Estado.APROBADA, Reserva.Estado.PENDIENTE, Reserva.Estado.RECHAZADA]
+        for i, (fecha, estado) in enumerate(zip(fechas, estados)):
+            Reserva.objects.create(
+                usuario=self.usuario, espacio=espacio, fecha_uso=fecha,
+                hora_inicio=time(8 + i, 0), hora_fin=time(9 + i, 0),
+                estado=estado, motivo='Reunión')
+
+        self.request = RequestFactory().get('/inicio/')
+        self.request.user = self.usuario
+
+    def test_conteos_en_una_consulta(self):
+        calc = StatsCalculator(self.request)
+        with self.assertNumQueries(1):
+            counts, counts_mes = calc.get_reserva_counts()
+
+        self.assertEqual(counts, {'pendientes': 1, 'aprobadas': 1, 'rechazadas': 1})
+        self.assertEqual(counts_mes, {'pendientes': 0, 'aprobadas': 1, 'rechazadas': 0, 'total': 1})
+
+    def test_resumen_mensual_usuario(self):
+        stats = get_stats(self.request)
+        self.assertEqual(stats['month_summary']['total'], 1)
+        self.assertEqual([c['value'] for c in stats['cards']], [1, 1, 1])
+
+
+class DashboardAccessTest(TestCase):
+    """El menú se calcula de forma perezosa y se memoriza por grupo"""
+
+    def setUp(self):
+        self.moderador = Usuario.objects.create_user(
+            username='moderador', email='moderador@example.com', password='pass')
+        self.moderador.groups.add(Group.objects.get(name=settings.GRUPOS.MODERADOR))
+        self.moderador = Usuario.objects.get(pk=self.moderador.pk)
+        self.moderador.invalidar_roles()
+        self.request = RequestFactory().get('/reservas/api/fecha/')
+        self.request.user = self.moderador
+
+    def render(self, codigo):
+        return engines['django'].from_string(codigo).render({}, self.request)
+
+    def test_parcial_sin_menu_no_consulta(self):
+        with self.assertNumQueries(0):
+            self.render('{{ current_section }}')
+
+    def test_menu_con_una_consulta_compartida_con_los_roles(self):
+        with self.assertNumQueries(1):
+            html = self.render('{{ group }}|{% for item in dashboard_access %}{{ item.label }},{% endfor %}')
+            self.assertTrue(self.moderador.is_moderador)
+        self.assertEqual(html, 'moderador|Inicio,Calendario,Reservas,Usuarios,')
+
+    def test_navlinks_memorizados_y_limpiados_al_cambiar_settings(self):
+        self.assertIs(navlinks(settings.GRUPOS.USUARIO), navlinks(settings.GRUPOS.USUARIO))
+        with override_settings(DASHBOARD_ACCESS={settings.GRUPOS.USUARIO: []}):
+            self.assertEqual(len(navlinks(settings.GRUPOS.USUARIO)), 2)
+        self.assertGreater(len(navlinks(settings.GRUPOS.USUARIO)), 2)
+
+
+class BusquedaTest(TestCase):
+    """Los filtros "contiene" se resuelven con el índice de búsqueda"""
+
+    def setUp(self):
+        self.norte = Ubicacion.objects.create(nombre='Sede Norte')
+        sur = Ubicacion.objects.create(nombre='Sede Sur')
+        self.jose = Usuario.objects.create_user(
+            username='JosePerez', email='jose@example.com', password='pass')
+        self.ana = Usuario.objects.create_user(
+            username='ana', email='ana@correo.org', password='pass')
+        salon = Espacio.objects.create(nombre='Salon101', ubicacion=self.norte, piso=1,
+                                       capacidad=30, tipo=Espacio.Tipo.SALON)
+        lab = Espacio.objects.create(nombre='Lab201', ubicacion=sur, piso=2,
+                                     capacidad=30, tipo=Espacio.Tipo.LABORATORIO)
+        fecha = date.today() + timedelta(days=1)
+        self.reserva_jose = Reserva.objects.create(
+            usuario=self.jose, espacio=salon, fecha_uso=fecha,
+            hora_inicio=time(8, 0), hora_fin=time(9, 0), motivo='Reunión')
+        self.reserva_ana = Reserva.objects.create(
+            usuario=self.ana, espacio=lab, fecha_uso=fecha,
+            hora_inicio=time(8, 0), hora_fin=time(9, 0), motivo='Taller')
+
+    def reservas(self, **data):
+        return list(ReservaFilter(data, queryset=Reserva.objects.all()).qs)
+
+    def test_filtra_por_relacion_sin_distinguir_mayusculas(self):
+        self.assertEqual(self.reservas(usuario='ePER'), [self.reserva_jose])
+        self.assertEqual(self.reservas(espacio='lab2'), [self.reserva_ana])
+        self.assertEqual(self.reservas(ubicacion='norte'), [self.reserva_jose])
+
+    def test_textos_cortos_usan_icontains(self):
+        self.assertEqual(self.reservas(usuario='an'), [self.reserva_ana])
+
+    def test_indice_sincronizado_por_senales(self):
+        self.jose.username = 'Josefina'
+        self.jose.save()
+        self.assertEqual(self.reservas(usuario='perez'), [])
+        self.assertEqual(self.reservas(usuario='sefi'), [self.reserva_jose])
+
+        self.ana.delete()
+        self.assertEqual(list(UsuarioFilter({'email': 'correo'}, queryset=Usuario.objects.all()).qs), [])
+
+    def test_reconstruir_tras_insercion_masiva(self):
+        Usuario.objects.bulk_create([Usuario(username='masivo', email='masivo@example.com')])
+        filtro = lambda: UsuarioFilter({'username': 'masiv'}, queryset=Usuario.objects.all()).qs
+        self.assertFalse(filtro().exists())
+        reconstruir()
+        self.assertEqual([u.username for u in filtro()], ['masivo'])
+
+    def test_consulta_usa_la_tabla_fts(self):
+        qs = ReservaFilter({'usuario': 'jose'}, queryset=Reserva.objects.all()).qs
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(fila) for fila in cursor.fetchall())
+        self.assertIn('VIRTUAL TABLE', plan)
+        self.assertNotIn('LIKE', sql)
+
+
+class IndicesOrdenamientoTest(TestCase):
+    """Cada columna de texto ordenable tiene un índice Lower() que la sirve"""
+
+    def test_campos_ordenables(self):
+        campos = EspacioListView.campos_ordenables()
+        self.assertEqual([str(e) for e in campos['nombre']], [str(Lower('nombre'))])
+        self.assertEqual(campos['capacidad'], ['capacidad'])
+        # Los choices se guardan en minúsculas: se ordenan por la columna, sin Lower()
+        self.assertEqual(campos['tipo'], ['tipo'])
+
+    def test_sin_avisos_con_las_migraciones_aplicadas(self):
+        self.assertEqual(check_indices_ordenamiento(databases=['default']), [])
+
+    def test_avisa_si_falta_el_indice(self):
+        indices = [i for i in Espacio._meta.indexes if i.name != 'espacio_nombre_lower_idx']
+        with mock.patch.object(Espacio._meta, 'indexes', indices):
+            self.assertIn((Espacio, 'nombre'), [(r.model, r.campo) for r in faltantes()])
+            # El índice sigue existiendo en la base de datos con el nombre esperado
+            self.assertEqual(faltantes(connection), [])
+            with mock.patch('apps.core.ordering._en_base_de_datos', return_value=False):
+                avisos = check_indices_ordenamiento(databases=['default'])
+        self.assertEqual([a.id for a in avisos if 'espacios.Espacio' in a.msg], ['core.W001'])
+
+    def test_nombre_indice_limitado(self):
+        self.assertEqual(nombre_indice(Espacio, 'nombre'), 'espacio_nombre_lower_idx')
+        self.assertLessEqual(len(nombre_indice(Reserva, 'un_campo_con_nombre_largo')), 30)
+
+
+class CargaMasivaTest(TestCase):
+    """El camino masivo de los comandos demo valida en memoria y mantiene las tablas derivadas"""
+
+    def setUp(self):
+        self.ubicacion = Ubicacion.objects.create(nombre='Sede Central')
+        self.usuario = Usuario.objects.create_user(
+            username='usuario', email='usuario@example.com', password='pass')
+        self.usuario.groups.add(Group.objects.get(name=settings.GRUPOS.USUARIO))
+        self.espacio = Espacio.objects.create(nombre='Salon101', ubicacion=self.ubicacion, piso=1,
+                                              capacidad=30, tipo=Espacio.Tipo.SALON)
+        self.fecha = date.today() + timedelta(days=1)
+
+    def test_plan_reservas(self):
+        Reserva.objects.create(usuario=self.usuario, espacio=self.espacio, fecha_uso=self.fecha,
+                               hora_inicio=time(8, 0), hora_fin=time(10, 0), motivo='Reunión')
+        otro = Usuario.objects.create_user(username='otro', email='otro@example.com', password='pass')
+        plan = PlanReservas(self.fecha, self.fecha, [self.espacio.pk])
+
+        def reservar(usuario, inicio, fin):
+            return plan.reservar(usuario.pk, self.espacio.pk, self.fecha, time(inicio), time(fin))
+
+        self.assertEqual(reservar(otro, 9, 11), SOLAPAMIENTO)
+        self.assertEqual(reservar(self.usuario, 12, 13), CONSTRAINT_USUARIO)
+        self.assertEqual(reservar(otro, 12, 12), VALIDACION)
+        self.assertIsNone(reservar(otro, 10, 11))
+        self.assertEqual(reservar(otro, 15, 16), CONSTRAINT_USUARIO)
+
+    def test_reservas_demo_masivo(self):
+        for i in range(5):
+            usuario = Usuario.objects.create_user(
+                username=f'u{i}', email=f'u{i}@example.com', password='pass')
+            usuario.groups.add(Group.objects.get(name=settings.GRUPOS.USUARIO))
+
+        call_command('crear_reservas_demo', 20, '--masivo', stdout=mock.MagicMock())
+
+        reservas = Reserva.objects.all()
+        self.assertEqual(reservas.count(), 20)
+        for reserva in reservas:
+            reserva.full_clean()
+        self.assertEqual(
+            sum(ReservaDailyRollup.objects.values_list('total', flat=True)), 20)
+        logs = LogEntry.objects.filter(action=LogEntry.Action.CREATE, object_repr__startswith='US:')
+        self.assertEqual(logs.count(), 20)
+        self.assertEqual(
+            LogVisibilidad.objects.filter(espacio_pk=self.espacio.pk).count(), 20)
+
+    def test_usuarios_demo_masivo_sin_auditoria(self):
+        call_command('crear_usuarios_demo', '--masivo', '--sin-auditoria', stdout=mock.MagicMock())
+
+        grupos = Group.objects.count()
+        creados = Usuario.objects.filter(username__contains='_edf')
+        self.assertEqual(creados.count(), 4 * grupos * 2)
+        self.assertTrue(all(u.check_password('1234jose') for u in creados[:2]))
+        self.assertEqual(Usuario.groups.through.objects.filter(usuario__in=creados).count(), creados.count())
+        self.assertFalse(LogEntry.objects.filter(object_repr__contains='_edf').exists())
+        self.assertEqual(UsuarioFilter({'username': 'edf3'}, queryset=Usuario.objects.all()).qs.count(),
+                         grupos * 2)
+
+    def test_espacios_demo_auditoria_opcional(self):
+        logs = LogEntry.objects.get_for_model(Espacio)
+        previos = logs.count()
+        call_command('crear_espacios_demo', '--por-ubicacion', '2', stdout=mock.MagicMock())
+        self.assertEqual(Espacio.objects.count(), 3)
+        self.assertEqual(logs.count(), previos)
+
+        # Los nombres se generan a partir de la ubicación: otra para no repetirlos
+        Ubicacion.objects.filter(pk=self.ubicacion.pk).update(nombre='Sede Norte')
+        call_command('crear_espacios_demo', '--por-ubicacion', '2', '--auditoria', stdout=mock.MagicMock())
+        self.assertEqual(logs.count(), previos + 2)
+
+
+class ProfilingTest(TestCase):
+    """ProfilingMiddleware agrega por vista las peticiones perfiladas"""
+
+    def setUp(self):
+        registro.limpiar()
+        self.admin = Usuario.objects.create_user(
+            username='admin', email='admin@example.com', password='pass')
+        self.admin.groups.add(Group.objects.get(name=settings.GRUPOS.ADMINISTRADOR))
+        self.usuario = Usuario.objects.create_user(
+            username='usuario', email='usuario@example.com', password='pass')
+        self.usuario.groups.add(Group.objects.get(name=settings.GRUPOS.USUARIO))
+
+    def test_huella_ignora_parametros_y_tamano_de_in(self):
+        self.assertEqual(
+            huella('SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21'),
+            huella('SELECT * FROM t WHERE id IN (%s) LIMIT 10'),
+        )
+
+    def test_sin_muestreo_ni_cabecera_no_perfila(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('espacios'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(registro.resumen(), {})
+
+    def test_cabecera_de_admin(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('espacios'), headers={'X-Profile': '1'})
+        self.assertIn('sql;dur=', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+
+        vista = registro.resumen()['espacios']
+        self.assertEqual(vista['peticiones'], 1)
+        self.assertEqual(sum(vista['consultas']['cubetas'].values()), 1)
+        self.assertEqual(sum(vista['render_ms']['cubetas'].values()), 1)
+
+    def test_cabecera_ignorada_para_otros_roles(self):
+        self.client.force_login(self.usuario)
+        response = self.client.get(reverse('reserva'), headers={'X-Profile': '1'})
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(registro.resumen(), {})
+
+    @override_settings(PROFILING_MUESTREO=1)
+    def test_muestreo_y_consultas_repetidas(self):
+        Usuario.objects.create_user(username='otro', email='otro@example.com', password='pass')
+        self.client.force_login(self.admin)
+        self.client.get(reverse('usuarios'))
+        self.assertIn('usuarios', registro.resumen())
+
+        # Una vista con N+1 (consultas iguales salvo el parámetro) aparece en "repetidas"
+        perfil = Perfil()
+        for pk in range(3):
+            perfil.registrar_consulta(lambda *args: None, 'SELECT * FROM t WHERE id = %s', (pk,), False, {})
+        registro.agregar('n_mas_1', 1.0, perfil)
+        repetidas = registro.resumen()['n_mas_1']['repetidas']
+        self.assertEqual(repetidas, [{'sql': 'SELECT * FROM t WHERE id = %s', 'ejecuciones_de_mas': 2}])
+
+    def test_endpoint_solo_administradores(self):
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(reverse('perfil')).status_code, 403)
+
+        self.client.force_login(self.admin)
+        self.client.get(reverse('espacios'), headers={'X-Profile': '1'})
+        datos = self.client.get(reverse('perfil')).json()
+        self.assertIn('espacios', datos['vistas'])
+        self.client.post(reverse('perfil'))
+        self.assertEqual(registro.resumen(), {})
+
+
+class PlanCargaTest(TestCase):
+    """Las tablas cargan las relaciones de sus columnas con un número fijo de consultas por página"""
+
+    def setUp(self):
+        ubicacion = Ubicacion.objects.create(nombre='Sede Central')
+        self.admin = Usuario.objects.create_user(
+            username='admin', email='admin@example.com', password='pass')
+        self.admin.groups.add(Group.objects.get(name=settings.GRUPOS.ADMINISTRADOR))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.crear_datos(ubicacion)
+        self.client.force_login(self.admin)
+
+    def crear_datos(self, ubicacion):
+        fecha = date.today() + timedelta(days=1)
+        for i in range(12):
+            usuario = Usuario.objects.create_user(
+                username=f'u{i}', email=f'u{i}@example.com', password='pass', ubicacion=ubicacion, piso=1)
+            usuario.groups.add(Group.objects.get(name=settings.GRUPOS.USUARIO))
+            espacio = Espacio.objects.create(nombre=f'Salon{i}', ubicacion=ubicacion, piso=i % 3,
+                                             capacidad=30, tipo=Espacio.Tipo.SALON)
+            # Cada log con su actor, para que el administrador los vea
+            with set_actor(usuario):
+                Reserva.objects.create(
+                    usuario=usuario, espacio=espacio, fecha_uso=fecha, hora_inicio=time(8, 0),
+                    hora_fin=time(9, 0), motivo='Reunión', aprobado_por=self.admin if i % 2 else None,
+                    estado=Reserva.Estado.APROBADA if i % 2 else Reserva.Estado.PENDIENTE)
+
+    def test_plan_desde_cols(self):
+        self.assertEqual(ReservaListView.plan_de_carga(),
+                         (['usuario', 'espacio__ubicacion', 'aprobado_por'], []))
+        self.assertEqual(UsuarioListView.plan_de_carga(), (['ubicacion'], []))
+        self.assertEqual(LogListView.plan_de_carga(), (['actor'], []))
+
+    def test_relaciones_a_muchos_con_prefetch(self):
+        class Vista(ListCrudMixin):
+            model = Usuario
+            cols = {'username': 'Usuario', 'groups': 'Grupos', 'ubicacion': 'Ubicación'}
+
+        self.assertEqual(Vista.plan_de_carga(), (['ubicacion'], ['groups']))
+
+    def test_consultas_independientes_del_tamano_de_pagina(self):
+        for nombre, vista in [('reserva', ReservaListView), ('usuarios', UsuarioListView),
+                              ('espacios', EspacioListView), ('log', LogListView)]:
+            # Primera petición: calienta lo que se memoriza por proceso (plantillas, navlinks...)
+            self.client.get(reverse(nombre))
+            consultas = []
+            for tamano in (2, 10):
+                with mock.patch.object(vista, 'paginate_by', tamano), \
+                        CaptureQueriesContext(connection) as capturadas:
+                    response = self.client.get(reverse(nombre))
+                self.assertEqual(len(response.context['object_list']), tamano, nombre)
+                consultas.append(len(capturadas))
+            self.assertEqual(consultas[0], consultas[1], nombre)
+
+
+class ColumnasTest(TestCase):
+    """render_row reproduce las celdas de get_td_html con las columnas compiladas una vez"""
+
+    def setUp(self):
+        ubicacion = Ubicacion.objects.create(nombre='Sede Central')
+        self.usuario = Usuario.objects.create_user(
+            username='usuario', email='usuario@example.com', password='pass')
+        espacio = Espacio.objects.create(nombre='Salon con nombre largo', ubicacion=ubicacion, piso=1,
+                                         capacidad=30, tipo=Espacio.Tipo.SALON)
+        fecha = date.today() + timedelta(days=1)
+        self.reservas = [
+            Reserva.objects.create(usuario=self.usuario, espacio=espacio, fecha_uso=fecha + timedelta(days=i),
+                                   hora_inicio=time(8, 0), hora_fin=time(9, 0),
+                                   motivo='<b>Reunión</b>', estado=estado,
+                                   aprobado_por=self.usuario if estado != Reserva.Estado.PENDIENTE else None)
+            for i, estado in enumerate(Reserva.Estado.values)
+        ]
+        self.contexto = {'cols': ReservaListView.cols, 'crud_urls': ReservaListView.crud_urls}
+
+    def renderizar(self, fuente, **contexto):
+        plantilla = engines['django'].from_string('{% load utils %}' + fuente)
+        return plantilla.render({**self.contexto, **contexto})
+
+    def test_misma_salida_que_por_celda(self):
+        por_celda = self.renderizar(
+            '{% for obj in reservas %}{% for col in cols %}'
+            '<td class="py-4"><div class="text-sm text-base-content">{% get_td_html obj col %}</div></td>'
+            '{% endfor %}{% endfor %}', reservas=self.reservas)
+        por_fila = self.renderizar('{% for obj in reservas %}{% render_row obj %}{% endfor %}',
+                                   reservas=self.reservas)
+        self.assertEqual(por_fila, por_celda)
+        self.assertIn(reverse('reserva_view', args=[self.reservas[0].pk]), por_fila)
+        self.assertIn('Salon con nombr...', por_fila)
+
+    def test_url_de_detalle_resuelta_una_vez(self):
+        compilar_columna.cache_clear()
+        with mock.patch('apps.core.columns.reverse', wraps=reverse) as resolver:
+            html = self.renderizar('{% for obj in reservas %}{% render_row obj %}{% endfor %}',
+                                   reservas=self.reservas)
+        self.assertEqual(resolver.call_count, 1)
+        for reserva in self.reservas:
+            self.assertIn(f'hx-get={reverse("reserva_view", args=[reserva.pk])} ', html)
+
+    def test_atributo_ausente_muestra_el_objeto(self):
+        # Sin la anotación group de UsuarioListView
+        celda = compilar_columna(Usuario, 'group')(self.usuario)
+        self.assertEqual(celda, 'usuario')
+
+
+class PerfilSQLiteTest(TestCase):
+    """Cada conexión de SQLite abre con los PRAGMAs de SQLITE_PRAGMAS y transacciones IMMEDIATE"""
+
+    def test_pragmas_aplicados(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Perfil exclusivo de SQLite')
+        with connection.cursor() as cursor:
+            for pragma, esperado in [('synchronous', 1), ('busy_timeout', 20000),
+                                     ('cache_size', -20000), ('temp_store', 2)]:
+                cursor.execute(f'PRAGMA {pragma}')
+                self.assertEqual(cursor.fetchone()[0], esperado, pragma)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_sin_conexiones_persistentes_por_defecto(self):
+        # Solo config/wsgi.py las activa: bajo ASGI quedarían abiertas en hilos que no vuelven a usarse
+        if 'DJANGO_CONN_MAX_AGE' in os.environ:
+            self.skipTest('DJANGO_CONN_MAX_AGE definido en el entorno')
+        self.assertEqual(settings.DATABASES['default']['CONN_MAX_AGE'], 0)
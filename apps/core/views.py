@@ -1,3 +1,22 @@
-from django.shortcuts import render
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import JsonResponse
+from django.views import View
 
-# Create your views here.
+from apps.core.profiling import registro
+
+
+class PerfilView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Agregados de ProfilingMiddleware por vista, en JSON (solo administradores).
+    Un POST los reinicia.
+    """
+
+    def test_func(self):
+        return self.request.user.is_admin
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({'vistas': registro.resumen()}, json_dumps_params={'ensure_ascii': False})
+
+    def post(self, request, *args, **kwargs):
+        registro.limpiar()
+        return JsonResponse({'vistas': {}})
@@ -1,10 +1,10 @@
 import django_filters
+from apps.core.search import BusquedaFilter
 from django import forms
 from apps.usuarios.models import Ubicacion
 class EspacioFilter(django_filters.FilterSet):
-    nombre = django_filters.CharFilter(
+    nombre = BusquedaFilter(
         field_name='nombre',
-        lookup_expr='icontains',
         label='Nombre',
         widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Buscar por nombre...', 'id': 'nombre_filter'})
 
@@ -1,6 +1,6 @@
 from django import forms
-from apps.reservas.models import Espacio, Reserva 
-from django.utils import timezone
+from apps.reservas.models import Espacio
+from apps.reservas.bulk import rechazar_reservas_espacio
 
 class EspacioCreateForm(forms.ModelForm):
     class Meta:
@@ -40,19 +40,9 @@ class EspacioUpdateForm(EspacioCreateForm):
         if (self.initial_disponible and 
             not self.cleaned_data.get('disponible', True)):
             
-            # Obtener reservas futuras pendientes y aprobadas
-            reservas_afectadas = Reserva.objects.filter(
-                fecha_uso__gte=timezone.now().date(),
-                espacio=espacio.id,
-                estado__in=[Reserva.Estado.PENDIENTE, Reserva.Estado.APROBADA]
-            )
-            
-            # Actualizar cada reserva individualmente para que se registre en audit log
-            for reserva in reservas_afectadas:
-                reserva.estado = Reserva.Estado.RECHAZADA
-                reserva.aprobado_por = self.request.user
-                reserva.motivo_admin = 'El espacio no se encuentra disponible'
-                reserva.save()  
+            # Rechaza en bloque las reservas futuras pendientes y aprobadas
+            # (un UPDATE + logs de auditoría con bulk_create)
+            rechazar_reservas_espacio(espacio, self.request.user)
             
         if commit:
             espacio.save()
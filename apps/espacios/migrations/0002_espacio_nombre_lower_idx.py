@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 11:46
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('espacios', '0001_initial'),
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='espacio',
+            index=models.Index(django.db.models.functions.text.Lower('nombre'), name='espacio_nombre_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 11:53
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('espacios', '0002_espacio_nombre_lower_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='espacio',
+            index=models.Index(django.db.models.functions.text.Lower('tipo'), name='espacio_tipo_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 13:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('espacios', '0003_espacio_tipo_lower_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='espacio',
+            name='espacio_tipo_lower_idx',
+        ),
+    ]
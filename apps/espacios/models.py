@@ -1,5 +1,6 @@
 from django.db import models
 from django.db.models import Q
+from django.db.models.functions import Lower
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from apps.usuarios.models import Ubicacion, Usuario
 
@@ -42,6 +43,8 @@ class Espacio(models.Model):
         ordering = ['ubicacion', 'piso', 'nombre']
         indexes = [
             models.Index(fields=['ubicacion', 'piso']),
+            # Búsqueda por prefijo sin distinguir mayúsculas (autocompletado)
+            models.Index(Lower('nombre'), name='espacio_nombre_lower_idx'),
         ]
         constraints = [
             models.CheckConstraint(
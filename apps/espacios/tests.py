@@ -1,3 +1,130 @@
-from django.test import TestCase
+import csv
+from datetime import date, time, timedelta
 
-# Create your tests here.
+from auditlog.context import set_actor
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import Sum
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.espacios.models import Espacio
+from apps.espacios.forms import EspacioUpdateForm
+from apps.espacios.views import EspacioListView
+from apps.reservas.models import Reserva, ReservaDailyRollup
+from apps.usuarios.models import Ubicacion, Usuario
+
+
+class ExportCsvTest(TestCase):
+    """La exportación CSV se genera en streaming con las FK resueltas"""
+
+    def setUp(self):
+        self.admin = Usuario.objects.create_user(
+            username='admin', email='admin@example.com', password='pass')
+        self.admin.groups.add(Group.objects.get(name=settings.GRUPOS.ADMINISTRADOR))
+        ubicaciones = [Ubicacion.objects.create(nombre=f'Sede {i}') for i in range(3)]
+        for i in range(7):
+            Espacio.objects.create(
+                nombre=f'Salon{i}', ubicacion=ubicaciones[i % 3], piso=1,
+                capacidad=30, tipo=Espacio.Tipo.SALON)
+        self.client.force_login(self.admin)
+
+    def test_exporta_todas_las_filas(self):
+        url = reverse('espacios') + '?export=csv&ordering=nombre'
+        response = self.client.get(url)
+
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+
+        filas = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(filas[0], ['ID', 'Nombre', 'Tipo', 'Capacidad', 'Ubicación', 'Piso', 'Disponible'])
+        self.assertEqual(len(filas), 8)
+        self.assertEqual(filas[1][1:], ['Salon0', 'salon', '30', 'Sede 0', '1', 'True'])
+
+    def test_fk_resueltas_por_lote(self):
+        vista = EspacioListView()
+        with self.assertNumQueries(2):
+            # Una consulta para las filas y otra para todas las ubicaciones del lote
+            lineas = list(vista._filas_csv(Espacio.objects.all(), ['id', 'ubicacion']))
+        self.assertEqual(len(lineas), 8)
+
+    def test_nombres_acotados_al_lote(self):
+        vista = EspacioListView()
+        vista.export_chunk_size = 2
+        qs = Espacio.objects.order_by('pk')
+        with self.assertNumQueries(5):
+            # Filas + una consulta por lote: las sedes de cada lote son {0, 1}, {2, 0},
+            # {1, 2} y {0}, y solo se reutilizan las que traía el lote anterior
+            lineas = list(vista._filas_csv(qs, ['nombre', 'ubicacion']))
+        self.assertEqual(
+            [linea.strip() for linea in lineas[1:]],
+            [f'Salon{i},Sede {i % 3}' for i in range(7)])
+
+
+class RechazoMasivoTest(TestCase):
+    """Deshabilitar un espacio rechaza sus reservas futuras en bloque"""
+
+    def setUp(self):
+        self.admin = Usuario.objects.create_user(
+            username='admin', email='admin@example.com', password='pass')
+        self.admin.groups.add(Group.objects.get(name=settings.GRUPOS.ADMINISTRADOR))
+        self.usuario = Usuario.objects.create_user(
+            username='usuario', email='usuario@example.com', password='pass')
+        self.usuario.groups.add(Group.objects.get(name=settings.GRUPOS.USUARIO))
+        self.espacio = Espacio.objects.create(
+            nombre='Auditorio', ubicacion=Ubicacion.objects.create(nombre='Sede'), piso=1,
+            capacidad=300, tipo=Espacio.Tipo.AUDITORIO)
+
+        hoy = date.today()
+        self.reservas = [
+            Reserva.objects.create(
+                usuario=self.usuario, espacio=self.espacio, fecha_uso=hoy + timedelta(days=i + 1),
+                hora_inicio=time(8, 0), hora_fin=time(9, 0), motivo='Clase',
+                estado=Reserva.Estado.APROBADA if i % 2 else Reserva.Estado.PENDIENTE,
+                aprobado_por=self.admin if i % 2 else None)
+            for i in range(30)
+        ]
+        # Una reserva pasada no se toca
+        Reserva.objects.bulk_create([Reserva(
+            usuario=self.usuario, espacio=self.espacio, fecha_uso=hoy - timedelta(days=1),
+            ubicacion=self.espacio.ubicacion, piso=self.espacio.piso,
+            hora_inicio=time(8, 0), hora_fin=time(9, 0), motivo='Clase')])
+
+    def deshabilitar(self):
+        form = EspacioUpdateForm(
+            data={'nombre': 'Auditorio', 'ubicacion': self.espacio.ubicacion_id, 'piso': 1,
+                  'capacidad': 300, 'tipo': Espacio.Tipo.AUDITORIO, 'disponible': False},
+            instance=self.espacio, request=RequestFactory().get('/'))
+        form.request.user = self.admin
+        self.assertTrue(form.is_valid(), form.errors)
+        with set_actor(self.admin):
+            form.save()
+
+    def test_rechaza_con_logs_y_consultas_fijas(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.deshabilitar()
+        # El número de consultas no depende de cuántas reservas se rechazan
+        self.assertLess(len(ctx), len(self.reservas))
+
+        reservas = Reserva.objects.filter(espacio=self.espacio)
+        self.assertEqual(reservas.filter(estado=Reserva.Estado.RECHAZADA).count(), 30)
+        self.assertEqual(reservas.filter(estado=Reserva.Estado.PENDIENTE).count(), 1)
+
+        logs = LogEntry.objects.filter(
+            content_type=ContentType.objects.get_for_model(Reserva), action=LogEntry.Action.UPDATE)
+        self.assertEqual(logs.count(), 30)
+        log = logs.filter(changes__has_key='aprobado_por').first()
+        self.assertEqual(log.actor, self.admin)
+        self.assertEqual(log.changes_dict['estado'][1], 'rechazada')
+        self.assertEqual(log.visibilidad.aprobado_por_pk, self.admin.pk)
+
+        self.assertEqual(
+            ReservaDailyRollup.objects.filter(espacio=self.espacio, estado='rechazada')
+            .aggregate(total=Sum('total'))['total'], 30)
+        self.assertFalse(
+            ReservaDailyRollup.objects.filter(espacio=self.espacio, total__gt=0)
+            .exclude(estado='rechazada').exists())
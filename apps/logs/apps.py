@@ -16,4 +16,5 @@ class LogsConfig(AppConfig):
         auditlog.register(Usuario, exclude_fields=['password', 'last_login'])
         auditlog.register(Espacio)
         auditlog.register(Ubicacion)
+        import apps.logs.signals
         
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""
+Enriquecimiento de logs en lote
+
+Construye los mensajes legibles de una página de LogEntry (dashboard, detalle)
+cargando de una vez todo lo que necesitan: el actor y el content type con
+select_related, y las instancias referenciadas con una consulta por tipo.
+
+* cargar_instancias: instancias referenciadas por los logs, agrupadas por content type
+* construir_mensaje: dict con label, description, icono y clases de un log
+* enriquecer_logs: mensajes ya construidos para una lista/queryset de logs
+"""
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import QuerySet
+
+# Relaciones que usa construir_mensaje por modelo; se cargan con select_related
+RELACIONES = {
+    'reserva': ('espacio', 'usuario'),
+}
+
+
+def articulo(modelo):
+    femeninos = ["reserva", "información", "actividad"]
+    return "la" if modelo in femeninos else "el"
+
+
+def estado_verb(estado):
+    estado = estado.lower()
+    if estado == "aprobada":
+        return "aprobó"
+    elif estado == "rechazada":
+        return "rechazó"
+    elif estado == "pendiente":
+        return "marcó como pendiente"
+    return f"cambió el estado a {estado}"
+
+
+def cargar_instancias(entries):
+    """
+    Obtiene las instancias referenciadas por los logs con una consulta por content type.
+
+    Retorna:
+        dict: {(content_type_id, object_pk): instancia}; los objetos ya eliminados no aparecen.
+    """
+    pks_por_tipo = defaultdict(set)
+    for entry in entries:
+        pks_por_tipo[entry.content_type_id].add(entry.object_pk)
+
+    instancias = {}
+    for ct_id, pks in pks_por_tipo.items():
+        model_class = ContentType.objects.get_for_id(ct_id).model_class()
+        if model_class is None:
+            continue
+        pk_field = model_class._meta.pk
+        validos = {}
+        for pk in pks:
+            try:
+                validos[pk_field.to_python(pk)] = pk
+            except Exception:
+                continue
+        qs = model_class._default_manager.select_related(
+            *RELACIONES.get(model_class._meta.model_name, ())
+        )
+        for pk, instancia in qs.in_bulk(list(validos)).items():
+            instancias[(ct_id, validos[pk])] = instancia
+    return instancias
+
+
+def _descripcion_reserva(instance, obj_repr):
+    if not instance:
+        return obj_repr
+    espacio = getattr(instance, "espacio", None)
+    usuario = getattr(instance, "usuario", None)
+    nombre_esp = getattr(espacio, "nombre", "") if espacio else ""
+    nombre_usr = getattr(usuario, "username", "") if usuario else ""
+    return f"{nombre_esp} - {nombre_usr}" if (nombre_esp or nombre_usr) else obj_repr
+
+
+def construir_mensaje(logEntry, instance=None):
+    """
+    Devuelve un dict con keys: label, description, icon_class, bg_class, text_class, timestamp, full_message.
+
+    `instance` es el objeto referenciado por el log (o None si ya no existe).
+    """
+    # Actor
+    actor_name = logEntry.actor.username if logEntry.actor else None
+    actor_display = f'"{actor_name}"' if actor_name else "Alguien"
+
+    # Modelo en minúsculas
+    model = ContentType.objects.get_for_id(logEntry.content_type_id).model.lower()
+    obj_repr = logEntry.object_repr  # texto genérico
+    action = logEntry.action
+
+    result = {
+        "label": "",
+        "description": "",
+        "icon_class": "",
+        "bg_class": "",
+        "text_class": "",
+        "timestamp": logEntry.timestamp,
+        "full_message": "",
+    }
+
+    if action == 0:  # CREATE
+        if model == "reserva":
+            result["label"] = "Nueva reserva"
+            result["icon_class"] = "fa-plus"
+            result["bg_class"] = "info"
+            result["text_class"] = "info-content"
+            result["description"] = _descripcion_reserva(instance, obj_repr)
+            result["full_message"] = f"{actor_display} creó reserva \"{obj_repr}\""
+        elif model == "usuario":
+            result["label"] = "Usuario creado"
+            result["icon_class"] = "fa-user-plus"
+            result["bg_class"] = "warning"
+            result["text_class"] = "warning-content"
+            if instance:
+                desc = getattr(instance, "username", "")
+                grupo = getattr(instance, "group", "")
+                if grupo:
+                    desc += f" - {grupo}"
+                result["description"] = desc
+            else:
+                result["description"] = obj_repr
+            result["full_message"] = f"{actor_display} creó usuario \"{obj_repr}\""
+        else:
+            # Otros modelos: genérico
+            result["label"] = f"Nueva {model}" if model in ["reserva", "actividad"] else f"Nuevo {model}"
+            result["icon_class"] = "fa-plus"
+            result["bg_class"] = "info"
+            result["text_class"] = "info-content"
+            result["description"] = obj_repr
+            result["full_message"] = f"{actor_display} creó {articulo(model)} {model} \"{obj_repr}\""
+
+    elif action == 1:  # UPDATE
+        changes = getattr(logEntry, "changes_dict", {})
+        if model == "reserva" and "estado" in changes:
+            nuevo_estado = changes["estado"][1]
+            # Si cambia a aprobada o rechazada
+            if nuevo_estado.lower() == "aprobada":
+                result["label"] = "Reserva aprobada"
+                result["icon_class"] = "fa-check"
+                result["bg_class"] = "success"
+                result["text_class"] = "success-content"
+            elif nuevo_estado.lower() == "rechazada":
+                result["label"] = "Reserva rechazada"
+                result["icon_class"] = "fa-times"
+                result["bg_class"] = "error"
+                result["text_class"] = "error-content"
+            else:
+                result["label"] = "Cambio de estado"
+                result["icon_class"] = "fa-exchange-alt"
+                result["bg_class"] = "warning"
+                result["text_class"] = "warning-content"
+            result["description"] = _descripcion_reserva(instance, obj_repr)
+            result["full_message"] = f"{actor_display} {estado_verb(nuevo_estado)} la reserva \"{obj_repr}\""
+
+        elif model == "espacio" and "disponible" in changes:
+            nuevo_disponible = changes["disponible"][1]
+            if nuevo_disponible:
+                result["label"] = "Espacio disponible"
+                result["icon_class"] = "fa-check"
+                result["bg_class"] = "success"
+                result["text_class"] = "success-content"
+            else:
+                result["label"] = "Espacio no disponible"
+                result["icon_class"] = "fa-times"
+                result["bg_class"] = "error"
+                result["text_class"] = "error-content"
+            result["description"] = obj_repr
+            result["full_message"] = f"{actor_display} {estado_verb(nuevo_disponible)} el espacio \"{obj_repr}\""
+
+        else:
+            # UPDATE genérico
+            if model == "reserva":
+                result["label"] = "Reserva actualizada"
+                result["description"] = _descripcion_reserva(instance, obj_repr)
+            elif model == "usuario":
+                result["label"] = "Usuario actualizado"
+                result["description"] = getattr(instance, "username", "") if instance else obj_repr
+            else:
+                result["label"] = f"{model.capitalize()} actualizado"
+                result["description"] = obj_repr
+            result["icon_class"] = "fa-edit"
+            result["bg_class"] = "info"
+            result["text_class"] = "info-content"
+            result["full_message"] = f"{actor_display} actualizó la información de {articulo(model)} {model} \"{obj_repr}\""
+
+    elif action == 2:  # DELETE
+        if model == "reserva":
+            result["label"] = "Reserva eliminada"
+            result["icon_class"] = "fa-times"
+            result["description"] = _descripcion_reserva(instance, obj_repr)
+        elif model == "usuario":
+            result["label"] = "Usuario eliminado"
+            result["icon_class"] = "fa-user-times"
+            result["description"] = getattr(instance, "username", "") if instance else obj_repr
+        else:
+            result["label"] = f"{model.capitalize()} eliminado"
+            result["icon_class"] = "fa-times"
+            result["description"] = obj_repr
+        result["bg_class"] = "error"
+        result["text_class"] = "error-content"
+        result["full_message"] = f"{actor_display} eliminó {articulo(model)} {model} \"{obj_repr}\""
+
+    else:
+        # Acción desconocida
+        result["label"] = f"Acción en {model}"
+        result["icon_class"] = "fa-question"
+        result["bg_class"] = "warning"
+        result["text_class"] = "warning-content"
+        result["description"] = obj_repr
+        result["full_message"] = f"{actor_display} realizó una acción desconocida sobre {model} \"{obj_repr}\""
+
+    return result
+
+
+def enriquecer_logs(entries):
+    """
+    Construye los mensajes de una página de logs con un número fijo de consultas
+    (los logs con su actor + una consulta por content type referenciado).
+
+    Retorna:
+        list: un dict por log (ver construir_mensaje) con la clave extra 'entry'.
+    """
+    if isinstance(entries, QuerySet):
+        entries = entries.select_related('actor')
+    entries = list(entries)
+
+    instancias = cargar_instancias(entries)
+    return [
+        {
+            **construir_mensaje(entry, instancias.get((entry.content_type_id, entry.object_pk))),
+            'entry': entry,
+        }
+        for entry in entries
+    ]
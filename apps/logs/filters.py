@@ -1,12 +1,12 @@
 from auditlog.models import LogEntry
 from django_filters import  FilterSet
 from django import forms
-from django_filters import CharFilter, DateFilter, ChoiceFilter
+from django_filters import DateFilter, ChoiceFilter
+from apps.core.search import BusquedaFilter
 
 class LogFilter(FilterSet):
-    actor = CharFilter(
+    actor = BusquedaFilter(
         field_name='actor__username',
-        lookup_expr='icontains',
         label='Usuario',
         widget=forms.TextInput(attrs={
             'class': 'form-control',
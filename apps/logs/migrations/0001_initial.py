@@ -0,0 +1,77 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def poblar_visibilidad(apps, schema_editor):
+    LogEntry = apps.get_model('auditlog', 'LogEntry')
+    LogVisibilidad = apps.get_model('logs', 'LogVisibilidad')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Reserva = apps.get_model('reservas', 'Reserva')
+    UsuarioGroups = apps.get_model('usuarios', 'Usuario').groups.through
+
+    grupos = {}
+    for usuario_id, nombre in UsuarioGroups.objects.order_by('-group_id').values_list('usuario_id', 'group__name'):
+        grupos[usuario_id] = nombre
+
+    claves = {
+        fila[0]: fila for fila in Reserva.objects.values_list(
+            'pk', 'espacio_id', 'usuario_id', 'aprobado_por_id', 'espacio__ubicacion_id', 'espacio__piso')
+    }
+    ct_reserva = ContentType.objects.filter(app_label='reservas', model='reserva').values_list('pk', flat=True).first()
+
+    filas = []
+    logs = LogEntry.objects.order_by('pk').values_list('pk', 'actor_id', 'content_type_id', 'object_id')
+    for pk, actor_id, ct_id, object_id in logs.iterator():
+        fila = LogVisibilidad(log_id=pk, actor_pk=actor_id, actor_grupo=grupos.get(actor_id))
+        if ct_id == ct_reserva and object_id is not None:
+            fila.reserva_pk = object_id
+            if object_id in claves:
+                _, fila.espacio_pk, fila.usuario_pk, fila.aprobado_por_pk, fila.ubicacion_pk, fila.piso = claves[object_id]
+        filas.append(fila)
+        if len(filas) >= 1000:
+            LogVisibilidad.objects.bulk_create(filas)
+            filas = []
+    LogVisibilidad.objects.bulk_create(filas)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auditlog', '0017_add_actor_email'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('reservas', '0002_reservadailyrollup'),
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogVisibilidad',
+            fields=[
+                ('log', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='visibilidad', serialize=False, to='auditlog.logentry')),
+                ('actor_pk', models.BigIntegerField(blank=True, null=True)),
+                ('actor_grupo', models.CharField(blank=True, max_length=150, null=True)),
+                ('reserva_pk', models.BigIntegerField(blank=True, null=True)),
+                ('espacio_pk', models.BigIntegerField(blank=True, null=True)),
+                ('usuario_pk', models.BigIntegerField(blank=True, null=True)),
+                ('aprobado_por_pk', models.BigIntegerField(blank=True, null=True)),
+                ('ubicacion_pk', models.BigIntegerField(blank=True, null=True)),
+                ('piso', models.PositiveSmallIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Visibilidad de log',
+                'verbose_name_plural': 'Visibilidad de logs',
+                'indexes': [
+                    models.Index(fields=['actor_pk'], name='logvis_actor_idx'),
+                    models.Index(fields=['actor_grupo'], name='logvis_actor_grupo_idx'),
+                    models.Index(fields=['reserva_pk'], name='logvis_reserva_idx'),
+                    models.Index(fields=['espacio_pk'], name='logvis_espacio_idx'),
+                    models.Index(fields=['usuario_pk'], name='logvis_usuario_idx'),
+                    models.Index(fields=['aprobado_por_pk'], name='logvis_aprobado_por_idx'),
+                    models.Index(fields=['ubicacion_pk', 'piso'], name='logvis_ubicacion_piso_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(poblar_visibilidad, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generada por "python manage.py indices_ordenamiento --migracion logs"
+# Índices Lower() para el ordenamiento de las tablas (ver apps.core.ordering).
+# Solo tocan la base de datos: no forman parte del estado de los modelos.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditlog', '0017_add_actor_email'),
+        ('logs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX "logentry_object_repr_lower_idx" ON "auditlog_logentry" ((LOWER("object_repr")))',
+            reverse_sql='DROP INDEX "logentry_object_repr_lower_idx"',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Recalcula actor_grupo con todos los grupos del actor (ver visibility.grupo_visible):
+# antes se guardaba solo el grupo principal.
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations
+
+
+def recalcular_grupos(apps, schema_editor):
+    LogVisibilidad = apps.get_model('logs', 'LogVisibilidad')
+    UsuarioGroups = apps.get_model('usuarios', 'Usuario').groups.through
+
+    nombres = defaultdict(list)
+    for usuario_id, nombre in UsuarioGroups.objects.order_by('group_id').values_list('usuario_id', 'group__name'):
+        nombres[usuario_id].append(nombre)
+
+    for usuario_id, grupos in nombres.items():
+        grupo = next(
+            (g for g in (settings.GRUPOS.MODERADOR, settings.GRUPOS.USUARIO) if g in grupos),
+            grupos[0],
+        )
+        LogVisibilidad.objects.filter(actor_pk=usuario_id).exclude(actor_grupo=grupo).update(actor_grupo=grupo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logs', '0002_indices_ordenamiento'),
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(recalcular_grupos, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,41 @@
+from auditlog.models import LogEntry
 from django.db import models
 
-# Create your models here.
+
+class LogVisibilidad(models.Model):
+    """
+    Claves de visibilidad de un LogEntry (quién lo hizo y, si es de una reserva,
+    a qué usuario, moderador, ubicación y piso pertenece).
+
+    Se desnormalizan al escribir el log (ver visibility.py) para que get_logs
+    filtre solo por columnas indexadas en lugar de subconsultas y joins.
+    """
+    log = models.OneToOneField(
+        LogEntry, on_delete=models.CASCADE, primary_key=True, related_name='visibilidad'
+    )
+    actor_pk = models.BigIntegerField(null=True, blank=True)
+    actor_grupo = models.CharField(max_length=150, null=True, blank=True)
+
+    # Solo para logs de reservas: últimas claves conocidas de la reserva
+    reserva_pk = models.BigIntegerField(null=True, blank=True)
+    espacio_pk = models.BigIntegerField(null=True, blank=True)
+    usuario_pk = models.BigIntegerField(null=True, blank=True)
+    aprobado_por_pk = models.BigIntegerField(null=True, blank=True)
+    ubicacion_pk = models.BigIntegerField(null=True, blank=True)
+    piso = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Visibilidad de log"
+        verbose_name_plural = "Visibilidad de logs"
+        indexes = [
+            models.Index(fields=['actor_pk'], name='logvis_actor_idx'),
+            models.Index(fields=['actor_grupo'], name='logvis_actor_grupo_idx'),
+            models.Index(fields=['reserva_pk'], name='logvis_reserva_idx'),
+            models.Index(fields=['espacio_pk'], name='logvis_espacio_idx'),
+            models.Index(fields=['usuario_pk'], name='logvis_usuario_idx'),
+            models.Index(fields=['aprobado_por_pk'], name='logvis_aprobado_por_idx'),
+            models.Index(fields=['ubicacion_pk', 'piso'], name='logvis_ubicacion_piso_idx'),
+        ]
+
+    def __str__(self):
+        return f"LOG:{self.log_id} | ACTOR:{self.actor_pk} | RES:{self.reserva_pk}"
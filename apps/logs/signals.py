@@ -0,0 +1,44 @@
+from auditlog.models import LogEntry
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from apps.espacios.models import Espacio
+from apps.logs import visibility
+from apps.reservas.models import Reserva
+from apps.usuarios.models import Usuario
+
+
+@receiver(post_save, sender=LogEntry)
+def registrar_visibilidad_log(sender, instance, raw=False, **kwargs):
+    if not raw:
+        visibility.registrar_visibilidad([instance])
+
+
+@receiver(post_save, sender=Reserva)
+def actualizar_visibilidad_reserva(sender, instance, created, raw=False, **kwargs):
+    # Una reserva nueva aún no tiene logs previos que actualizar
+    if not created and not raw:
+        visibility.actualizar_reservas([instance.pk])
+
+
+@receiver(post_save, sender=Espacio)
+def actualizar_visibilidad_espacio(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        visibility.actualizar_espacio(instance)
+
+
+@receiver(m2m_changed, sender=Usuario.groups.through)
+def actualizar_visibilidad_grupos(sender, instance, action, reverse, pk_set, **kwargs):
+    """Mantiene el grupo del actor guardado en sus logs al cambiar sus grupos."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            visibility.actualizar_grupo_actores([instance.pk])
+        return
+
+    # Desde el grupo: al limpiar no llega pk_set, así que se guardan antes
+    if action == 'pre_clear':
+        instance._actores_afectados = list(instance.user_set.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        visibility.actualizar_grupo_actores(getattr(instance, '_actores_afectados', []))
+    elif action in ('post_add', 'post_remove'):
+        visibility.actualizar_grupo_actores(list(pk_set or ()))
@@ -1,3 +1,232 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+from auditlog.context import auditlog_value, set_actor
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.middleware import AuditlogMiddleware
+from apps.core.templatetags.utils import get_message
+from apps.espacios.models import Espacio
+from apps.logs.enrichment import enriquecer_logs
+from apps.logs.views import LogListView
+from apps.reservas.models import Reserva
+from apps.usuarios.models import Ubicacion, Usuario
+from library.utils.utils import get_logs
+
+
+class LogCursorPaginationTest(TestCase):
+    """La lista de logs se pagina por cursor sin saltos ni repeticiones"""
+
+    def setUp(self):
+        self.admin = Usuario.objects.create_user(
+            username='admin', email='admin@example.com', password='pass')
+        self.admin.groups.add(Group.objects.get(name=settings.GRUPOS.ADMINISTRADOR))
+        LogEntry.objects.all().delete()
+
+        ct = ContentType.objects.get_for_model(Ubicacion)
+        ahora = timezone.now()
+        # Recursos y fechas repetidos para forzar empates en la clave de orden
+        for i in range(25):
+            LogEntry.objects.create(
+                content_type=ct, object_pk=str(i), object_id=i,
+                object_repr=f'Sede {i % 4}', action=LogEntry.Action.CREATE,
+                actor=self.admin, timestamp=ahora - timedelta(minutes=i // 3),
+            )
+        self.client.force_login(self.admin)
+
+    def recorrer(self, ordering=''):
+        url = reverse('log')
+        params = {'ordering': ordering} if ordering else {}
+        paginas = []
+        response = self.client.get(url, params)
+        while True:
+            page = response.context['page_obj']
+            paginas.append([obj.pk for obj in page])
+            if not page.has_next():
+                return paginas, response
+            response = self.client.get(url, {**params, 'cursor': page.next_cursor})
+
+    def test_recorre_todas_las_filas_en_orden(self):
+        for ordering, esperado in [
+            ('', LogEntry.objects.order_by('-timestamp', '-pk')),
+            ('object_repr', LogEntry.objects.order_by('object_repr', 'pk')),
+            ('-object_repr', LogEntry.objects.order_by('-object_repr', '-pk')),
+        ]:
+            paginas, _ = self.recorrer(ordering)
+            self.assertEqual([len(p) for p in paginas], [10, 10, 5])
+            self.assertEqual(sum(paginas, []), list(esperado.values_list('pk', flat=True)))
+
+    def test_pagina_anterior(self):
+        paginas, response = self.recorrer('object_repr')
+        page = response.context['page_obj']
+        response = self.client.get(reverse('log'), {'ordering': 'object_repr', 'cursor': page.previous_cursor})
+        self.assertEqual([obj.pk for obj in response.context['page_obj']], paginas[1])
+        self.assertTrue(response.context['page_obj'].has_previous())
+
+    def test_conteo_acotado_y_cursor_invalido(self):
+        response = self.client.get(reverse('log'), {'cursor': 'manipulado'})
+        self.assertEqual(response.context['cursor_total'], 25)
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+        with patch.object(LogListView, 'cursor_count_limit', 20):
+            response = self.client.get(reverse('log'))
+        self.assertEqual(response.context['cursor_total'], 20)
+        self.assertTrue(response.context['cursor_total_excede'])
+
+
+class EnriquecerLogsTest(TestCase):
+    """Los mensajes de una página de logs se construyen con consultas fijas"""
+
+    def setUp(self):
+        LogEntry.objects.all().delete()
+        ubicacion = Ubicacion.objects.create(nombre='Sede Central')
+        espacio = Espacio.objects.create(
+            nombre='Salon101', ubicacion=ubicacion, piso=1,
+            capacidad=30, tipo=Espacio.Tipo.SALON)
+        for i in range(5):
+            usuario = Usuario.objects.create_user(
+                username=f'usuario{i}', email=f'usuario{i}@example.com', password='pass')
+            Reserva.objects.create(
+                usuario=usuario, espacio=espacio, fecha_uso=date.today() + timedelta(days=i + 1),
+                hora_inicio=time(8, 0), hora_fin=time(9, 0), motivo='Reunión')
+        # Un log cuyo objeto ya no existe
+        Ubicacion.objects.create(nombre='Temporal').delete()
+
+    def test_mismos_mensajes_con_consultas_fijas(self):
+        esperado = [get_message(entry) for entry in LogEntry.objects.all()]
+
+        # logs + actor (1) y una consulta por tipo: reserva, usuario, espacio, ubicacion
+        with self.assertNumQueries(5):
+            mensajes = enriquecer_logs(LogEntry.objects.all())
+
+        self.assertEqual(len(mensajes), len(esperado))
+        for mensaje, original in zip(mensajes, esperado):
+            mensaje.pop('entry')
+            self.assertEqual(mensaje, original)
+        self.assertIn('Salon101 - usuario0', [m['description'] for m in mensajes])
+
+
+class LogVisibilidadTest(TestCase):
+    """get_logs filtra por las claves desnormalizadas de LogVisibilidad"""
+
+    def setUp(self):
+        self.sede = Ubicacion.objects.create(nombre='Sede Central')
+        self.otra_sede = Ubicacion.objects.create(nombre='Sede Norte')
+        self.admin = self.crear_usuario('admin', settings.GRUPOS.ADMINISTRADOR)
+        self.moderador = self.crear_usuario(
+            'moderador', settings.GRUPOS.MODERADOR, ubicacion=self.sede, piso=1)
+        self.usuario = self.crear_usuario('usuario', settings.GRUPOS.USUARIO)
+        self.espacio = Espacio.objects.create(
+            nombre='Salon101', ubicacion=self.sede, piso=1, capacidad=30, tipo=Espacio.Tipo.SALON)
+        self.otro_espacio = Espacio.objects.create(
+            nombre='Salon201', ubicacion=self.otra_sede, piso=2, capacidad=30, tipo=Espacio.Tipo.SALON)
+
+        with set_actor(self.usuario):
+            self.reserva = self.crear_reserva(self.espacio)
+            self.otra_reserva = self.crear_reserva(self.otro_espacio)
+
+    def crear_usuario(self, username, grupo, **kwargs):
+        usuario = Usuario.objects.create_user(
+            username=username, email=f'{username}@example.com', password='pass', **kwargs)
+        usuario.groups.add(Group.objects.get(name=grupo))
+        return usuario
+
+    def crear_reserva(self, espacio):
+        return Reserva.objects.create(
+            usuario=self.usuario, espacio=espacio, fecha_uso=date.today() + timedelta(days=1),
+            hora_inicio=time(8, 0), hora_fin=time(9, 0), motivo='Reunión')
+
+    def reservas_visibles(self, user):
+        ids = get_logs(user).filter(
+            content_type=ContentType.objects.get_for_model(Reserva)).values_list('object_id', flat=True)
+        return set(ids)
+
+    def test_alcance_por_rol(self):
+        self.assertEqual(self.reservas_visibles(self.usuario), {self.reserva.pk, self.otra_reserva.pk})
+        self.assertEqual(self.reservas_visibles(self.moderador), {self.reserva.pk})
+        self.assertEqual(self.reservas_visibles(self.admin), {self.reserva.pk, self.otra_reserva.pk})
+
+    def test_aprobar_y_mover_espacio_actualiza_visibilidad(self):
+        self.otra_reserva.aprobado_por = self.moderador
+        self.otra_reserva.estado = Reserva.Estado.APROBADA
+        self.otra_reserva.save()
+        self.assertEqual(self.reservas_visibles(self.moderador), {self.reserva.pk, self.otra_reserva.pk})
+
+        self.espacio.ubicacion = self.otra_sede
+        self.espacio.save()
+        self.assertEqual(self.reservas_visibles(self.moderador), {self.otra_reserva.pk})
+
+    def test_cambio_de_grupo_del_actor(self):
+        self.usuario.groups.set([Group.objects.get(name=settings.GRUPOS.ADMINISTRADOR)])
+        self.assertEqual(self.reservas_visibles(self.admin), set())
+
+    def test_actor_con_varios_grupos(self):
+        # El grupo principal pasa a ser administrador, pero sigue siendo usuario
+        self.usuario.groups.add(Group.objects.get(name=settings.GRUPOS.ADMINISTRADOR))
+        self.assertEqual(self.reservas_visibles(self.admin), {self.reserva.pk, self.otra_reserva.pk})
+
+        with set_actor(self.usuario):
+            self.reserva.motivo = 'Clase'
+            self.reserva.save()
+        log = LogEntry.objects.filter(object_id=self.reserva.pk).latest('pk')
+        self.assertEqual(log.visibilidad.actor_grupo, settings.GRUPOS.USUARIO)
+        self.assertTrue(get_logs(self.admin).filter(pk=log.pk).exists())
+
+    def test_eliminacion_conserva_las_ultimas_claves(self):
+        pk = self.reserva.pk
+        with set_actor(self.admin):
+            self.reserva.delete()
+        self.assertIn(pk, self.reservas_visibles(self.moderador))
+        self.assertEqual(
+            get_logs(self.usuario).filter(object_id=pk, action=LogEntry.Action.DELETE).count(), 1)
+
+
+class AuditlogMiddlewareTest(TestCase):
+    """El middleware de auditlog atribuye los logs al usuario de la petición (síncrona o asíncrona)"""
+
+    def setUp(self):
+        self.admin = Usuario.objects.create_user(
+            username='admin', email='admin@example.com', password='pass')
+        self.admin.groups.add(Group.objects.get(name=settings.GRUPOS.ADMINISTRADOR))
+
+    def test_peticion_conserva_el_actor_del_middleware(self):
+        usuario = Usuario.objects.create_user(
+            username='usuario', email='usuario@example.com', password='pass')
+        usuario.groups.add(Group.objects.get(name=settings.GRUPOS.USUARIO))
+        espacio = Espacio.objects.create(
+            nombre='Salon101', ubicacion=Ubicacion.objects.create(nombre='Sede Central'),
+            piso=1, capacidad=30, tipo=Espacio.Tipo.SALON)
+        reserva = Reserva.objects.create(
+            usuario=usuario, espacio=espacio, fecha_uso=date.today() + timedelta(days=1),
+            hora_inicio=time(8, 0), hora_fin=time(9, 0), motivo='Reunión')
+
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('reserva_approve', args=[reserva.pk]),
+                             {'estado': Reserva.Estado.APROBADA, 'motivo_admin': 'Ok'},
+                             REMOTE_ADDR='10.0.0.7')
+
+        log = LogEntry.objects.get_for_object(reserva).get(action=LogEntry.Action.UPDATE)
+        self.assertEqual(log.actor, self.admin)
+        self.assertEqual(log.remote_addr, '10.0.0.7')
+        self.assertEqual(log.changes_dict['estado'][1], Reserva.Estado.APROBADA)
+        self.assertIn(log, get_logs(usuario))
+
+    async def test_camino_asincrono_usa_auser(self):
+        async def auser():
+            return self.admin
+
+        async def vista(request):
+            return auditlog_value.get()
+
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.7')
+        request.auser = auser
+        contexto = await AuditlogMiddleware(vista)(request)
+        self.assertEqual(contexto['actor'], self.admin)
+        self.assertEqual(contexto['remote_addr'], '10.0.0.7')
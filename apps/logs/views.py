@@ -7,10 +7,10 @@ from django.contrib.contenttypes.models import ContentType
 from apps.reservas.models import *
 from library.utils.utils import get_logs
 from .filters import LogFilter
-from library.mixins.helpers import ListCrudMixin, SmartOrderingMixin
+from library.mixins.helpers import KeysetPaginationMixin, ListCrudMixin, SmartOrderingMixin
 from django_filters.views import FilterView
 
-class LogListView(LoginRequiredMixin, PermissionRequiredMixin, ListCrudMixin,  SmartOrderingMixin, FilterView ):
+class LogListView(LoginRequiredMixin, PermissionRequiredMixin, ListCrudMixin,  SmartOrderingMixin, KeysetPaginationMixin, FilterView ):
     """
     Muestra una lista de logs con un formulario de filtrado
     """
@@ -71,7 +71,7 @@ class LogListView(LoginRequiredMixin, PermissionRequiredMixin, ListCrudMixin,  S
             )
         )
 
-        return qs
+        return self.aplicar_plan_de_carga(qs)
 
 
 class LogDetailView(LoginRequiredMixin, PermissionRequiredMixin, DetailView):
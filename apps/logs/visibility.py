@@ -0,0 +1,166 @@
+"""
+Visibilidad de logs desnormalizada (LogVisibilidad)
+
+Cada LogEntry tiene una fila con las claves que deciden quién puede verlo
+(actor y su grupo; para reservas: usuario, aprobado_por, espacio, ubicación
+y piso). Así get_logs filtra por columnas indexadas en vez de hacer una
+subconsulta sobre reservas o un join con los grupos del actor.
+
+Las señales (ver signals.py) mantienen la tabla al crear logs y al modificar
+reservas, espacios o grupos de usuarios. Los caminos masivos que crean logs
+con bulk_create deben llamar a registrar_visibilidad.
+
+El grupo guardado sale de todos los grupos del actor (ver grupo_visible): a un
+actor que es moderador y usuario a la vez el administrador le ve los logs
+aunque su grupo principal sea otro.
+
+* grupo_visible / grupos_de: grupo de visibilidad de los actores
+* registrar_visibilidad: crea (o actualiza) la fila de una lista de logs
+* actualizar_reservas / actualizar_espacio / actualizar_grupo_actores: refrescan claves
+* filtro_visibilidad: Q sobre LogEntry con el alcance de cada rol
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+
+from apps.logs.models import LogVisibilidad
+from apps.reservas.models import Reserva
+from apps.usuarios.models import Usuario
+
+CAMPOS_RESERVA = ['reserva_pk', 'espacio_pk', 'usuario_pk', 'aprobado_por_pk', 'ubicacion_pk', 'piso']
+
+
+def grupo_visible(nombres):
+    """
+    Grupo que decide la visibilidad de los logs de un actor con los grupos `nombres`
+    (en orden de pk): moderador o usuario si pertenece a alguno, ya que el
+    administrador ve los logs de ambos; si no, su grupo principal.
+    """
+    for grupo in (settings.GRUPOS.MODERADOR, settings.GRUPOS.USUARIO):
+        if grupo in nombres:
+            return grupo
+    return nombres[0] if nombres else None
+
+
+def grupos_de(usuario_pks):
+    """Grupo de visibilidad (ver grupo_visible) de cada usuario, según todos sus grupos."""
+    nombres = defaultdict(list)
+    filas = (
+        Usuario.groups.through.objects
+        .filter(usuario_id__in=usuario_pks)
+        .order_by('group_id')
+        .values_list('usuario_id', 'group__name')
+    )
+    for usuario_id, nombre in filas:
+        nombres[usuario_id].append(nombre)
+    return {usuario_id: grupo_visible(grupos) for usuario_id, grupos in nombres.items()}
+
+
+def claves_de_reservas(reserva_pks):
+    """Claves actuales de las reservas indicadas: {pk: {campo: valor}}."""
+    filas = Reserva.objects.filter(pk__in=reserva_pks).values_list(
+        'pk', 'espacio_id', 'usuario_id', 'aprobado_por_id', 'ubicacion_id', 'piso'
+    )
+    return {fila[0]: dict(zip(CAMPOS_RESERVA, fila)) for fila in filas}
+
+
+def ultimas_claves_conocidas(reserva_pks):
+    """
+    Claves guardadas en la visibilidad de logs anteriores, para reservas que ya no existen
+    (p. ej. el log de eliminación se escribe después de borrar la reserva).
+    """
+    claves = {}
+    filas = (
+        LogVisibilidad.objects
+        .filter(reserva_pk__in=reserva_pks)
+        .order_by('log_id')
+        .values_list(*CAMPOS_RESERVA)
+    )
+    for fila in filas:
+        claves[fila[0]] = dict(zip(CAMPOS_RESERVA, fila))
+    return claves
+
+
+def registrar_visibilidad(entries):
+    """Crea o actualiza la fila de LogVisibilidad de cada log de la lista."""
+    entries = [entry for entry in entries if entry.pk is not None]
+    if not entries:
+        return
+
+    ct_reserva = ContentType.objects.get_for_model(Reserva).pk
+    reserva_pks = set()
+    for entry in entries:
+        if entry.content_type_id == ct_reserva and entry.object_id is not None:
+            reserva_pks.add(entry.object_id)
+
+    grupos = grupos_de({entry.actor_id for entry in entries if entry.actor_id})
+    claves = claves_de_reservas(reserva_pks)
+    faltantes = reserva_pks - claves.keys()
+    if faltantes:
+        claves.update(ultimas_claves_conocidas(faltantes))
+
+    filas = []
+    for entry in entries:
+        datos = {}
+        if entry.content_type_id == ct_reserva:
+            datos = claves.get(entry.object_id, {'reserva_pk': entry.object_id})
+        filas.append(LogVisibilidad(
+            log_id=entry.pk,
+            actor_pk=entry.actor_id,
+            actor_grupo=grupos.get(entry.actor_id),
+            **datos,
+        ))
+
+    LogVisibilidad.objects.bulk_create(
+        filas,
+        update_conflicts=True,
+        unique_fields=['log'],
+        update_fields=['actor_pk', 'actor_grupo', *CAMPOS_RESERVA],
+        batch_size=500,
+    )
+
+
+def actualizar_reservas(reserva_pks):
+    """Refresca las claves de los logs de las reservas indicadas (si aún existen)."""
+    for pk, datos in claves_de_reservas(reserva_pks).items():
+        LogVisibilidad.objects.filter(reserva_pk=pk).exclude(**datos).update(**datos)
+
+
+def actualizar_espacio(espacio):
+    """Propaga un cambio de ubicación/piso del espacio a los logs de sus reservas."""
+    LogVisibilidad.objects.filter(espacio_pk=espacio.pk).exclude(
+        ubicacion_pk=espacio.ubicacion_id, piso=espacio.piso
+    ).update(ubicacion_pk=espacio.ubicacion_id, piso=espacio.piso)
+
+
+def actualizar_grupo_actores(usuario_pks):
+    """Refresca el grupo guardado para los logs de los actores indicados."""
+    grupos = grupos_de(usuario_pks)
+    for pk in usuario_pks:
+        LogVisibilidad.objects.filter(actor_pk=pk).exclude(
+            actor_grupo=grupos.get(pk)
+        ).update(actor_grupo=grupos.get(pk))
+
+
+def filtro_visibilidad(user):
+    """
+    Q sobre LogEntry con los logs visibles para el usuario, o None si no ve ninguno.
+
+    * Administrador: los logs de moderadores y usuarios, y los propios
+    * Moderador: los propios y los de reservas de su ubicación y piso, suyas o aprobadas por él
+    * Usuario: los propios y los de sus reservas
+    """
+    propios = Q(visibilidad__actor_pk=user.pk)
+    if user.is_admin:
+        return propios | Q(visibilidad__actor_grupo__in=[user.GRUPOS.MODERADOR, user.GRUPOS.USUARIO])
+    if user.is_moderador:
+        filtro = propios | Q(visibilidad__usuario_pk=user.pk) | Q(visibilidad__aprobado_por_pk=user.pk)
+        # Sin ubicación/piso asignados no debe coincidir con los logs que no son de reservas
+        if user.ubicacion_id is not None and user.piso is not None:
+            filtro |= Q(visibilidad__ubicacion_pk=user.ubicacion_id, visibilidad__piso=user.piso)
+        return filtro
+    if user.is_usuario:
+        return propios | Q(visibilidad__usuario_pk=user.pk)
+    return None
@@ -5,4 +5,6 @@ class ReservasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.reservas'
     verbose_name = 'Reservas'
-        
\ No newline at end of file
+
+    def ready(self):
+        import apps.reservas.signals
@@ -0,0 +1,61 @@
+"""
+Disponibilidad de espacios para reservas
+
+Ambas comprobaciones se resuelven con una sola consulta sobre el índice
+(espacio, fecha_uso) de Reserva. Se consulta siempre la base de datos: una
+caché en memoria solo se invalida en el proceso que guarda, y con varios
+procesos vería tarde las reservas aprobadas por los demás.
+
+* hay_solapamiento: comprobación usada por Reserva.clean
+* espacios_libres: espacios sin reservas aprobadas solapadas en una franja (una consulta)
+"""
+from django.db.models import Exists, OuterRef
+
+
+def hay_solapamiento(espacio_id, fecha_uso, hora_inicio, hora_fin, exclude_pk=None):
+    """
+    Indica si ya existe una reserva aprobada que se solape con la franja
+    [hora_inicio, hora_fin) en el espacio y fecha indicados.
+
+    Un EXISTS sobre el índice (espacio, fecha_uso): una reserva aprobada por
+    otro proceso debe verse aquí.
+    """
+    from apps.reservas.models import Reserva
+
+    if None in (espacio_id, fecha_uso, hora_inicio, hora_fin):
+        return False
+    solapadas = Reserva.objects.filter(
+        espacio_id=espacio_id,
+        fecha_uso=fecha_uso,
+        estado=Reserva.Estado.APROBADA,
+        hora_inicio__lt=hora_fin,
+        hora_fin__gt=hora_inicio,
+    )
+    if exclude_pk is not None:
+        solapadas = solapadas.exclude(pk=exclude_pk)
+    return solapadas.exists()
+
+
+def espacios_libres(fecha_uso, hora_inicio, hora_fin, queryset=None):
+    """
+    Espacios disponibles sin ninguna reserva aprobada que se solape con
+    [hora_inicio, hora_fin) en fecha_uso.
+
+    Se resuelve con un anti-join (NOT EXISTS) en una única consulta, que usa el
+    índice (espacio, fecha_uso) de Reserva; `queryset` permite acotar antes los
+    espacios (capacidad, tipo, ubicación...).
+    """
+    from apps.espacios.models import Espacio
+    from apps.reservas.models import Reserva
+
+    if queryset is None:
+        queryset = Espacio.objects.all()
+
+    ocupados = Reserva.objects.filter(
+        espacio_id=OuterRef('pk'),
+        fecha_uso=fecha_uso,
+        estado=Reserva.Estado.APROBADA,
+        hora_inicio__lt=hora_fin,
+        hora_fin__gt=hora_inicio,
+    )
+    return queryset.filter(disponible=True).filter(~Exists(ocupados))
@@ -0,0 +1,149 @@
+"""
+Operaciones masivas sobre reservas
+
+Las operaciones de este módulo modifican muchas reservas con una sola
+sentencia UPDATE. Como así no se disparan las señales de Reserva ni las de
+auditlog, se encargan ellas mismas de:
+
+* escribir los LogEntry equivalentes con bulk_create (mismo formato de cambios,
+  actor, cid y datos del contexto de auditlog que un save() normal)
+* registrar la visibilidad de esos logs
+* invalidar la caché del calendario y
+  recalcular el resumen diario
+
+* rechazar_reservas_espacio: rechaza las reservas futuras de un espacio no disponible
+"""
+from copy import copy
+
+from auditlog.cid import get_cid
+from auditlog.context import auditlog_value
+from auditlog.diff import model_instance_diff
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from django.utils.encoding import smart_str
+
+from apps.reservas import cache as cache_calendario, rollup
+from apps.reservas.models import Reserva
+
+MOTIVO_ESPACIO_NO_DISPONIBLE = 'El espacio no se encuentra disponible'
+
+# Tamaño de lote para bulk_create de logs
+LOTE = 500
+
+
+def datos_contexto_auditlog():
+    """
+    Campos extra del LogEntry tomados del contexto de auditlog (remote_addr,
+    remote_port, ...), como hace auditlog al guardar un log uno a uno.
+    """
+    try:
+        contexto = auditlog_value.get()
+    except LookupError:
+        return {}
+
+    datos = {}
+    for clave, valor in contexto.items():
+        if clave in ('actor', 'signal_duid') or not hasattr(LogEntry, clave):
+            continue
+        datos[clave] = valor() if callable(valor) else valor
+    return datos
+
+
+def crear_logs_actualizacion(pares, actor):
+    """
+    Escribe con bulk_create un LogEntry de actualización por cada par (anterior, nueva).
+
+    Retorna:
+        list: los LogEntry creados (solo de los pares con cambios).
+    """
+    from apps.logs.visibility import registrar_visibilidad
+
+    if not pares:
+        return []
+
+    content_type = ContentType.objects.get_for_model(Reserva)
+    extra = datos_contexto_auditlog()
+    cid = get_cid()
+    actor_email = getattr(actor, 'email', None)
+
+    entradas = []
+    for anterior, nueva in pares:
+        changes = model_instance_diff(
+            anterior, nueva, use_json_for_changes=settings.AUDITLOG_STORE_JSON_CHANGES
+        )
+        if not changes:
+            continue
+        entradas.append(LogEntry(
+            content_type=content_type,
+            object_pk=str(nueva.pk),
+            object_id=nueva.pk,
+            object_repr=smart_str(nueva),
+            action=LogEntry.Action.UPDATE,
+            changes=changes,
+            actor=actor,
+            actor_email=actor_email,
+            cid=cid,
+            **extra,
+        ))
+
+    LogEntry.objects.bulk_create(entradas, batch_size=LOTE)
+    registrar_visibilidad(entradas)
+    return entradas
+
+
+def rechazar_reservas_espacio(espacio, actor, motivo=MOTIVO_ESPACIO_NO_DISPONIBLE):
+    """
+    Rechaza en bloque las reservas futuras pendientes o aprobadas del espacio.
+
+    Hace un único UPDATE y escribe los logs de auditoría con bulk_create, todo
+    dentro de una transacción.
+
+    Retorna:
+        int: número de reservas rechazadas.
+    """
+    from apps.logs.models import LogVisibilidad
+
+    hoy = timezone.now().date()
+    with transaction.atomic():
+        afectadas = Reserva.objects.filter(
+            espacio_id=espacio.pk,
+            fecha_uso__gte=hoy,
+            estado__in=[Reserva.Estado.PENDIENTE, Reserva.Estado.APROBADA],
+        )
+        # usuario y espacio forman el str() que se guarda como object_repr
+        anteriores = list(afectadas.select_related('usuario', 'espacio').select_for_update(of=('self',)))
+        if not anteriores:
+            return 0
+
+        afectadas.update(
+            estado=Reserva.Estado.RECHAZADA,
+            aprobado_por=actor,
+            motivo_admin=motivo,
+        )
+
+        pares = []
+        for anterior in anteriores:
+            nueva = copy(anterior)
+            nueva.estado = Reserva.Estado.RECHAZADA
+            nueva.aprobado_por = actor
+            nueva.motivo_admin = motivo
+            pares.append((anterior, nueva))
+        crear_logs_actualizacion(pares, actor)
+
+        # Lo que normalmente harían las señales de Reserva.save()
+        rechazadas = Reserva.objects.filter(
+            espacio_id=espacio.pk,
+            fecha_uso__gte=hoy,
+            estado=Reserva.Estado.RECHAZADA,
+            aprobado_por=actor,
+        ).values('pk')
+        LogVisibilidad.objects.filter(reserva_pk__in=rechazadas).update(
+            aprobado_por_pk=actor.pk if actor else None
+        )
+        rollup.recalcular(espacio_id=espacio.pk, fecha_uso__gte=hoy)
+        cache_calendario.invalidar_fechas(*{anterior.fecha_uso for anterior in anteriores})
+
+    return len(anteriores)
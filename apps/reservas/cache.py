@@ -0,0 +1,162 @@
+"""
+Caché de respuestas del calendario
+
+El calendario pide la lista de tarjetas de un día (ReservasByDate) en cada
+clic sobre un día y en cada pestaña de estado, y los conteos por día
+(ReservasMonthlyCount) cada vez que muestra un mes.
+
+El HTML de las tarjetas se guarda en la caché con una clave que incluye:
+
+* el alcance del usuario (qué reservas ve y con qué permisos)
+* los parámetros de la lista (fecha_uso, estado, page)
+* la versión de la fecha y la versión global
+
+Cualquier cambio en una reserva cambia la versión de su fecha (la anterior y
+la nueva) y la de su mes; un cambio en un espacio o en los datos de un
+usuario, que también aparecen en las tarjetas, cambia la versión global. Las
+entradas con versiones viejas no se borran: dejan de usarse y expiran solas.
+
+Las versiones son tokens aleatorios, no contadores: si la caché descarta una
+versión, la siguiente lectura genera otra distinta y nunca reaparece una
+entrada vieja. Se cambian tras el commit de la transacción, para que ninguna
+petición guarde datos anteriores al cambio con la versión nueva.
+
+Las versiones viven en la caché por defecto. Sin CACHES configurado es una
+LocMemCache propia de cada proceso: un cambio solo renueva las versiones del
+proceso que lo hizo. Por eso caducan a los RESERVAS_CALENDARIO_CACHE_TTL
+segundos, como las tarjetas: en los demás procesos un cambio tarda como mucho
+ese tiempo en verse (tarjetas y 304 de los conteos). Con una caché compartida
+(Redis, Memcached...) se ve en todos al instante.
+
+La misma clave sirve de ETag: un If-None-Match que coincide se responde con
+304 sin consultar reservas ni renderizar. Los conteos solo usan el ETag
+(alcance, rango, estados y versiones de los meses del rango): el navegador
+guarda el JSON y el servidor responde 304 sin ejecutar la agregación.
+
+Las vistas del calendario son asíncronas: las funciones que leen versiones
+usan la API asíncrona de la caché. Las que las cambian se llaman desde
+señales y operaciones masivas (síncronas).
+
+* aversiones / invalidar_fechas / invalidar_todo: versiones por fecha, por mes y global
+* alcance: parte de la clave que depende del usuario (con sus grupos ya cargados)
+* aclave_tarjetas: clave (y ETag) de una lista de tarjetas con filtros ya validados
+* aetag_conteos: ETag de los conteos de un rango, o None si el rango es demasiado largo
+"""
+import hashlib
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+PREFIJO = 'reservas:calendario'
+GLOBAL = 'global'
+
+# Meses como máximo en un rango de conteos con ETag (el calendario pide 1 a 3)
+MAX_MESES = 13
+
+
+def _clave_version(nombre):
+    return f'{PREFIJO}:version:{nombre}'
+
+
+def mes(fecha):
+    """Nombre de la versión del mes de una fecha."""
+    return f'mes:{fecha:%Y-%m}'
+
+
+async def aversiones(nombres):
+    """
+    Versiones actuales de fechas (isoformat), meses (ver mes) o GLOBAL, en
+    el mismo orden; las que no existen se crean y caducan a los
+    RESERVAS_CALENDARIO_CACHE_TTL segundos.
+    """
+    claves = [_clave_version(nombre) for nombre in nombres]
+    actuales = await cache.aget_many(claves)
+    for clave in claves:
+        if clave not in actuales:
+            nueva = uuid.uuid4().hex
+            # Si otro proceso la creó a la vez, gana la suya
+            actuales[clave] = nueva if await cache.aadd(clave, nueva, settings.RESERVAS_CALENDARIO_CACHE_TTL) else await cache.aget(clave, nueva)
+    return [actuales[clave] for clave in claves]
+
+
+def _cambiar(nombres):
+    cache.delete_many([_clave_version(nombre) for nombre in nombres])
+
+
+def invalidar_fechas(*fechas):
+    """Cambia la versión de las fechas indicadas y de sus meses (al confirmarse la transacción)."""
+    fechas = [fecha for fecha in fechas if fecha is not None]
+    nombres = {fecha.isoformat() for fecha in fechas} | {mes(fecha) for fecha in fechas}
+    if nombres:
+        transaction.on_commit(lambda: _cambiar(nombres))
+
+
+def invalidar_todo():
+    """Cambia la versión global: invalida las respuestas de todas las fechas."""
+    transaction.on_commit(lambda: _cambiar([GLOBAL]))
+
+
+def _resumen(partes):
+    return hashlib.md5('|'.join(partes).encode(), usedforsecurity=False).hexdigest()
+
+
+def alcance(user):
+    """
+    Lo que distingue a los usuarios que ven la misma respuesta: los
+    administradores comparten alcance; el de un moderador depende de su
+    ubicación y piso, y el de un usuario, de él mismo (ver qs_condiciones).
+    """
+    grupo = user.grupo
+    if user.is_admin:
+        return grupo
+    if user.is_moderador:
+        return f'{grupo}:{user.pk}:{user.ubicacion_id}:{user.piso}'
+    return f'{grupo}:{user.pk}'
+
+
+async def aclave_tarjetas(user, fecha, estado, page):
+    """
+    Clave de caché (también usada como ETag) de la lista de tarjetas de
+    `fecha` con el `estado` y la `page` pedidos. `fecha` y `estado` deben
+    venir ya validados por el filtro: dos formas de escribir la misma fecha
+    no pueden dar claves distintas con contenidos distintos.
+    """
+    partes = [
+        alcance(user),
+        fecha.isoformat(),
+        estado,
+        page,
+        *await aversiones([fecha.isoformat(), GLOBAL]),
+    ]
+    return f'{PREFIJO}:tarjetas:{_resumen(partes)}'
+
+
+async def aetag_conteos(user, inicio, fin, estados):
+    """
+    ETag de los conteos por día entre `inicio` y `fin` para los estados dados.
+
+    Retorna:
+        str | None: el ETag (sin comillas), o None si el rango abarca más de
+        MAX_MESES meses o está invertido.
+    """
+    meses = []
+    actual = inicio.replace(day=1)
+    while actual <= fin:
+        if len(meses) == MAX_MESES:
+            return None
+        meses.append(mes(actual))
+        actual = (actual.replace(day=28) + timedelta(days=4)).replace(day=1)
+    if not meses:
+        return None
+
+    return _resumen([
+        'conteos',
+        alcance(user),
+        inicio.isoformat(),
+        fin.isoformat(),
+        ','.join(estados),
+        *await aversiones([*meses, GLOBAL]),
+    ])
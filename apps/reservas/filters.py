@@ -3,11 +3,11 @@ from apps.reservas.models import Reserva
 from apps.usuarios.models import Ubicacion
 from apps.espacios.models import Espacio
 from django import forms
+from apps.core.search import BusquedaFilter
 
 class ReservaFilter(django_filters.FilterSet):
-    usuario = django_filters.CharFilter(
+    usuario = BusquedaFilter(
         field_name='usuario__username',
-        lookup_expr='icontains',
         label='Nombre de usuario',
         widget=forms.TextInput(attrs={
             'class': 'input',
@@ -15,9 +15,8 @@ class ReservaFilter(django_filters.FilterSet):
             'id': 'username_filter'
         })
     )
-    ubicacion = django_filters.CharFilter(
-        field_name='espacio__ubicacion',
-        lookup_expr='icontains',
+    ubicacion = BusquedaFilter(
+        field_name='ubicacion__nombre',
         label='Ubicación',
         widget=forms.TextInput(attrs={
             'placeholder': 'Buscar por ubicación…',
@@ -26,15 +25,14 @@ class ReservaFilter(django_filters.FilterSet):
         }),
     )
     piso = django_filters.NumberFilter(
-        field_name='espacio__piso',
+        field_name='piso',
         lookup_expr='exact',
         label='Piso',
         widget=forms.NumberInput(
             attrs={'class': 'input', 'placeholder': 'Piso del espacio…'})
     )
-    espacio = django_filters.CharFilter(
+    espacio = BusquedaFilter(
         field_name='espacio__nombre',
-        lookup_expr='icontains',
         label='Espacio',
         widget=forms.TextInput(attrs={'class': 'input', 'placeholder': 'Nombre del espacio…'}),
     )
@@ -1,9 +1,40 @@
 from django import forms
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from apps.reservas.models import Reserva
 from apps.espacios.models import Espacio
-from apps.usuarios.models import Usuario
+from apps.usuarios.models import Ubicacion, Usuario
 from datetime import date, timedelta
+from library.widgets import AutocompleteSelect
+
+def usuarios_reservables(user):
+    """
+    Usuarios para los que `user` puede crear reservas:
+
+    * administrador: usuarios y moderadores, además de sí mismo
+    * moderador: usuarios de su ubicación y piso, además de sí mismo
+    * usuario: solo él mismo
+
+    Los grupos se filtran con EXISTS para no duplicar filas por el join.
+    """
+    def en_grupos(*nombres):
+        return Exists(Usuario.groups.through.objects.filter(
+            usuario_id=OuterRef('pk'), group__name__in=nombres))
+
+    if user.is_admin:
+        filtro = en_grupos(user.GRUPOS.USUARIO, user.GRUPOS.MODERADOR) | Q(pk=user.pk)
+    elif user.is_moderador:
+        filtro = (
+            en_grupos(user.GRUPOS.USUARIO) & Q(ubicacion=user.ubicacion_id, piso=user.piso)
+        ) | Q(pk=user.pk)
+    else:
+        filtro = Q(pk=user.pk)
+    return Usuario.objects.filter(filtro)
+
+
+def espacios_reservables(user):
+    """Espacios en los que `user` puede reservar (los disponibles)."""
+    return Espacio.objects.filter(disponible=True)
+
 
 class ReservaCreateForm(forms.ModelForm ):
     class Meta:
@@ -11,7 +42,7 @@ class ReservaCreateForm(forms.ModelForm ):
         fields = ['usuario', 'fecha_uso', 'hora_inicio',
                   'hora_fin', 'espacio', 'motivo', ]
         widgets = {
-            'usuario': forms.Select(attrs={'class': 'select2 form-select w-full'}),
+            'usuario': AutocompleteSelect('reserva_autocomplete_usuarios', attrs={'class': 'select2 form-select w-full'}),
             'fecha_uso': forms.DateInput(
                 format='%Y-%m-%d',
                 attrs={'type': 'date', 'min': date.today().isoformat(), 'max': (
@@ -20,7 +51,7 @@ class ReservaCreateForm(forms.ModelForm ):
             'hora_inicio': forms.TimeInput(attrs={'type': 'time', 'fieldset_class': 'w-1/2 flex-1', 'class': 'form-control' }),
             'hora_fin': forms.TimeInput(attrs={'type': 'time', 'fieldset_class': 'w-1/2 flex-1', 'class': 'form-control' }),
             'motivo': forms.Textarea(attrs={'rows': 3, 'label': 'Motivo de la reserva', 'placeholder': 'Motivo de la reserva',  'class': 'form-textarea'}),
-            'espacio': forms.Select(attrs={'class': 'select2 form-select w-full'}),
+            'espacio': AutocompleteSelect('reserva_autocomplete_espacios', attrs={'class': 'select2 form-select w-full'}),
             
             }
 
@@ -38,28 +69,12 @@ class ReservaCreateForm(forms.ModelForm ):
         # Configuración del usuario si es necesario
         user = self.request.user if self.request else None
         
-        # Filtrar espacios disponibles
-        self.fields['espacio'].queryset = Espacio.objects.filter(
-            Q(disponible=True)
-        )
-        
-        # Si es administrador, mostrar selector de usuarios del grupo moderador y usuario, o su mismo id
-        if user.is_admin:
-            self.fields['usuario'].queryset = Usuario.objects.filter(
-                Q(groups__name=user.GRUPOS.USUARIO) | Q(groups__name=user.GRUPOS.MODERADOR) | Q(id=user.id))
-
-        # Si es moderador, mostrar selector de usuarios del grupo usuario 
-        elif user.is_moderador:
-            self.fields['usuario'].queryset = Usuario.objects.filter(
-                (
-                    Q(groups__name=user.GRUPOS.USUARIO) &
-                    Q(ubicacion=user.ubicacion) &
-                    Q(piso=user.piso)
-                ) | Q(id=user.id)
-            )
+        # Espacios y usuarios elegibles (los mismos que ofrecen los endpoints de autocompletado)
+        self.fields['espacio'].queryset = espacios_reservables(user)
+        self.fields['usuario'].queryset = usuarios_reservables(user)
 
         # Si es usuario, mostrar selector de su usuario
-        elif user.is_usuario:
+        if user.is_usuario:
             self.fields['usuario'].widget = forms.HiddenInput()
             self.fields['usuario'].initial = user
 
@@ -117,3 +132,35 @@ class ReservaApproveForm(forms.ModelForm):
             (Reserva.Estado.RECHAZADA, 'Rechazar')
         ]
         
+
+
+class EspaciosLibresForm(forms.Form):
+    """
+    Parámetros de la búsqueda de espacios libres (api/espacios-libres/).
+    Solo fecha y horas son obligatorias.
+    """
+    fecha_uso = forms.DateField()
+    hora_inicio = forms.TimeField()
+    hora_fin = forms.TimeField()
+    capacidad = forms.IntegerField(required=False, min_value=1)
+    tipo = forms.ChoiceField(required=False, choices=Espacio.Tipo.choices)
+    ubicacion = forms.ModelChoiceField(required=False, queryset=Ubicacion.objects.all())
+
+    def clean(self):
+        cleaned_data = super().clean()
+        hora_inicio = cleaned_data.get('hora_inicio')
+        hora_fin = cleaned_data.get('hora_fin')
+        if hora_inicio and hora_fin and hora_fin <= hora_inicio:
+            raise forms.ValidationError("La hora de fin debe ser posterior a la hora de inicio.")
+        return cleaned_data
+
+    def filtro_espacios(self):
+        """Q con los filtros opcionales sobre Espacio."""
+        filtro = Q()
+        if self.cleaned_data.get('capacidad'):
+            filtro &= Q(capacidad__gte=self.cleaned_data['capacidad'])
+        if self.cleaned_data.get('tipo'):
+            filtro &= Q(tipo=self.cleaned_data['tipo'])
+        if self.cleaned_data.get('ubicacion'):
+            filtro &= Q(ubicacion=self.cleaned_data['ubicacion'])
+        return filtro
@@ -0,0 +1,45 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def poblar_rollup(apps, schema_editor):
+    Reserva = apps.get_model('reservas', 'Reserva')
+    ReservaDailyRollup = apps.get_model('reservas', 'ReservaDailyRollup')
+
+    grupos = (
+        Reserva.objects.order_by()
+        .values('fecha_uso', 'espacio_id', 'estado')
+        .annotate(total=Count('id'))
+    )
+    ReservaDailyRollup.objects.bulk_create(
+        (ReservaDailyRollup(**grupo) for grupo in grupos.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('espacios', '0001_initial'),
+        ('reservas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservaDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_uso', models.DateField()),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('aprobada', 'Aprobada'), ('rechazada', 'Rechazada')], max_length=10)),
+                ('total', models.IntegerField(default=0)),
+                ('espacio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='espacios.espacio')),
+            ],
+            options={
+                'verbose_name': 'Resumen diario de reservas',
+                'verbose_name_plural': 'Resúmenes diarios de reservas',
+                'constraints': [models.UniqueConstraint(fields=('fecha_uso', 'espacio', 'estado'), name='uniq_rollup_fecha_espacio_estado')],
+            },
+        ),
+        migrations.RunPython(poblar_rollup, migrations.RunPython.noop),
+    ]
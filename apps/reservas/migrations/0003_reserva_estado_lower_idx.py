@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 11:53
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('espacios', '0003_espacio_tipo_lower_idx'),
+        ('reservas', '0002_reservadailyrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(django.db.models.functions.text.Lower('estado'), name='reserva_estado_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2 on 2026-10-18 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copiar_ubicacion_espacio(apps, schema_editor):
+    Espacio = apps.get_model('espacios', 'Espacio')
+    Reserva = apps.get_model('reservas', 'Reserva')
+    espacio = Espacio.objects.filter(pk=OuterRef('espacio_id'))
+    Reserva.objects.update(
+        ubicacion_id=Subquery(espacio.values('ubicacion_id')[:1]),
+        piso=Subquery(espacio.values('piso')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('espacios', '0003_espacio_tipo_lower_idx'),
+        ('reservas', '0003_reserva_estado_lower_idx'),
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reserva',
+            name='ubicacion',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='usuarios.ubicacion'),
+        ),
+        migrations.AddField(
+            model_name='reserva',
+            name='piso',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(copiar_ubicacion_espacio, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='reserva',
+            name='ubicacion',
+            field=models.ForeignKey(blank=True, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='usuarios.ubicacion'),
+        ),
+        migrations.AlterField(
+            model_name='reserva',
+            name='piso',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['ubicacion', 'piso', 'fecha_uso'], name='reservas_re_ubicaci_e082d2_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 13:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservas', '0004_reserva_ubicacion_piso'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='reserva',
+            name='reserva_estado_lower_idx',
+        ),
+    ]
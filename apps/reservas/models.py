@@ -3,7 +3,8 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.db.models import Q, F
 from apps.espacios.models import Espacio
-from apps.usuarios.models import Usuario
+from apps.usuarios.models import Ubicacion, Usuario
+from apps.reservas.availability import hay_solapamiento
 
 
 # ——— 4. Reserva ————————————————————————————————————————————————
@@ -35,6 +36,12 @@ class Reserva(models.Model):
         Usuario, on_delete=models.SET_NULL, null=True, blank=True,
         related_name='reservas_aprobadas'
     )
+    # Copia de espacio.ubicacion y espacio.piso (ver sincronizar_ubicacion): el
+    # alcance de los moderadores se filtra sin join con Espacio
+    ubicacion = models.ForeignKey(
+        Ubicacion, on_delete=models.CASCADE, related_name='+', editable=False, blank=True
+    )
+    piso = models.PositiveSmallIntegerField(editable=False, blank=True)
 
     class Meta:
         verbose_name = "Reserva"
@@ -43,6 +50,8 @@ class Reserva(models.Model):
         indexes = [
             models.Index(fields=['espacio', 'fecha_uso']),
             models.Index(fields=['fecha_uso']),
+            # Alcance del moderador (qs_condiciones)
+            models.Index(fields=['ubicacion', 'piso', 'fecha_uso']),
         ]
         constraints = [
             # Evita que un mismo usuario haga dos reservas el mismo día en el mismo espacio
@@ -62,6 +71,15 @@ class Reserva(models.Model):
     def __str__(self):
         return f"US:{self.usuario.username} | ESP:{self.espacio.nombre}"
 
+    def sincronizar_ubicacion(self):
+        """
+        Copia la ubicación y el piso del espacio. La señal pre_save lo hace en
+        cada save(); quien use bulk_create debe llamarlo antes.
+        """
+        if self.espacio_id is not None:
+            self.ubicacion_id = self.espacio.ubicacion_id
+            self.piso = self.espacio.piso
+
     def clean(self):
         super().clean()
 
@@ -74,16 +92,9 @@ class Reserva(models.Model):
             raise ValidationError(
                 "La fecha de uso debe ser hoy o en el futuro.")
 
-        # 2) solapamiento de franjas horarias
-        qs = Reserva.objects.filter(
-            espacio_id=self.espacio_id,
-            fecha_uso=self.fecha_uso,
-            estado=self.Estado.APROBADA
-        ).exclude(pk=self.pk).filter(
-            Q(hora_inicio__lt=self.hora_fin) &
-            Q(hora_fin__gt=self.hora_inicio)
-        )
-        if qs.exists():
+        # 2) solapamiento de franjas horarias (consulta directa, ver availability.hay_solapamiento)
+        if hay_solapamiento(self.espacio_id, self.fecha_uso,
+                            self.hora_inicio, self.hora_fin, exclude_pk=self.pk):
             raise ValidationError(
                 "Ya existe otra reserva solapada para este espacio.")
 
@@ -105,3 +116,32 @@ class Reserva(models.Model):
                 raise ValidationError(
                     "El moderador solo puede aprobar o rechazar reservas de su misma ubicación y piso."
                 )
+
+
+# ——— 5. Resumen diario de reservas ———————————————————————————————
+class ReservaDailyRollup(models.Model):
+    """
+    Conteo de reservas por (fecha_uso, espacio, estado).
+
+    Se mantiene de forma incremental desde las señales de Reserva (ver
+    rollup.py) y lo usa el calendario para no agregar las reservas en bruto.
+    """
+    fecha_uso = models.DateField()
+    espacio = models.ForeignKey(
+        Espacio, on_delete=models.CASCADE, related_name='rollups'
+    )
+    estado = models.CharField(max_length=10, choices=Reserva.Estado.choices)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Resumen diario de reservas"
+        verbose_name_plural = "Resúmenes diarios de reservas"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fecha_uso', 'espacio', 'estado'],
+                name='uniq_rollup_fecha_espacio_estado',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha_uso} | ESP:{self.espacio_id} | {self.estado}: {self.total}"
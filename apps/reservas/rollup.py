@@ -0,0 +1,126 @@
+"""
+Resumen diario de reservas (ReservaDailyRollup)
+
+Guarda cuántas reservas hay por (fecha_uso, espacio, estado) para que el
+calendario no tenga que agregar todas las reservas en cada navegación. Las
+señales de Reserva (ver signals.py) lo actualizan con sumas y restas; las
+operaciones masivas que no disparan señales deben llamar a `recalcular`.
+
+* aplicar: suma (o resta) `delta` a un (espacio, fecha_uso, estado)
+* recalcular: reconstruye el resumen desde las reservas (todo o un subconjunto)
+* conteos_diarios / aconteos_diarios: conteos por día y estado para el calendario
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from apps.reservas.models import Reserva, ReservaDailyRollup
+
+ESTADOS = list(Reserva.Estado.values)
+
+
+def aplicar(espacio_id, fecha_uso, estado, delta):
+    """Suma `delta` al conteo del (espacio, fecha_uso, estado) indicado."""
+    if delta == 0 or None in (espacio_id, fecha_uso, estado):
+        return
+
+    filas = ReservaDailyRollup.objects.filter(
+        espacio_id=espacio_id, fecha_uso=fecha_uso, estado=estado
+    )
+    if filas.update(total=F('total') + delta) or delta < 0:
+        return
+
+    # Primera reserva del grupo; si otro proceso creó la fila a la vez, se suma sobre ella
+    try:
+        with transaction.atomic():
+            ReservaDailyRollup.objects.create(
+                espacio_id=espacio_id, fecha_uso=fecha_uso, estado=estado, total=delta
+            )
+    except IntegrityError:
+        filas.update(total=F('total') + delta)
+
+
+@transaction.atomic
+def recalcular(**filtros):
+    """
+    Reconstruye el resumen a partir de las reservas.
+
+    Los filtros (sobre campos comunes a Reserva y al resumen, p. ej.
+    espacio_id__in o fecha_uso__range) acotan la reconstrucción; sin
+    filtros se reconstruye completo.
+
+    Retorna:
+        int: número de filas del resumen generadas.
+    """
+    ReservaDailyRollup.objects.filter(**filtros).delete()
+    grupos = (
+        Reserva.objects.filter(**filtros)
+        .order_by()
+        .values('fecha_uso', 'espacio_id', 'estado')
+        .annotate(total=Count('id'))
+    )
+    filas = ReservaDailyRollup.objects.bulk_create(
+        (ReservaDailyRollup(**grupo) for grupo in grupos.iterator()),
+        batch_size=1000,
+    )
+    return len(filas)
+
+
+def _consultas_conteos(inicio, fin, estados, filtro_rollup, filtro_reservas):
+    """Consultas (valores fecha_uso, estado, cantidad) cuya suma da los conteos diarios."""
+    consultas = []
+    if filtro_rollup is not None:
+        consultas.append(
+            ReservaDailyRollup.objects
+            .filter(filtro_rollup, fecha_uso__gte=inicio, fecha_uso__lte=fin,
+                    estado__in=estados, total__gt=0)
+            .order_by()
+            .values('fecha_uso', 'estado')
+            .annotate(cantidad=Sum('total'))
+        )
+    if filtro_reservas is not None:
+        consultas.append(
+            Reserva.objects
+            .filter(filtro_reservas, fecha_uso__gte=inicio, fecha_uso__lte=fin,
+                    estado__in=estados)
+            .order_by()
+            .values('fecha_uso', 'estado')
+            .annotate(cantidad=Count('id'))
+        )
+    return consultas
+
+
+def _por_dia(filas):
+    dias = defaultdict(lambda: dict.fromkeys(ESTADOS, 0))
+    for fila in filas:
+        dias[fila['fecha_uso']][fila['estado']] += fila['cantidad']
+    return [
+        {
+            'fecha_uso': fecha,
+            **{f'{estado}_count': conteos[estado] for estado in ESTADOS},
+        }
+        for fecha, conteos in sorted(dias.items())
+    ]
+
+
+def conteos_diarios(inicio, fin, estados=None, filtro_rollup=None, filtro_reservas=None):
+    """
+    Conteos por día y estado entre `inicio` y `fin` (inclusive).
+
+    filtro_rollup se aplica sobre el resumen y filtro_reservas sobre las
+    reservas en bruto; el resultado es la suma de ambas partes, por lo que
+    deben ser disjuntas. Un filtro en None omite esa parte.
+
+    Retorna:
+        list: diccionarios {fecha_uso, pendiente_count, aprobada_count, rechazada_count}
+              ordenados por fecha.
+    """
+    consultas = _consultas_conteos(inicio, fin, estados or ESTADOS, filtro_rollup, filtro_reservas)
+    return _por_dia([fila for consulta in consultas for fila in consulta])
+
+
+async def aconteos_diarios(inicio, fin, estados=None, filtro_rollup=None, filtro_reservas=None):
+    """Versión asíncrona de conteos_diarios (para las vistas asíncronas del calendario)."""
+    consultas = _consultas_conteos(inicio, fin, estados or ESTADOS, filtro_rollup, filtro_reservas)
+    return _por_dia([fila for consulta in consultas async for fila in consulta])
@@ -2,9 +2,14 @@ from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_delete, post_init, post_migrate, post_save, pre_save
 from django.dispatch import receiver
 
+from apps.espacios.models import Espacio
+from apps.reservas import cache as cache_calendario, rollup
+from apps.reservas.models import Reserva
+from apps.usuarios.models import Usuario
+
 
 @receiver(post_migrate)
 def crear_grupos_y_permisos(sender, **kwargs):
@@ -44,3 +49,81 @@ def crear_grupos_y_permisos(sender, **kwargs):
                     continue
 
         grupo.save()
+
+
+# ——— Ubicación y piso desnormalizados ————————————————————————————
+
+
+@receiver(pre_save, sender=Reserva)
+def copiar_ubicacion_espacio(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.sincronizar_ubicacion()
+
+
+@receiver(post_save, sender=Espacio)
+def propagar_ubicacion_espacio(sender, instance, created, raw=False, **kwargs):
+    """Un espacio que cambia de ubicación o piso arrastra a sus reservas."""
+    if not created and not raw:
+        Reserva.objects.filter(espacio=instance).exclude(
+            ubicacion_id=instance.ubicacion_id, piso=instance.piso
+        ).update(ubicacion_id=instance.ubicacion_id, piso=instance.piso)
+
+
+# ——— Motor de disponibilidad y resumen diario ————————————————————
+
+
+@receiver(post_init, sender=Reserva)
+def guardar_clave_original(sender, instance, **kwargs):
+    """
+    Recuerda el (espacio, fecha_uso) y el estado con que se cargó la reserva,
+    para poder invalidar la fecha anterior en la caché del calendario y restar
+    del resumen diario si cambian al guardar.
+    """
+    instance._clave_original = (instance.espacio_id, instance.fecha_uso)
+    instance._estado_original = instance.estado if instance.pk else None
+
+
+@receiver(post_save, sender=Reserva)
+def invalidar_calendario_al_guardar(sender, instance, **kwargs):
+    # Antes de actualizar_rollup_al_guardar, que renueva _clave_original
+    cache_calendario.invalidar_fechas(instance._clave_original[1], instance.fecha_uso)
+
+
+@receiver(post_save, sender=Reserva)
+def actualizar_rollup_al_guardar(sender, instance, created, **kwargs):
+    original = (*instance._clave_original, instance._estado_original)
+    actual = (instance.espacio_id, instance.fecha_uso, instance.estado)
+    if created or original != actual:
+        if not created:
+            rollup.aplicar(*original, -1)
+        rollup.aplicar(*actual, 1)
+
+    instance._clave_original = actual[:2]
+    instance._estado_original = instance.estado
+
+
+@receiver(post_delete, sender=Reserva)
+def invalidar_calendario_al_eliminar(sender, instance, **kwargs):
+    cache_calendario.invalidar_fechas(instance._clave_original[1], instance.fecha_uso)
+
+
+@receiver(post_delete, sender=Reserva)
+def actualizar_rollup_al_eliminar(sender, instance, **kwargs):
+    rollup.aplicar(*instance._clave_original, instance._estado_original, -1)
+
+
+# ——— Caché del calendario ———————————————————————————————————————
+
+
+@receiver(post_save, sender=Espacio)
+@receiver(post_delete, sender=Espacio)
+def invalidar_calendario_espacio(sender, **kwargs):
+    """El nombre del espacio aparece en las tarjetas de todas sus fechas."""
+    cache_calendario.invalidar_todo()
+
+
+@receiver(post_save, sender=Usuario)
+def invalidar_calendario_usuario(sender, created, update_fields=None, **kwargs):
+    """El nombre del usuario aparece en sus tarjetas; el login (last_login) no cuenta."""
+    if not created and update_fields != frozenset({'last_login'}):
+        cache_calendario.invalidar_todo()
@@ -0,0 +1,79 @@
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import TestCase
+
+from apps.espacios.models import Espacio
+from apps.reservas.models import Reserva
+from apps.reservas.views import qs_condiciones
+from apps.usuarios.models import Ubicacion, Usuario
+
+
+class AlcanceModeradorTest(TestCase):
+    """La ubicación y el piso copiados del espacio sirven el alcance del moderador"""
+
+    def setUp(self):
+        self.central = Ubicacion.objects.create(nombre='Sede Central')
+        self.norte = Ubicacion.objects.create(nombre='Sede Norte')
+        self.moderador = self.crear_usuario(
+            'moderador', settings.GRUPOS.MODERADOR, ubicacion=self.central, piso=1)
+        self.usuario = self.crear_usuario('usuario', settings.GRUPOS.USUARIO)
+        self.espacio = Espacio.objects.create(nombre='Salon101', ubicacion=self.central, piso=1,
+                                              capacidad=30, tipo=Espacio.Tipo.SALON)
+        self.otro_espacio = Espacio.objects.create(nombre='Salon201', ubicacion=self.norte, piso=2,
+                                                   capacidad=30, tipo=Espacio.Tipo.SALON)
+        self.fecha = date.today() + timedelta(days=1)
+
+    def crear_usuario(self, username, grupo, **kwargs):
+        usuario = Usuario.objects.create_user(
+            username=username, email=f'{username}@example.com', password='pass', **kwargs)
+        usuario.groups.add(Group.objects.get(name=grupo))
+        return usuario
+
+    def crear_reserva(self, espacio, usuario=None):
+        return Reserva.objects.create(
+            usuario=usuario or self.usuario, espacio=espacio, fecha_uso=self.fecha,
+            hora_inicio=time(8, 0), hora_fin=time(9, 0), motivo='Reunión')
+
+    def test_copiadas_al_guardar(self):
+        reserva = self.crear_reserva(self.espacio)
+        self.assertEqual((reserva.ubicacion_id, reserva.piso), (self.central.pk, 1))
+
+        reserva.espacio = self.otro_espacio
+        reserva.save()
+        reserva.refresh_from_db()
+        self.assertEqual((reserva.ubicacion_id, reserva.piso), (self.norte.pk, 2))
+
+    def test_propagadas_al_mover_el_espacio(self):
+        reserva = self.crear_reserva(self.otro_espacio)
+        self.assertNotIn(reserva, Reserva.objects.filter(qs_condiciones(self.moderador)))
+
+        self.otro_espacio.ubicacion = self.central
+        self.otro_espacio.piso = 1
+        self.otro_espacio.save()
+        self.assertIn(reserva, Reserva.objects.filter(qs_condiciones(self.moderador)))
+
+    def test_alcance_del_moderador(self):
+        de_su_piso = self.crear_reserva(self.espacio)
+        propia = self.crear_reserva(self.otro_espacio, usuario=self.moderador)
+        aprobada = self.crear_reserva(self.otro_espacio)
+        aprobada.estado = Reserva.Estado.APROBADA
+        aprobada.aprobado_por = self.moderador
+        aprobada.save()
+        ajena = self.crear_reserva(self.otro_espacio, usuario=self.crear_usuario('otro', settings.GRUPOS.USUARIO))
+
+        visibles = set(Reserva.objects.filter(qs_condiciones(self.moderador)))
+        self.assertEqual(visibles, {de_su_piso, propia, aprobada})
+        self.assertNotIn(ajena, visibles)
+
+    def test_cada_rama_usa_un_indice(self):
+        queryset = Reserva.objects.filter(qs_condiciones(self.moderador))
+        with connection.cursor() as cursor:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(fila) for fila in cursor.fetchall())
+        self.assertNotIn('espacios_espacio', plan)
+        self.assertIn('MULTI-INDEX OR', plan)
+        self.assertIn('(ubicacion_id=? AND piso=?)', plan)
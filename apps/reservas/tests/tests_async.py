@@ -0,0 +1,78 @@
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.espacios.models import Espacio
+from apps.reservas.models import Reserva
+from apps.usuarios.models import Ubicacion, Usuario
+
+
+class CalendarioAsincronoTest(TestCase):
+    """Las vistas del calendario atienden peticiones ASGI sin consultas síncronas en el bucle de eventos"""
+
+    def setUp(self):
+        cache.clear()
+        ubicacion = Ubicacion.objects.create(nombre='Sede Central')
+        self.moderador = self.crear_usuario('moderador', settings.GRUPOS.MODERADOR, ubicacion=ubicacion, piso=1)
+        self.usuario = self.crear_usuario('usuario', settings.GRUPOS.USUARIO)
+        espacio = Espacio.objects.create(nombre='Salon101', ubicacion=ubicacion, piso=1,
+                                         capacidad=30, tipo=Espacio.Tipo.SALON)
+        self.fecha = date.today() + timedelta(days=1)
+        for i, usuario in enumerate([self.usuario, self.moderador]):
+            with self.captureOnCommitCallbacks(execute=True):
+                Reserva.objects.create(usuario=usuario, espacio=espacio, fecha_uso=self.fecha,
+                                       hora_inicio=time(8 + i, 0), hora_fin=time(9 + i, 0), motivo='Reunión')
+
+    def crear_usuario(self, username, grupo, **kwargs):
+        usuario = Usuario.objects.create_user(
+            username=username, email=f'{username}@example.com', password='pass', **kwargs)
+        usuario.groups.add(Group.objects.get(name=grupo))
+        return usuario
+
+    async def test_conteos(self):
+        await self.async_client.aforce_login(self.moderador)
+        params = {'start': self.fecha.isoformat(), 'end': self.fecha.isoformat()}
+        response = await self.async_client.get(reverse('reservas_monthly_count'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['pendiente_count'], 2)
+
+        repetida = await self.async_client.get(
+            reverse('reservas_monthly_count'), params, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(repetida.status_code, 304)
+
+    async def test_tarjetas_con_alcance(self):
+        await self.async_client.aforce_login(self.usuario)
+        response = await self.async_client.get(reverse('reservas_by_date'), {'fecha_uso': self.fecha.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'usuario')
+        self.assertNotContains(response, 'moderador')
+        self.assertContains(response, 'collapse-title', count=1)
+        # La plantilla consulta los permisos (perms) que cargó la vista
+        self.assertContains(response, 'Ver')
+
+    async def test_pagina_invalida(self):
+        await self.async_client.aforce_login(self.usuario)
+        response = await self.async_client.get(
+            reverse('reservas_by_date'), {'fecha_uso': self.fecha.isoformat(), 'page': '9'})
+        # Http404, que custom_404 redirige al login
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+
+    async def test_acceso(self):
+        response = await self.async_client.get(reverse('reservas_by_date'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(settings.LOGIN_URL, response['Location'])
+
+        sin_permisos = await Usuario.objects.acreate_user(
+            username='invitado', email='invitado@example.com', password='pass')
+        await self.async_client.aforce_login(sin_permisos)
+        response = await self.async_client.get(reverse('reservas_monthly_count'))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_roles_asincronos(self):
+        moderador = await Usuario.objects.aget(pk=self.moderador.pk)
+        self.assertEqual(await moderador.anombres_grupos(), (settings.GRUPOS.MODERADOR,))
+        self.assertTrue(moderador.is_moderador)
@@ -0,0 +1,133 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.views import View
+
+from apps.espacios.models import Espacio
+from apps.reservas.forms import ReservaCreateForm
+from apps.reservas.views import UsuarioAutocomplete
+from apps.usuarios.models import Ubicacion, Usuario
+from library.mixins.helpers import AutocompleteMixin
+
+
+class AutocompleteTest(TestCase):
+    """Los endpoints de autocompletado respetan el alcance de cada rol y paginan"""
+
+    def setUp(self):
+        self.ubicacion = Ubicacion.objects.create(nombre='Sede Central')
+        otra = Ubicacion.objects.create(nombre='Sede Norte')
+        self.admin = self.crear_usuario('admin', settings.GRUPOS.ADMINISTRADOR)
+        self.moderador = self.crear_usuario(
+            'moderador', settings.GRUPOS.MODERADOR, ubicacion=self.ubicacion, piso=1)
+        self.ana = self.crear_usuario('Ana', settings.GRUPOS.USUARIO, ubicacion=self.ubicacion, piso=1)
+        self.andres = self.crear_usuario('andres', settings.GRUPOS.USUARIO, ubicacion=otra, piso=1)
+        # En dos grupos: no debe aparecer duplicado
+        self.andres.groups.add(Group.objects.get(name=settings.GRUPOS.MODERADOR))
+        self.crear_usuario('beto', settings.GRUPOS.USUARIO, ubicacion=self.ubicacion, piso=1)
+
+        Espacio.objects.create(nombre='Salon101', ubicacion=self.ubicacion, piso=1,
+                               capacidad=30, tipo=Espacio.Tipo.SALON)
+        Espacio.objects.create(nombre='salon102', ubicacion=self.ubicacion, piso=1,
+                               capacidad=30, tipo=Espacio.Tipo.SALON)
+        Espacio.objects.create(nombre='Salon103', ubicacion=self.ubicacion, piso=1,
+                               capacidad=30, tipo=Espacio.Tipo.SALON, disponible=False)
+
+    def crear_usuario(self, username, grupo, **kwargs):
+        usuario = Usuario.objects.create_user(
+            username=username, email=f'{username}@example.com', password='pass', **kwargs)
+        usuario.groups.add(Group.objects.get(name=grupo))
+        return usuario
+
+    def buscar(self, url_name, usuario, **params):
+        self.client.force_login(usuario)
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def textos(self, datos):
+        return [r['text'] for r in datos['results']]
+
+    def test_prefijo_sin_distinguir_mayusculas(self):
+        datos = self.buscar('reserva_autocomplete_usuarios', self.admin, q='AN')
+        self.assertEqual(self.textos(datos), ['Ana', 'andres'])
+        self.assertFalse(datos['pagination']['more'])
+
+    def test_alcance_del_moderador(self):
+        datos = self.buscar('reserva_autocomplete_usuarios', self.moderador)
+        self.assertEqual(self.textos(datos), ['Ana', 'beto', 'moderador'])
+
+    def test_usuario_solo_se_ve_a_si_mismo(self):
+        datos = self.buscar('reserva_autocomplete_usuarios', self.ana)
+        self.assertEqual(self.textos(datos), ['Ana'])
+
+    def test_espacios_disponibles(self):
+        datos = self.buscar('reserva_autocomplete_espacios', self.ana, q='sal')
+        self.assertEqual(self.textos(datos), ['Salon101 - Sede Central - 1', 'salon102 - Sede Central - 1'])
+
+    def test_paginacion(self):
+        self.client.force_login(self.admin)
+        url = reverse('reserva_autocomplete_usuarios')
+        UsuarioAutocomplete.page_size, original = 2, UsuarioAutocomplete.page_size
+        try:
+            primera = self.client.get(url).json()
+            segunda = self.client.get(url, {'page': 2}).json()
+        finally:
+            UsuarioAutocomplete.page_size = original
+        self.assertEqual(self.textos(primera), ['admin', 'Ana'])
+        self.assertTrue(primera['pagination']['more'])
+        self.assertEqual(self.textos(segunda), ['andres', 'beto'])
+        self.assertTrue(segunda['pagination']['more'])
+
+    def test_busqueda_usa_indice_lower(self):
+        queryset = UsuarioAutocomplete().buscar(Usuario.objects.all(), 'an')
+        with connection.cursor() as cursor:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(fila) for fila in cursor.fetchall())
+        self.assertIn('usuario_username_lower_idx', plan)
+
+    def test_formulario_solo_renderiza_la_opcion_seleccionada(self):
+        request = RequestFactory().get('/')
+        request.user = self.admin
+        form = ReservaCreateForm(request=request, initial={'usuario': self.ana.pk})
+        html = str(form['usuario'])
+        self.assertIn('data-autocomplete-url="%s"' % reverse('reserva_autocomplete_usuarios'), html)
+        self.assertIn('>Ana</option>', html)
+        self.assertNotIn('beto', html)
+        self.assertNotIn('Salon101', str(form['espacio']))
+
+    def test_pk_no_numerica_es_un_error_de_validacion(self):
+        self.client.force_login(self.admin)
+        espacio = Espacio.objects.get(nombre='Salon101')
+        response = self.client.post(reverse('reserva_create'), {
+            'usuario': 'abc', 'espacio': espacio.pk, 'fecha_uso': date.today() + timedelta(days=1),
+            'hora_inicio': '08:00', 'hora_fin': '09:00', 'motivo': 'Reunión',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('usuario', response.context['form'].errors)
+        self.assertNotIn('value="abc"', response.content.decode())
+
+    def test_formulario_valida_contra_el_alcance(self):
+        request = RequestFactory().get('/')
+        request.user = self.moderador
+        form = ReservaCreateForm(request=request)
+        self.assertIn(self.ana, form.fields['usuario'].queryset)
+        self.assertNotIn(self.andres, form.fields['usuario'].queryset)
+
+    def test_configuracion_incompleta(self):
+        class SinQueryset(AutocompleteMixin, View):
+            search_field = 'nombre'
+
+        class SinCampo(AutocompleteMixin, View):
+            def get_queryset(self):
+                return Espacio.objects.all()
+
+        request = RequestFactory().get('/')
+        for vista in (SinQueryset, SinCampo):
+            with self.subTest(vista=vista.__name__), self.assertRaises(ImproperlyConfigured):
+                vista.as_view()(request)
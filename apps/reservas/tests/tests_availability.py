@@ -0,0 +1,111 @@
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.espacios.models import Espacio
+from apps.reservas.models import Reserva
+from apps.usuarios.models import Ubicacion, Usuario
+
+
+class AvailabilityFixtureMixin:
+    def crear_datos(self):
+        self.ubicacion = Ubicacion.objects.create(nombre='Sede Central')
+        self.usuario = Usuario.objects.create_user(
+            username='usuario', email='usuario@example.com', password='pass')
+        self.otro = Usuario.objects.create_user(
+            username='otro', email='otro@example.com', password='pass')
+        self.espacio = Espacio.objects.create(
+            nombre='Salon101', ubicacion=self.ubicacion, piso=1,
+            capacidad=30, tipo=Espacio.Tipo.SALON, disponible=True)
+        self.fecha = date.today() + timedelta(days=1)
+        self.aprobada = Reserva.objects.create(
+            usuario=self.usuario, espacio=self.espacio, fecha_uso=self.fecha,
+            hora_inicio=time(10, 0), hora_fin=time(12, 0),
+            estado=Reserva.Estado.APROBADA, motivo='Reunión')
+
+    def nueva_reserva(self, inicio, fin):
+        return Reserva(
+            usuario=self.otro, espacio=self.espacio, fecha_uso=self.fecha,
+            hora_inicio=inicio, hora_fin=fin, motivo='Taller')
+
+
+class ReservaCleanSolapamientoTest(AvailabilityFixtureMixin, TestCase):
+    """Reserva.clean sigue rechazando solapamientos con reservas aprobadas"""
+
+    def setUp(self):
+        self.crear_datos()
+
+    def test_clean_detecta_solapamiento(self):
+        with self.assertRaisesMessage(ValidationError, 'solapada'):
+            self.nueva_reserva(time(11, 0), time(13, 0)).clean()
+
+    def test_clean_permite_franja_contigua(self):
+        self.nueva_reserva(time(12, 0), time(13, 0)).clean()
+
+    def test_reserva_aprobada_no_se_solapa_consigo_misma(self):
+        self.aprobada.hora_fin = time(12, 30)
+        with self.assertRaises(ValidationError) as ctx:
+            self.aprobada.clean()
+        self.assertNotIn('solapada', str(ctx.exception))
+
+    def test_clean_ve_aprobaciones_sin_senales(self):
+        # Otro proceso (o un UPDATE masivo) la aprueba: clean consulta la base de datos
+        pendiente = self.nueva_reserva(time(14, 0), time(16, 0))
+        pendiente.save()
+        Reserva.objects.filter(pk=pendiente.pk).update(estado=Reserva.Estado.APROBADA)
+
+        with self.assertRaisesMessage(ValidationError, 'solapada'):
+            Reserva(usuario=self.usuario, espacio=self.espacio, fecha_uso=self.fecha,
+                    hora_inicio=time(14, 30), hora_fin=time(15, 0), motivo='Reunión').clean()
+
+
+class EspaciosLibresTest(AvailabilityFixtureMixin, TestCase):
+    """api/espacios-libres/ devuelve los espacios sin reservas aprobadas solapadas"""
+
+    def setUp(self):
+        self.crear_datos()
+        self.usuario.groups.add(Group.objects.get(name=settings.GRUPOS.USUARIO))
+        self.laboratorio = Espacio.objects.create(
+            nombre='Lab201', ubicacion=self.ubicacion, piso=2,
+            capacidad=60, tipo=Espacio.Tipo.LABORATORIO)
+        self.no_disponible = Espacio.objects.create(
+            nombre='Salon301', ubicacion=self.ubicacion, piso=3,
+            capacidad=30, tipo=Espacio.Tipo.SALON, disponible=False)
+        # Las pendientes y rechazadas no ocupan la franja
+        Reserva.objects.create(
+            usuario=self.otro, espacio=self.laboratorio, fecha_uso=self.fecha,
+            hora_inicio=time(10, 0), hora_fin=time(12, 0), motivo='Taller')
+        self.client.force_login(self.usuario)
+        self.url = reverse('espacios_libres')
+
+    def buscar(self, inicio, fin, **params):
+        return self.client.get(self.url, {
+            'fecha_uso': self.fecha.isoformat(), 'hora_inicio': inicio, 'hora_fin': fin, **params,
+        })
+
+    def nombres(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [e['nombre'] for e in response.json()]
+
+    def test_excluye_solapados_y_no_disponibles(self):
+        self.assertEqual(self.nombres(self.buscar('11:00', '13:00')), ['Lab201'])
+        self.assertEqual(self.nombres(self.buscar('12:00', '13:00')), ['Salon101', 'Lab201'])
+
+    def test_filtros_opcionales(self):
+        self.assertEqual(self.nombres(self.buscar('08:00', '09:00', capacidad=50)), ['Lab201'])
+        self.assertEqual(self.nombres(self.buscar('08:00', '09:00', tipo='salon')), ['Salon101'])
+        otra = Ubicacion.objects.create(nombre='Sede Norte')
+        self.assertEqual(self.nombres(self.buscar('08:00', '09:00', ubicacion=otra.pk)), [])
+
+    def test_una_sola_consulta(self):
+        self.buscar('08:00', '09:00')
+        with self.assertNumQueries(5):  # sesión, usuario, 2 de permisos y la búsqueda
+            self.buscar('08:00', '09:00', capacidad=10, tipo='salon')
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.buscar('13:00', '12:00').status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
@@ -0,0 +1,186 @@
+from datetime import date, time, timedelta
+from unittest import mock
+import time as reloj
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.espacios.models import Espacio
+from apps.reservas.models import Reserva
+from apps.reservas.views import ReservasByDate
+from apps.usuarios.models import Ubicacion, Usuario
+
+
+class DatosCalendario:
+    """Reservas de un día y helpers compartidos por las pruebas de caché del calendario"""
+
+    def setUp(self):
+        cache.clear()
+        self.ubicacion = Ubicacion.objects.create(nombre='Sede Central')
+        self.admin = self.crear_usuario('admin', settings.GRUPOS.ADMINISTRADOR)
+        self.usuario = self.crear_usuario('usuario', settings.GRUPOS.USUARIO)
+        self.otro = self.crear_usuario('otro', settings.GRUPOS.USUARIO)
+        self.espacio = Espacio.objects.create(nombre='Salon101', ubicacion=self.ubicacion, piso=1,
+                                              capacidad=30, tipo=Espacio.Tipo.SALON)
+        self.fecha = date.today() + timedelta(days=1)
+        self.reserva = self.crear_reserva(self.usuario, time(8, 0))
+        self.crear_reserva(self.otro, time(10, 0))
+
+    def crear_usuario(self, username, grupo):
+        usuario = Usuario.objects.create_user(
+            username=username, email=f'{username}@example.com', password='pass')
+        usuario.groups.add(Group.objects.get(name=grupo))
+        return usuario
+
+    def crear_reserva(self, usuario, inicio):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Reserva.objects.create(
+                usuario=usuario, espacio=self.espacio, fecha_uso=self.fecha,
+                hora_inicio=inicio, hora_fin=time(inicio.hour + 1, 0), motivo='Reunión')
+
+    def pedir(self, usuario, **headers):
+        self.client.force_login(usuario)
+        return self.client.get(self.url, self.params, headers=headers)
+
+
+class CacheTarjetasTest(DatosCalendario, TestCase):
+    """La lista de reservas de un día se sirve desde la caché y se invalida con los cambios"""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('reservas_by_date')
+        self.params = {'fecha_uso': self.fecha.isoformat(), 'estado': ''}
+
+    def test_segunda_peticion_sin_consultar_reservas(self):
+        primera = self.pedir(self.admin)
+        with CaptureQueriesContext(connection) as consultas:
+            segunda = self.pedir(self.admin)
+        self.assertEqual(primera.content, segunda.content)
+        self.assertFalse([q for q in consultas.captured_queries if 'reservas_reserva' in q['sql']])
+        self.assertIn('no-cache', segunda['Cache-Control'])
+        self.assertIn('private', segunda['Cache-Control'])
+
+    def test_etag_304(self):
+        etag = self.pedir(self.admin)['ETag']
+        response = self.pedir(self.admin, **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_alcance_por_usuario(self):
+        self.assertContains(self.pedir(self.admin), 'otro')
+        propia = self.pedir(self.usuario)
+        self.assertNotContains(propia, 'otro')
+        self.assertNotEqual(propia['ETag'], self.pedir(self.otro)['ETag'])
+
+    def test_cambio_en_la_fecha_invalida(self):
+        antes = self.pedir(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reserva.motivo = 'Taller de robótica'
+            self.reserva.save()
+        despues = self.pedir(self.admin, **{'If-None-Match': antes['ETag']})
+        self.assertEqual(despues.status_code, 200)
+        self.assertContains(despues, 'Taller de robótica')
+
+    def test_mover_la_reserva_invalida_ambas_fechas(self):
+        otra_fecha = self.fecha + timedelta(days=1)
+        self.pedir(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reserva.fecha_uso = otra_fecha
+            self.reserva.save()
+        self.assertEqual(self.pedir(self.admin).content.count(b'collapse-title'), 1)
+        self.params['fecha_uso'] = otra_fecha.isoformat()
+        self.assertEqual(self.pedir(self.admin).content.count(b'collapse-title'), 1)
+
+    def test_cambio_de_espacio_invalida(self):
+        self.pedir(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.espacio.nombre = 'Aula Magna'
+            self.espacio.save()
+        self.assertContains(self.pedir(self.admin), 'Aula Magna')
+
+    def test_fecha_no_canonica_no_envenena_la_cache(self):
+        # El filtro rechaza 20301105 (date.fromisoformat lo acepta): la lista sale vacía
+        self.params['fecha_uso'] = self.fecha.strftime('%Y%m%d')
+        no_canonica = self.pedir(self.admin)
+        self.assertNotContains(no_canonica, 'Salon101')
+        self.assertFalse(no_canonica.has_header('ETag'))
+
+        self.params['fecha_uso'] = self.fecha.isoformat()
+        canonica = self.pedir(self.admin)
+        self.assertContains(canonica, 'Salon101')
+        self.assertTrue(canonica.has_header('ETag'))
+
+    def test_enlaces_de_paginacion_con_los_filtros_validados(self):
+        # Misma clave que la petición normal, con parámetros extra y en otro orden
+        self.params = {'foo': 'bar', 'estado': 'pendiente', 'fecha_uso': self.fecha.isoformat()}
+        with mock.patch.object(ReservasByDate, 'paginate_by', 1):
+            response = self.pedir(self.admin)
+        self.assertContains(
+            response, f'?page=2&fecha_uso={self.fecha.isoformat()}&amp;estado=pendiente"')
+        self.assertNotContains(response, 'foo')
+
+    def test_sin_fecha_no_se_cachea(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class EtagConteosTest(DatosCalendario, TestCase):
+    """Los conteos mensuales responden 304 mientras no cambie una reserva de los meses pedidos"""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('reservas_monthly_count')
+        inicio = self.fecha.replace(day=1)
+        self.params = {'start': inicio.isoformat(), 'end': (inicio + timedelta(days=41)).isoformat()}
+
+    def test_etag_304(self):
+        primera = self.pedir(self.admin)
+        self.assertEqual(primera.status_code, 200)
+        self.assertIn('no-cache', primera['Cache-Control'])
+        with CaptureQueriesContext(connection) as consultas:
+            segunda = self.pedir(self.admin, **{'If-None-Match': primera['ETag']})
+        self.assertEqual(segunda.status_code, 304)
+        self.assertFalse([q for q in consultas.captured_queries if 'reservas_' in q['sql']])
+
+    def test_cambio_en_el_rango_invalida(self):
+        etag = self.pedir(self.admin)['ETag']
+        self.crear_reserva(self.admin, time(12, 0))
+        response = self.pedir(self.admin, **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(dia['pendiente_count'] for dia in response.json()), 3)
+
+    def test_cambio_fuera_del_rango_no_invalida(self):
+        etag = self.pedir(self.admin)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Reserva.objects.create(
+                usuario=self.admin, espacio=self.espacio, fecha_uso=self.fecha + timedelta(days=120),
+                hora_inicio=time(8, 0), hora_fin=time(9, 0), motivo='Reunión')
+        self.assertEqual(self.pedir(self.admin, **{'If-None-Match': etag}).status_code, 304)
+
+    def test_versiones_caducan(self):
+        # Los cambios de otros procesos no renuevan las versiones de éste: caducan solas
+        etag = self.pedir(self.admin)['ETag']
+        self.assertEqual(self.pedir(self.admin, **{'If-None-Match': etag}).status_code, 304)
+
+        despues = reloj.time() + settings.RESERVAS_CALENDARIO_CACHE_TTL + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=despues):
+            response = self.pedir(self.admin, **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_estado_y_alcance_en_el_etag(self):
+        etag = self.pedir(self.admin)['ETag']
+        self.assertNotEqual(self.pedir(self.usuario)['ETag'], etag)
+        self.params['status'] = 'aprobada'
+        self.assertNotEqual(self.pedir(self.admin)['ETag'], etag)
+
+    def test_rango_demasiado_largo_sin_etag(self):
+        self.params['end'] = (self.fecha + timedelta(days=800)).isoformat()
+        self.assertFalse(self.pedir(self.admin).has_header('ETag'))
@@ -0,0 +1,96 @@
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.espacios.models import Espacio
+from apps.reservas.models import Reserva, ReservaDailyRollup
+from apps.reservas.rollup import recalcular
+from apps.usuarios.models import Ubicacion, Usuario
+
+
+class ReservaDailyRollupTest(TestCase):
+    """El resumen diario se mantiene al crear, modificar y eliminar reservas"""
+
+    def setUp(self):
+        self.ubicacion = Ubicacion.objects.create(nombre='Sede Central')
+        self.otra_ubicacion = Ubicacion.objects.create(nombre='Sede Norte')
+        self.admin = self.crear_usuario('admin', settings.GRUPOS.ADMINISTRADOR)
+        self.moderador = self.crear_usuario(
+            'moderador', settings.GRUPOS.MODERADOR, ubicacion=self.ubicacion, piso=1)
+        self.usuario = self.crear_usuario('usuario', settings.GRUPOS.USUARIO)
+        self.espacio = Espacio.objects.create(
+            nombre='Salon101', ubicacion=self.ubicacion, piso=1,
+            capacidad=30, tipo=Espacio.Tipo.SALON)
+        self.otro_espacio = Espacio.objects.create(
+            nombre='Salon201', ubicacion=self.otra_ubicacion, piso=2,
+            capacidad=30, tipo=Espacio.Tipo.SALON)
+        self.fecha = date.today() + timedelta(days=1)
+
+    def crear_usuario(self, username, grupo, **kwargs):
+        usuario = Usuario.objects.create_user(
+            username=username, email=f'{username}@example.com', password='pass', **kwargs)
+        usuario.groups.add(Group.objects.get(name=grupo))
+        return usuario
+
+    def crear_reserva(self, espacio, fecha=None, estado=Reserva.Estado.PENDIENTE, usuario=None, **kwargs):
+        return Reserva.objects.create(
+            usuario=usuario or self.usuario, espacio=espacio, fecha_uso=fecha or self.fecha,
+            hora_inicio=time(8, 0), hora_fin=time(9, 0), estado=estado, motivo='Reunión', **kwargs)
+
+    def conteos(self):
+        return {
+            (r.espacio_id, r.fecha_uso, r.estado): r.total
+            for r in ReservaDailyRollup.objects.filter(total__gt=0)
+        }
+
+    def test_crear_modificar_y_eliminar(self):
+        reserva = self.crear_reserva(self.espacio)
+        self.assertEqual(self.conteos(), {(self.espacio.pk, self.fecha, 'pendiente'): 1})
+
+        reserva.estado = Reserva.Estado.APROBADA
+        reserva.aprobado_por = self.admin
+        reserva.save()
+        self.assertEqual(self.conteos(), {(self.espacio.pk, self.fecha, 'aprobada'): 1})
+
+        manana = self.fecha + timedelta(days=1)
+        reserva = Reserva.objects.get(pk=reserva.pk)
+        reserva.fecha_uso = manana
+        reserva.save()
+        self.assertEqual(self.conteos(), {(self.espacio.pk, manana, 'aprobada'): 1})
+
+        reserva.delete()
+        self.assertEqual(self.conteos(), {})
+
+    def test_recalcular_coincide_con_incremental(self):
+        self.crear_reserva(self.espacio)
+        self.crear_reserva(self.otro_espacio, estado=Reserva.Estado.RECHAZADA, aprobado_por=self.admin)
+        esperado = self.conteos()
+
+        ReservaDailyRollup.objects.all().delete()
+        recalcular()
+        self.assertEqual(self.conteos(), esperado)
+
+    def test_calendario_respeta_el_rol(self):
+        self.crear_reserva(self.espacio)
+        self.crear_reserva(self.otro_espacio, estado=Reserva.Estado.APROBADA, aprobado_por=self.admin)
+        # Reserva propia del moderador fuera de su piso
+        self.crear_reserva(self.otro_espacio, usuario=self.moderador)
+
+        url = reverse('reservas_monthly_count')
+        params = {'start': self.fecha.isoformat(), 'end': self.fecha.isoformat()}
+        dia = self.fecha.isoformat()
+
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(url, params).json(), [
+            {'fecha_uso': dia, 'pendiente_count': 2, 'aprobada_count': 1, 'rechazada_count': 0}])
+
+        self.client.force_login(self.moderador)
+        self.assertEqual(self.client.get(url, params).json(), [
+            {'fecha_uso': dia, 'pendiente_count': 2, 'aprobada_count': 0, 'rechazada_count': 0}])
+
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(url, {**params, 'status': 'aprobada'}).json(), [
+            {'fecha_uso': dia, 'pendiente_count': 0, 'aprobada_count': 1, 'rechazada_count': 0}])
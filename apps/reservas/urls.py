@@ -12,6 +12,9 @@ urlpatterns = [
     path('delete/<int:pk>/', ReservaDeleteView.as_view(), name='reserva_delete'),
     path('calendario/', CalendarioReservasView.as_view(), name='calendario'),
     path('api/mes/', ReservasMonthlyCount.as_view(), name='reservas_monthly_count'),
+    path('api/espacios-libres/', EspaciosDisponibles.as_view(), name='espacios_libres'),
+    path('api/usuarios/', UsuarioAutocomplete.as_view(), name='reserva_autocomplete_usuarios'),
+    path('api/espacios/', EspacioAutocomplete.as_view(), name='reserva_autocomplete_espacios'),
 
     path('api/fecha/', ReservasByDate.as_view(), name='reservas_by_date'),
     path('gestionar/<int:pk>/', ReservaApproveView.as_view(), name='reserva_approve'),
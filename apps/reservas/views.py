@@ -6,6 +6,8 @@ Views para las reservas
 * ReservaUpdateView: Edita una reserva existente
 * ReservaDetailView: Muestra los detalles de una reserva
 * ReservaDeleteView: Elimina una reserva existente
+* EspaciosDisponibles: Espacios libres para una franja horaria (JSON)
+* UsuarioAutocomplete / EspacioAutocomplete: Opciones de usuario y espacio del formulario de reserva (Select2)
 
 """
 import json
@@ -19,36 +21,70 @@ from django.db.models.functions import Lower
 from django.urls import reverse_lazy, reverse
 from .filters import *
 from .forms import *
-from django.db.models import Q, Count
+from django.db.models import Q, F
 from django.http import JsonResponse
 from datetime import datetime
 from django.views import View
 from django.views.generic import TemplateView
-from django.http import Http404
+from .rollup import aconteos_diarios
+from .availability import espacios_libres
+from apps.espacios.models import Espacio
+from django.http import Http404, HttpResponse
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.template.loader import render_to_string
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import urlencode
+from . import cache as cache_calendario
 
 def qs_condiciones(user):
+    """
+    Reservas visibles para el usuario. Cada rama del moderador es una columna
+    propia de Reserva con su índice (usuario, aprobado_por y ubicacion+piso,
+    copiados del espacio), así que la base de datos resuelve el OR como una
+    unión de búsquedas por índice en vez de recorrer la tabla con un join.
+    """
     if user.is_admin:
         return Q()
     elif user.is_moderador:
         return Q(
             Q(usuario=user) | 
             Q(aprobado_por=user) | 
-            (Q(espacio__ubicacion=user.ubicacion)  & 
-            Q(espacio__piso=user.piso))
+            Q(ubicacion_id=user.ubicacion_id, piso=user.piso)
         )
     elif user.is_usuario:
         return Q(usuario=user)
     return Q()
 
-class ReservasMonthlyCount(LoginRequiredMixin, PermissionRequiredMixin,View):
+
+def rollup_condiciones(user):
+    """
+    Reparte qs_condiciones entre el resumen diario y las reservas en bruto.
+
+    Retorna:
+        tuple: (filtro sobre ReservaDailyRollup, filtro sobre Reserva); None omite esa parte.
+    """
+    if user.is_admin:
+        return Q(), None
+    elif user.is_moderador:
+        ubicacion = Q(espacio__ubicacion_id=user.ubicacion_id) & Q(espacio__piso=user.piso)
+        propias = (Q(usuario=user) | Q(aprobado_por=user)) & ~Q(ubicacion_id=user.ubicacion_id, piso=user.piso)
+        return ubicacion, propias
+    elif user.is_usuario:
+        return None, Q(usuario=user)
+    return Q(), None
+
+class ReservasMonthlyCount(AsyncPermissionRequiredMixin, View):
     """
     Devuelve un conteo de reservas por día para un rango de fechas,
     opcionalmente filtrado por estado.
     Usado por el calendario para mostrar indicadores de actividad.
+    Es asíncrona: bajo ASGI no ocupa un hilo mientras espera a la base de datos.
     """
     permission_required = 'reservas.view_reserva'
     
-    def get(self, request):
+    async def get(self, request):
         start_str = request.GET.get('start')
         end_str = request.GET.get('end')
         status = request.GET.get('status')
@@ -62,27 +98,74 @@ class ReservasMonthlyCount(LoginRequiredMixin, PermissionRequiredMixin,View):
         except (ValueError, TypeError):
             return JsonResponse({'error': 'Formato de fecha invalido'}, status=400)
 
-        condiciones = qs_condiciones(self.request.user)
-        queryset = Reserva.objects.filter(
-            condiciones,
-            fecha_uso__gte=start_date,
-            fecha_uso__lte=end_date,
+        possible_states = ['pendiente', 'aprobada', 'rechazada']
+        estados = [status] if status in possible_states else possible_states
+
+        # Si el navegador ya tiene los conteos de la versión actual, no se agregan
+        etag = await cache_calendario.aetag_conteos(request.user, start_date.date(), end_date.date(), estados)
+        if etag is not None:
+            etag = quote_etag(etag)
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                return response
+
+        filtro_rollup, filtro_reservas = rollup_condiciones(request.user)
+        daily_counts = await aconteos_diarios(
+            start_date.date(), end_date.date(), estados,
+            filtro_rollup=filtro_rollup, filtro_reservas=filtro_reservas,
         )
-        
+        response = JsonResponse(daily_counts, safe=False)
+        if etag is not None:
+            response['ETag'] = etag
+            # El navegador guarda la respuesta pero la revalida en cada uso (304 si no cambió)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
 
-        possible_states = ['pendiente', 'aprobada', 'rechazada']
 
-        if status and status in possible_states:
-            queryset = queryset.filter(estado=status)
-        else: 
-            queryset = queryset.filter(estado__in=possible_states)
+class EspaciosDisponibles(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """
+    Devuelve los espacios libres para una franja (fecha_uso, hora_inicio, hora_fin),
+    opcionalmente filtrados por capacidad mínima, tipo y ubicación.
+    Usado al crear reservas para no tener que adivinar un espacio sin conflictos.
+    """
+    permission_required = 'reservas.view_reserva'
+
+    def get(self, request):
+        form = EspaciosLibresForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({'error': form.errors}, status=400)
+
+        espacios = espacios_libres(
+            form.cleaned_data['fecha_uso'],
+            form.cleaned_data['hora_inicio'],
+            form.cleaned_data['hora_fin'],
+            queryset=Espacio.objects.filter(form.filtro_espacios()),
+        ).order_by('ubicacion__nombre', 'piso', 'nombre').values(
+            'id', 'nombre', 'piso', 'capacidad', 'tipo', ubicacion_nombre=F('ubicacion__nombre'),
+        )
+        return JsonResponse(list(espacios), safe=False)
+
 
-        daily_counts = queryset.values('fecha_uso').annotate(
-            pendiente_count=Count('id', filter=Q(estado='pendiente')),
-            aprobada_count=Count('id', filter=Q(estado='aprobada')),
-            rechazada_count=Count('id', filter=Q(estado='rechazada'))
-        ).order_by('fecha_uso')
-        return JsonResponse(list(daily_counts), safe=False)
+class UsuarioAutocomplete(LoginRequiredMixin, PermissionRequiredMixin, AutocompleteMixin, View):
+    """
+    Usuarios para los que se puede crear una reserva, buscados por prefijo del username
+    """
+    permission_required = 'reservas.add_reserva'
+    search_field = 'username'
+
+    def get_queryset(self):
+        return usuarios_reservables(self.request.user)
+
+
+class EspacioAutocomplete(LoginRequiredMixin, PermissionRequiredMixin, AutocompleteMixin, View):
+    """
+    Espacios disponibles para reservar, buscados por prefijo del nombre
+    """
+    permission_required = 'reservas.add_reserva'
+    search_field = 'nombre'
+
+    def get_queryset(self):
+        return espacios_reservables(self.request.user).select_related('ubicacion')
 
 
 class CalendarioReservasView(LoginRequiredMixin, TemplateView):
@@ -92,11 +175,11 @@ class CalendarioReservasView(LoginRequiredMixin, TemplateView):
     template_name = 'reservas/calendario.html'
 
 
-class ReservasByDate(PermissionRequiredMixin, FilterView):
+class ReservasByDate(AsyncPermissionRequiredMixin, View):
     """
-    Muestra una lista de reservas filtradas por fecha
+    Muestra una lista de reservas filtradas por fecha.
+    Es asíncrona, como ReservasMonthlyCount: filtra y pagina con la ORM asíncrona.
     """
-    model = Reserva
     permission_required = 'reservas.view_reserva'
     template_name = 'includes/reservas_cardslist.html'
     paginate_by = 7
@@ -104,25 +187,94 @@ class ReservasByDate(PermissionRequiredMixin, FilterView):
     context_object_name = 'reservas'   
     ordering = ['hora_inicio']
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        
-        # Agregar parámetros actuales al contexto para la paginación
-        context['current_filters'] = self.request.GET.dict()
-        
+    async def get(self, request, *args, **kwargs):
+        """
+        Sirve la lista desde la caché del calendario (ver cache.py) y responde
+        304 si el navegador ya tiene la versión actual.
+
+        Solo se cachean los filtros válidos con fecha_uso en forma canónica
+        (YYYY-MM-DD): la clave sale de los datos ya validados, y los enlaces de
+        paginación del HTML también (ver renderizar).
+        """
+        filterset = self.filterset_class(request.GET or None, queryset=self.get_queryset(), request=request)
+        fecha = filterset.form.cleaned_data.get('fecha_uso') if filterset.is_bound and filterset.is_valid() else None
+        if fecha is None or request.GET.get('fecha_uso') != fecha.isoformat():
+            return HttpResponse(await self.renderizar(request, filterset))
+
+        clave = await cache_calendario.aclave_tarjetas(
+            request.user, fecha, filterset.form.cleaned_data.get('estado') or '', request.GET.get('page', '1'))
+        etag = quote_etag(clave.rsplit(':', 1)[-1])
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            contenido = await cache.aget(clave)
+            if contenido is None:
+                contenido = await self.renderizar(request, filterset)
+                await cache.aset(clave, contenido, settings.RESERVAS_CALENDARIO_CACHE_TTL)
+            response = HttpResponse(contenido)
+        response['ETag'] = etag
+        # Cada uso se revalida con el servidor; la respuesta depende del usuario
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_queryset(self):
+        # La plantilla muestra el usuario y el espacio de cada reserva
+        return (
+            Reserva.objects.filter(qs_condiciones(self.request.user))
+            .select_related('usuario', 'espacio')
+            .order_by(*self.ordering)
+        )
+
+    async def renderizar(self, request, filterset):
+        """
+        HTML de la página pedida: filtra como FilterView (sin resultados si el
+        filtro no es válido), pagina y carga las reservas con la ORM asíncrona.
+        """
+        if not filterset.is_bound or filterset.is_valid():
+            reservas = filterset.qs
+        else:
+            reservas = filterset.queryset.none()
+
+        paginator = Paginator(reservas, self.paginate_by)
+        # count es una cached_property: se fija aquí para que la paginación no la calcule síncronamente
+        paginator.count = await reservas.acount()
+        numero = request.GET.get('page') or 1
+        try:
+            numero = paginator.num_pages if numero == 'last' else paginator.validate_number(numero)
+        except InvalidPage as e:
+            raise Http404(f'Página inválida ({numero}): {e}')
+        inicio = (numero - 1) * self.paginate_by
+        page = Page([reserva async for reserva in reservas[inicio:inicio + self.paginate_by]], numero, paginator)
+
+        context = {
+            'view': self,
+            'filter': filterset,
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'object_list': page.object_list,
+            self.context_object_name: page.object_list,
+            # Filtros de los enlaces de paginación: los validados, no request.GET,
+            # para que el HTML cacheado sirva a cualquier petición con la misma clave
+            'current_filters': self.filtros_paginacion(filterset),
+        }
         # Si es una petición HTMX, podemos agregar información adicional
-        if self.request.headers.get('HX-Request'):
+        if request.headers.get('HX-Request'):
             context['is_htmx'] = True
-            
-        return context
+        return render_to_string(self.template_name, context, request)
+
+    @staticmethod
+    def filtros_paginacion(filterset):
+        """Query string (sin page) con la fecha y el estado validados del filtro."""
+        if not filterset.is_bound or not filterset.is_valid():
+            return ''
+        fecha = filterset.form.cleaned_data.get('fecha_uso')
+        filtros = {
+            'fecha_uso': fecha.isoformat() if fecha else '',
+            'estado': filterset.form.cleaned_data.get('estado') or '',
+        }
+        return urlencode({campo: valor for campo, valor in filtros.items() if valor})
+
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        condiciones = qs_condiciones(self.request.user)
-        qs = qs.filter(condiciones)
-        return qs
- 
-    
 class ReservaListView(LoginRequiredMixin, PermissionRequiredMixin, SmartOrderingMixin, ListCrudMixin, FilterView):
     """
     Muestra una lista de reservas con un formulario de filtrado
@@ -143,6 +295,9 @@ class ReservaListView(LoginRequiredMixin, PermissionRequiredMixin, SmartOrdering
         'aprobado_por': 'Aprobado por',
     }
 
+    # La columna espacio muestra también su ubicación
+    cols_related = {'espacio': ('espacio__ubicacion',)}
+
     # Es importante el nombre (key) que sean los definidos, para que el template pueda usarlos. 
     # El value debe ser el nombre de la url que se define en urls.py
     crud_urls = {
@@ -1,20 +1,21 @@
 import django_filters
 from django import forms
+from apps.core.search import BusquedaFilter
 from apps.usuarios.models import Ubicacion
 from apps.usuarios.models import Usuario
 from django.contrib.auth.models import Group
 from django.conf import settings
 
 class UsuarioFilter(django_filters.FilterSet):
-    username = django_filters.CharFilter(
-        lookup_expr='icontains',
+    username = BusquedaFilter(
+        field_name='username',
         label='Nombre de usuario',
         widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Buscar por nombre de usuario...', 'id': 'username_filter'})
 
     )
     
-    email = django_filters.CharFilter(
-        lookup_expr='icontains',
+    email = BusquedaFilter(
+        field_name='email',
         label='Correo electrónico',
         widget=forms.EmailInput(attrs={'class': 'form-control', 'placeholder': 'Buscar por correo...', 'id': 'email_filter'})
     )
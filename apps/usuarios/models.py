@@ -6,6 +6,7 @@ from django.contrib.admin.models import LogEntry
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db.models import Q
+from django.db.models.functions import Lower
 
 
 # ——— 1. Ubicación —————————————————————————————————————————————
@@ -82,23 +83,73 @@ class Usuario(AbstractUser):
         verbose_name = "Usuario"
         verbose_name_plural = "Usuarios"
         ordering = ['username']
+        indexes = [
+            # Búsqueda por prefijo sin distinguir mayúsculas (autocompletado)
+            models.Index(Lower('username'), name='usuario_username_lower_idx'),
+        ]
 
 
     def __str__(self):
         return self.username
 
+    @property
+    def nombres_grupos(self):
+        """
+        Nombres de los grupos del usuario (ordenados por pk).
+
+        Se cargan con una sola consulta y se guardan en la instancia (que vive
+        lo que dura la petición), de modo que los roles no se vuelven a
+        consultar en cada propiedad. No se guardan entre peticiones: deciden
+        permisos, y un cambio de grupos (o el borrado de un grupo) debe valer
+        en la petición siguiente en todos los procesos.
+        """
+        try:
+            return self._nombres_grupos
+        except AttributeError:
+            pass
+
+        if self.pk is None:
+            return ()
+
+        self._nombres_grupos = tuple(self.groups.order_by('pk').values_list('name', flat=True))
+        return self._nombres_grupos
+
+    async def anombres_grupos(self):
+        """
+        Versión asíncrona de nombres_grupos para las vistas asíncronas: carga
+        los grupos con la ORM asíncrona y los deja en la instancia, de modo
+        que después is_admin, is_moderador, grupo, etc. no consultan la base de datos.
+        """
+        try:
+            return self._nombres_grupos
+        except AttributeError:
+            pass
+
+        if self.pk is None:
+            return ()
+
+        self._nombres_grupos = tuple([
+            nombre async for nombre in self.groups.order_by('pk').values_list('name', flat=True)
+        ])
+        return self._nombres_grupos
+
+    def invalidar_roles(self):
+        """Descarta los grupos memorizados en esta instancia."""
+        self.__dict__.pop('_nombres_grupos', None)
+
     @property
     def is_moderador(self):
-        return self.groups.filter(name=self.GRUPOS.MODERADOR).exists()
+        return self.GRUPOS.MODERADOR in self.nombres_grupos
 
     @property
     def is_usuario(self):
-        return self.groups.filter(name=self.GRUPOS.USUARIO).exists()
+        return self.GRUPOS.USUARIO in self.nombres_grupos
 
     @property
     def is_admin(self):
-        return self.groups.filter(name=self.GRUPOS.ADMINISTRADOR).exists()
+        return self.GRUPOS.ADMINISTRADOR in self.nombres_grupos
 
     @property
     def grupo(self):
-        return self.groups.first().name if self.groups.exists() else self.GRUPOS.USUARIO
+        nombres = self.nombres_grupos
+        return nombres[0] if nombres else self.GRUPOS.USUARIO
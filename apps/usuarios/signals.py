@@ -0,0 +1,15 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from apps.usuarios.models import Usuario
+
+
+@receiver(m2m_changed, sender=Usuario.groups.through)
+def invalidar_roles(sender, instance, action, reverse, **kwargs):
+    """
+    Descarta los grupos memorizados en la instancia cuyo groups cambia
+    (user.groups.add...). Las demás instancias viven una petición y leen los
+    grupos de nuevo en la siguiente.
+    """
+    if not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        instance.invalidar_roles()
@@ -1,3 +1,55 @@
+from django.conf import settings
+from django.contrib.auth.models import Group
 from django.test import TestCase
 
-# Create your tests here.
+from apps.usuarios.models import Usuario
+
+
+class RolesCacheTest(TestCase):
+    """Tests para la memoria de roles de cada instancia de Usuario"""
+
+    def setUp(self):
+        self.grupo_admin = Group.objects.get_or_create(name=settings.GRUPOS.ADMINISTRADOR)[0]
+        self.grupo_moderador = Group.objects.get_or_create(name=settings.GRUPOS.MODERADOR)[0]
+        self.usuario = Usuario.objects.create_user(
+            username='moderador', email='moderador@example.com', password='pass')
+        self.usuario.groups.add(self.grupo_moderador)
+
+    def test_propiedades_usan_una_sola_consulta(self):
+        usuario = Usuario.objects.get(pk=self.usuario.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(usuario.is_moderador)
+            self.assertFalse(usuario.is_admin)
+            self.assertFalse(usuario.is_usuario)
+            self.assertEqual(usuario.grupo, settings.GRUPOS.MODERADOR)
+
+    def test_roles_no_sobreviven_a_la_instancia(self):
+        # Deciden permisos: cada petición (instancia nueva) los vuelve a leer
+        self.usuario.groups.add(self.grupo_admin)
+        self.assertTrue(Usuario.objects.get(pk=self.usuario.pk).is_admin)
+        self.grupo_admin.delete()
+        usuario = Usuario.objects.get(pk=self.usuario.pk)
+        with self.assertNumQueries(1):
+            self.assertFalse(usuario.is_admin)
+            self.assertTrue(usuario.is_moderador)
+
+    def test_invalidacion_al_cambiar_grupos(self):
+        self.assertTrue(self.usuario.is_moderador)
+        self.usuario.groups.remove(self.grupo_moderador)
+        self.usuario.groups.add(self.grupo_admin)
+        self.assertTrue(self.usuario.is_admin)
+        self.assertFalse(Usuario.objects.get(pk=self.usuario.pk).is_moderador)
+
+    def test_invalidacion_desde_el_grupo(self):
+        self.assertFalse(Usuario.objects.get(pk=self.usuario.pk).is_admin)
+        self.grupo_admin.user_set.add(self.usuario)
+        self.assertTrue(Usuario.objects.get(pk=self.usuario.pk).is_admin)
+
+        self.grupo_admin.user_set.clear()
+        self.assertFalse(Usuario.objects.get(pk=self.usuario.pk).is_admin)
+
+    def test_usuario_sin_grupo(self):
+        usuario = Usuario.objects.create_user(
+            username='singrupo', email='singrupo@example.com', password='pass')
+        self.assertFalse(usuario.is_usuario)
+        self.assertEqual(usuario.grupo, settings.GRUPOS.USUARIO)
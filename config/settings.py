@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from cProfile import label
 from pathlib import Path
 
@@ -84,7 +85,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    "auditlog.middleware.AuditlogMiddleware",
+    # El de django-auditlog con camino asíncrono (ver apps/core/middleware.py)
+    'apps.core.middleware.AuditlogMiddleware',
+    'apps.core.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -111,10 +114,38 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# PRAGMAs que se aplican al abrir cada conexión de SQLite:
+# * journal_mode=WAL: las lecturas no esperan a las escrituras (y viceversa)
+# * synchronous=NORMAL: con WAL no se pierde consistencia, solo las últimas
+#   transacciones ante un corte de energía
+# * busy_timeout: milisegundos que se espera un bloqueo antes de "database is locked"
+# * mmap_size / cache_size (negativo: KiB) / temp_store: más lecturas en memoria
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Segundos que se reutiliza la conexión de cada hilo entre peticiones. Por
+        # defecto 0: con ASGI (las vistas del calendario son asíncronas) cada
+        # petición puede usar un hilo distinto y la conexión quedaría abierta en
+        # él. config/wsgi.py la activa con DJANGO_CONN_MAX_AGE para WSGI.
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {pragma}={valor}' for pragma, valor in SQLITE_PRAGMAS.items()),
+            # Las transacciones toman el bloqueo de escritura al empezar: una
+            # transacción que lee y luego escribe no puede fallar con "database
+            # is locked" al pasar a escritura (ahí busy_timeout no espera)
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -169,6 +200,18 @@ LOGIN_REDIRECT_URL = '/inicio/'
 LOGIN_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
+# Segundos que se guarda en caché cada lista de reservas de un día del calendario
+# y cada versión de fecha o mes (apps/reservas/cache.py). En el proceso que hace
+# un cambio se invalidan antes; con la caché local por defecto es lo que tarda,
+# como mucho, en verse en los demás procesos.
+RESERVAS_CALENDARIO_CACHE_TTL = 300
+
+# Perfilado de peticiones (apps/core/profiling.py): fracción de peticiones
+# perfiladas al azar (0 lo desactiva; los administradores pueden pedirlo con
+# la cabecera X-Profile). Los agregados se consultan en /perfil/.
+PROFILING_MUESTREO = 0.0
+
+
 
 class GRUPOS:
     ADMINISTRADOR = 'administrador'
@@ -25,6 +25,7 @@ urlpatterns = [
     path('usuarios/', include('apps.usuarios.urls')),
     path('reservas/', include('apps.reservas.urls')),
     path('logs/', include('apps.logs.urls')),
+    path('perfil/', include('apps.core.urls')),
     path('', include('apps.auth.urls')),
     
 ]
@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Con un hilo por petición en curso, cada hilo reutiliza su conexión (ver settings.DATABASES)
+os.environ.setdefault('DJANGO_CONN_MAX_AGE', '600')
 
 application = get_wsgi_application()
@@ -1,4 +1,52 @@
+"""
+Context processor del menú lateral
+
+Se ejecuta en cada plantilla renderizada (también en los parciales HTMX y
+los modales), así que todo lo que expone es perezoso: si la plantilla no usa
+`group` ni `dashboard_access`, no se hace ningún trabajo.
+
+* grupo_de: grupo que determina el menú del usuario (reutiliza Usuario.grupo)
+* navlinks: enlaces del menú de un grupo, memorizados (solo dependen de DASHBOARD_ACCESS)
+* dashboard_access: el context processor
+"""
+from functools import lru_cache
+
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.functional import SimpleLazyObject
+
+
+def grupo_de(user):
+    """
+    Grupo del usuario para el menú. Usa Usuario.grupo, que comparte con las
+    propiedades de rol los grupos ya cargados en la petición.
+    """
+    if user.is_superuser:
+        return settings.GRUPOS.ADMINISTRADOR
+    return getattr(user, 'grupo', settings.GRUPOS.USUARIO)
+
+
+@lru_cache(maxsize=None)
+def navlinks(grupo):
+    """
+    Enlaces del menú para un grupo según settings.DASHBOARD_ACCESS.
+
+    Retorna:
+        tuple: dicts con al menos 'label' y 'url'; no debe modificarse (se comparte entre peticiones).
+    """
+    modelos = settings.DASHBOARD_ACCESS.get(grupo, [])
+    return (
+        {"label": "Inicio", "url": "dashboard"},
+        {"label": "Calendario", "url": "calendario"},
+        *[modelo['model'] for modelo in modelos if modelo['model']['name'] != 'auditlog.LogEntry'],
+    )
+
+
+@receiver(setting_changed)
+def limpiar_navlinks(*, setting, **kwargs):
+    if setting in ('DASHBOARD_ACCESS', 'GRUPOS'):
+        navlinks.cache_clear()
 
 
 def dashboard_access(request):
@@ -7,21 +55,11 @@ def dashboard_access(request):
     current_section = current_path.strip('/').split('/')[0] if current_path != '/' else 'dashboard'
     if current_path == '/reservas/calendario/':
         current_section = 'calendario'
-    if (request.user.is_superuser):
-        grupo = settings.GRUPOS.ADMINISTRADOR
-    else:
-    # Obtener nombre de grupo
-        grupos = request.user.groups.values_list("name", flat=True)
-        grupo = request.user.groups.first().name if request.user.groups.exists() else settings.GRUPOS.USUARIO
-        # Si es superusuario, mostrar todos los modelos
-    
-    # Permisos por modelo para este grupo
-    modelos = settings.DASHBOARD_ACCESS.get(grupo, [])
-    navlinks = [{"label": "Inicio", "url": "dashboard"},{"label": "Calendario", "url": "calendario"}]
-    navlinks.extend([modelo['model'] for modelo in modelos if modelo['model']['name'] != 'auditlog.LogEntry'])
+
+    grupo = SimpleLazyObject(lambda: grupo_de(request.user))
 
     return {
         "group": grupo,
         "current_section": current_section,  # Sección actual para resaltar en el menú
-        "dashboard_access": navlinks
+        "dashboard_access": SimpleLazyObject(lambda: navlinks(str(grupo))),
     }
@@ -1,7 +1,8 @@
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect
 from django.template.loader import render_to_string
-import pandas as pd
+import csv
+from itertools import islice
 from datetime import datetime
 from django.utils import timezone
 from django.utils.timezone import now
@@ -10,6 +11,10 @@ from django.db.models.functions import Lower
 from django.db import models
 from django.conf import settings
 import json
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied
+from django.contrib.auth.views import redirect_to_login
+from apps.core.columns import compilar
 
 class AjaxFormMixin:
     def success_message(self):
@@ -72,7 +77,53 @@ class FormContextMixin:
 
 
 class ListCrudMixin:
-    
+
+    # Relaciones que recorre el render de una columna además de la propia
+    # columna (ver get_td_html), p. ej. {'espacio': ('espacio__ubicacion',)}
+    cols_related = {}
+
+    @classmethod
+    def plan_de_carga(cls):
+        """
+        Relaciones que se cargan junto con cada página, derivadas de `cols` y
+        `cols_related`: las FK/OneToOne van a select_related (en la misma
+        consulta) y las ManyToMany o relaciones inversas, a prefetch_related
+        (una consulta por relación). Las columnas que no son relaciones
+        (campos, anotaciones, propiedades) se ignoran.
+
+        Retorna:
+            tuple[list, list]: rutas para select_related y para prefetch_related.
+        """
+        rutas = []
+        for campo in getattr(cls, 'cols', {}):
+            rutas.append(campo)
+            rutas.extend(cls.cols_related.get(campo, ()))
+
+        select, prefetch = [], []
+        for ruta in dict.fromkeys(rutas):
+            tipo = _tipo_relacion(cls.model, ruta)
+            if tipo == 'select':
+                select.append(ruta)
+            elif tipo == 'prefetch':
+                prefetch.append(ruta)
+        # select_related('a__b') ya incluye 'a'
+        select = [ruta for ruta in select if not any(otra.startswith(ruta + '__') for otra in select)]
+        return select, prefetch
+
+    def aplicar_plan_de_carga(self, qs):
+        """Aplica plan_de_carga() a `qs` para que el render de la tabla no consulte por fila."""
+        if not isinstance(qs, models.QuerySet):
+            return qs
+        select, prefetch = self.plan_de_carga()
+        if select:
+            qs = qs.select_related(*select)
+        if prefetch:
+            qs = qs.prefetch_related(*prefetch)
+        return qs
+
+    def get_queryset(self):
+        return self.aplicar_plan_de_carga(super().get_queryset())
+
     def get(self, request, *args, **kwargs):
         """
         Si existe ?export=csv en la URL, devolvemos CSV. Si no, delegamos
@@ -103,6 +154,10 @@ class ListCrudMixin:
             ctx['cols'] = self.cols
         except AttributeError:
             ctx['cols'] = {field.name: field.verbose_name for field in self.model._meta.get_fields()}
+
+        # Renderers de las columnas para render_row (compilados una vez por vista)
+        ctx['columnas'] = compilar(
+            self.model, list(ctx['cols']), getattr(self, 'crud_urls', {}).get('view'))
         
         try:
             ctx['actions'] = self.actions
@@ -111,45 +166,182 @@ class ListCrudMixin:
         return ctx
 
 
+    # Filas que se leen de la base de datos (y se resuelven sus FK) en cada lote
+    export_chunk_size = 2000
+
     def export_csv(self):
         """
         Construye el CSV usando exactamente el mismo queryset filtrado + ordenado
-        que get_queryset(), pero sin paginación ni template, y con los campos que deseemos.
-        """
-        # 1) Tomamos todos los objetos (ya filtrados/ordenados y con la anotación):
-        qs = self.get_queryset()
-
-        # 2) Definimos qué campos queremos en el CSV. 
-        #    Por ejemplo: id, username, email, ubicación, piso, group_name.
-        #
-        #    Si tuvieras ForeignKey a 'departamento' y quisieras el nombre en vez de ID,
-        #    podrías hacer 'departamento__nombre' como vimos antes. Aquí pongo un ejemplo mínimo.
-        campos = self.cols.keys()
-
-        # 3) Convertimos a DataFrame. Atención: como 'qs' ya fue anotado con 'group_name',
-        #    podemos traerlo directo con .values('group_name'), sin repetir lógica de CASE.
-        df = pd.DataFrame(list(qs.values(*campos)))
+        que get_queryset(), pero sin paginación ni template, y con los campos de self.cols.
 
-        # 4) (Opcional) Renombrar columnas para que la cabecera sea más legible:
-        df.rename(columns=self.cols, inplace=True)
+        El archivo se genera por lotes con StreamingHttpResponse, de modo que la
+        memoria no crece con el número de filas. Las claves foráneas se exportan
+        con su representación (str) en lugar del ID.
+        """
+        # values_list no usa las relaciones del plan de carga: las FK se resuelven por lote
+        qs = self.get_queryset().prefetch_related(None)
+        campos = list(self.cols.keys())
 
-        # 5) Preparamos la respuesta HTTP tipo CSV
-        response = HttpResponse(content_type='text/csv')
+        response = StreamingHttpResponse(
+            self._filas_csv(qs, campos), content_type='text/csv'
+        )
         timestamp = now().strftime('%Y%m%d%H%M%S')
         filename = f"{self.model.__name__.lower()}_export_{timestamp}.csv"
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
-        # 6) Volcamos el DataFrame a CSV directamente sobre la HttpResponse
-        df.to_csv(response, index=False)
+    def _filas_csv(self, qs, campos):
+        """
+        Generador de líneas CSV: cabecera + filas, resolviendo las FK de cada lote
+        con una sola consulta por campo.
+        """
+        writer = csv.writer(_Echo())
+        yield writer.writerow([self.cols[campo] for campo in campos])
 
-        return response
+        relaciones = {
+            i: _modelo_relacionado(self.model, campo) for i, campo in enumerate(campos)
+        }
+        relaciones = {i: modelo for i, modelo in relaciones.items() if modelo is not None}
+        # Representaciones resueltas, por columna: {pk: str(objeto)}. Solo se conservan
+        # las que usa el lote actual, así que no crecen más que export_chunk_size
+        nombres = {i: {} for i in relaciones}
+
+        filas = qs.values_list(*campos).iterator(chunk_size=self.export_chunk_size)
+        while lote := list(islice(filas, self.export_chunk_size)):
+            for i, modelo in relaciones.items():
+                valores = {fila[i] for fila in lote} - {None}
+                nombres[i] = {pk: nombres[i][pk] for pk in valores if pk in nombres[i]}
+                pendientes = valores - nombres[i].keys()
+                if pendientes:
+                    objetos = modelo._default_manager.select_related().in_bulk(pendientes)
+                    nombres[i].update((pk, str(obj)) for pk, obj in objetos.items())
+
+            for fila in lote:
+                yield writer.writerow([
+                    nombres[i].get(valor, valor) if i in nombres else valor
+                    for i, valor in enumerate(fila)
+                ])
+
+
+class _Echo:
+    """Objeto tipo archivo que devuelve lo que se escribe (para csv.writer en streaming)."""
+
+    def write(self, value):
+        return value
+
+
+def _tipo_relacion(model, ruta):
+    """
+    'select' si `ruta` (con __) sigue solo FK/OneToOne, 'prefetch' si pasa por
+    una relación a muchos, o None si no es una relación.
+    """
+    tipo = 'select'
+    try:
+        for parte in ruta.split('__'):
+            field = model._meta.get_field(parte)
+            # Las GenericForeignKey no tienen modelo fijo y no se pueden cargar con join
+            if not field.is_relation or field.related_model is None:
+                return None
+            if field.many_to_many or field.one_to_many:
+                tipo = 'prefetch'
+            model = field.related_model
+    except Exception:
+        return None
+    return tipo
+
+
+def _modelo_relacionado(model, campo):
+    """
+    Devuelve el modelo al que apunta `campo` si es una FK/OneToOne
+    (siguiendo relaciones con __), o None si es un campo normal o una anotación.
+    """
+    try:
+        for parte in campo.split('__'):
+            field = model._meta.get_field(parte)
+            model = field.related_model
+    except Exception:
+        return None
+    if model is None or not (field.many_to_one or field.one_to_one):
+        return None
+    return model
 
 
 
+class AsyncPermissionRequiredMixin:
+    """
+    LoginRequiredMixin + PermissionRequiredMixin para vistas con manejadores
+    asíncronos (async def get).
+
+    Los mixins de Django comprueban el usuario de forma síncrona antes de
+    llamar al manejador, lo que en una vista asíncrona consultaría la base de
+    datos desde el bucle de eventos. Aquí el usuario, sus permisos y sus
+    grupos se cargan con la API asíncrona y se deja en request.user el
+    usuario ya cargado, de modo que qs_condiciones, la caché del calendario
+    o las plantillas (perms) no vuelven a consultar.
+    """
+    permission_required = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        if not await user.ahas_perm(self.permission_required):
+            raise PermissionDenied
+        await user.anombres_grupos()
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AutocompleteMixin:
+    """
+    Endpoint JSON para Select2 con búsqueda remota (?q=texto&page=n).
+
+    Filtra por prefijo sobre Lower(search_field) con un rango (>= q, < q + U+10FFFF)
+    para que lo resuelva un índice Lower(search_field) del modelo, ordena por esa
+    misma expresión y pagina sin COUNT (se pide un elemento de más para saber si
+    hay otra página). get_queryset debe devolver ya los objetos que el usuario puede elegir.
+    """
+    search_field = None
+    page_size = 20
+
+    def get_queryset(self):
+        raise ImproperlyConfigured(
+            f'{self.__class__.__name__} debe definir get_queryset() con los objetos que el usuario puede elegir.'
+        )
+
+    def get_text(self, obj):
+        return str(obj)
+
+    def buscar(self, queryset, termino):
+        if self.search_field is None:
+            raise ImproperlyConfigured(f'{self.__class__.__name__} debe definir search_field.')
+        clave = Lower(self.search_field)
+        queryset = queryset.alias(_busqueda=clave).order_by(clave, 'pk')
+        termino = termino.strip().lower()
+        if termino:
+            queryset = queryset.filter(_busqueda__gte=termino, _busqueda__lt=termino + '\U0010ffff')
+        return queryset
+
+    def get(self, request, *args, **kwargs):
+        try:
+            page = max(int(request.GET.get('page', 1)), 1)
+        except ValueError:
+            page = 1
+        inicio = (page - 1) * self.page_size
+
+        queryset = self.buscar(self.get_queryset(), request.GET.get('q', ''))
+        objetos = list(queryset[inicio:inicio + self.page_size + 1])
+        return JsonResponse({
+            'results': [{'id': obj.pk, 'text': self.get_text(obj)} for obj in objetos[:self.page_size]],
+            'pagination': {'more': len(objetos) > self.page_size},
+        })
+
+
 class SmartOrderingMixin:
     """
     Mixin que proporciona ordenamiento inteligente basado en el tipo de campo.
-    Aplica Lower() solo a campos de texto y ordenamiento directo a campos numéricos/booleanos.
+    Aplica Lower() solo a campos de texto libre y ordenamiento directo a campos con
+    choices y numéricos/booleanos.
     También maneja propiedades de Python que no son campos de base de datos.
     """
     
@@ -164,7 +356,28 @@ class SmartOrderingMixin:
         ordering = self.request.GET.get('ordering')
         if not ordering:
             return None
-            
+        return self.ordenamiento_para(ordering)
+
+    @classmethod
+    def campos_ordenables(cls):
+        """
+        Campos por los que se puede ordenar la tabla (las claves de `cols`) con la
+        expresión que get_ordering aplica a cada uno en orden ascendente.
+        Lo usa el chequeo de índices de ordenamiento (ver apps.core.ordering).
+
+        Retorna:
+            dict: {campo: lista de ordenamiento}; los campos que no se ordenan en BD no aparecen.
+        """
+        vista = cls()
+        campos = {}
+        for campo in getattr(cls, 'cols', {}):
+            ordenamiento = vista.ordenamiento_para(campo)
+            if ordenamiento:
+                campos[campo] = ordenamiento
+        return campos
+
+    def ordenamiento_para(self, ordering):
+        """Lista de ordenamiento para un valor del parámetro `ordering` (p. ej. '-nombre')."""
         # Remover el signo negativo si existe para obtener el nombre del campo
         field_name = ordering.lstrip('-')
         is_desc = ordering.startswith('-')
@@ -279,7 +492,11 @@ class SmartOrderingMixin:
     def _is_text_field(self, field):
         """
         Determina si un campo es de tipo texto y requiere Lower() para ordenamiento.
+        Los campos con choices guardan valores fijos y se ordenan por la columna tal cual.
         """
+        if field.choices:
+            return False
+
         # Tipos de campo que son considerados texto
         text_field_types = (
             models.CharField,
@@ -300,4 +517,196 @@ class SmartOrderingMixin:
             'EmailField', 'URLField', 'JSONField'
         ]
         
-        return field_class_name in text_field_class_names
\ No newline at end of file
+        return field_class_name in text_field_class_names
+
+
+class _CursorSerializer:
+    """Serializador JSON para signing que conserva fechas con microsegundos."""
+
+    def dumps(self, obj):
+        def default(valor):
+            if hasattr(valor, 'isoformat'):
+                return valor.isoformat()
+            return str(valor)
+        return json.dumps(obj, default=default, separators=(',', ':')).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+class CursorPage:
+    """
+    Página de una paginación por cursor. Expone lo mínimo que usan las plantillas
+    (iteración, has_next, has_previous) más los cursores de las páginas vecinas.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginationMixin:
+    """
+    Mixin (opcional) que reemplaza la paginación por OFFSET por una paginación por cursor.
+
+    La página siguiente se obtiene filtrando por la última clave de orden vista
+    (WHERE clave > última) en lugar de saltar filas, por lo que cualquier página
+    cuesta lo mismo que la primera. Respeta el ordenamiento de SmartOrderingMixin
+    (incluidas expresiones como Lower()) y añade la pk como desempate.
+
+    El cursor viaja firmado en ?cursor=; el conteo total es opcional y acotado por
+    cursor_count_limit (None para no contar).
+    """
+    cursor_param = 'cursor'
+    cursor_salt = 'library.mixins.helpers.KeysetPaginationMixin'
+    cursor_count_limit = 1000
+
+    def _ordenamiento_cursor(self, queryset):
+        """
+        Devuelve la lista de términos de orden a usar: la de get_ordering() si hay,
+        luego un campo anotado del queryset y, por último, el orden por defecto.
+        """
+        ordering = self.get_ordering() if hasattr(self, 'get_ordering') else None
+        if not ordering:
+            param = self.request.GET.get('ordering', '')
+            if param.lstrip('-') in queryset.query.annotations:
+                ordering = [param]
+        if not ordering:
+            ordering = list(queryset.query.order_by) or list(self.model._meta.ordering)
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        return ordering
+
+    def _claves_cursor(self, ordering):
+        """Convierte los términos de orden en [(expresión, descendente)] terminando en la pk."""
+        claves = []
+        for termino in ordering:
+            if isinstance(termino, str):
+                nombre = termino.lstrip('-')
+                if nombre in ('?', 'pk', self.model._meta.pk.name):
+                    continue
+                claves.append((models.F(nombre), termino.startswith('-')))
+            elif isinstance(termino, models.OrderBy):
+                claves.append((termino.expression, termino.descending))
+            else:
+                claves.append((termino, False))
+        descendente = claves[0][1] if claves else False
+        claves.append((models.F('pk'), descendente))
+        return claves
+
+    def _condicion_cursor(self, nombres, descendentes, valores, hacia_atras):
+        """
+        Construye el filtro "posterior a `valores`" (o anterior si hacia_atras),
+        considerando que los NULL van siempre al final.
+        """
+        condicion = models.Q(pk__in=[])
+        iguales = models.Q()
+        for nombre, descendente, valor in zip(nombres, descendentes, valores):
+            if valor is None:
+                # Tras un NULL solo quedan NULL; antes de él, cualquier valor no nulo
+                siguiente = models.Q(**{f'{nombre}__isnull': False}) if hacia_atras else models.Q(pk__in=[])
+                igual = models.Q(**{f'{nombre}__isnull': True})
+            else:
+                mayor = descendente == hacia_atras
+                siguiente = models.Q(**{f'{nombre}__{"gt" if mayor else "lt"}': valor})
+                if not hacia_atras:
+                    siguiente |= models.Q(**{f'{nombre}__isnull': True})
+                igual = models.Q(**{nombre: valor})
+            condicion |= iguales & siguiente
+            iguales &= igual
+        return condicion
+
+    def _leer_cursor(self, orden_param):
+        valor = self.request.GET.get(self.cursor_param)
+        if not valor:
+            return None
+        try:
+            datos = signing.loads(valor, salt=self.cursor_salt, serializer=_CursorSerializer)
+        except signing.BadSignature:
+            return None
+        # Un cursor de otro ordenamiento no es válido: se vuelve a la primera página
+        if datos.get('o') != orden_param:
+            return None
+        return datos
+
+    def _crear_cursor(self, orden_param, valores, hacia_atras=False):
+        return signing.dumps(
+            {'o': orden_param, 'v': valores, 'a': hacia_atras},
+            salt=self.cursor_salt, serializer=_CursorSerializer, compress=True,
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not isinstance(queryset, models.QuerySet):
+            return super().paginate_queryset(queryset, page_size)
+
+        orden_param = self.request.GET.get('ordering', '')
+        claves = self._claves_cursor(self._ordenamiento_cursor(queryset))
+        nombres = [f'cursor_k{i}' for i in range(len(claves))]
+        descendentes = [descendente for _, descendente in claves]
+
+        qs = queryset.annotate(**{nombre: expr for nombre, (expr, _) in zip(nombres, claves)})
+
+        cursor = self._leer_cursor(orden_param)
+        hacia_atras = bool(cursor and cursor.get('a'))
+        if cursor and len(cursor.get('v', [])) == len(nombres):
+            valores = [
+                None if valor is None else qs.query.annotations[nombre].output_field.to_python(valor)
+                for nombre, valor in zip(nombres, cursor['v'])
+            ]
+            qs = qs.filter(self._condicion_cursor(nombres, descendentes, valores, hacia_atras))
+        else:
+            cursor = None
+
+        orden = []
+        for nombre, descendente in zip(nombres, descendentes):
+            expr = models.F(nombre)
+            # Al retroceder se recorre el orden inverso (y los NULL pasan al principio)
+            nulos = {'nulls_first': True} if hacia_atras else {'nulls_last': True}
+            orden.append(expr.desc(**nulos) if descendente != hacia_atras else expr.asc(**nulos))
+
+        filas = list(qs.order_by(*orden)[:page_size + 1])
+        hay_mas = len(filas) > page_size
+        filas = filas[:page_size]
+        if hacia_atras:
+            filas.reverse()
+
+        def claves_de(obj):
+            return [getattr(obj, nombre) for nombre in nombres]
+
+        siguiente = anterior = None
+        if filas:
+            if hay_mas or hacia_atras:
+                siguiente = self._crear_cursor(orden_param, claves_de(filas[-1]))
+            if cursor and (hay_mas or not hacia_atras):
+                anterior = self._crear_cursor(orden_param, claves_de(filas[0]), hacia_atras=True)
+
+        page = CursorPage(filas, next_cursor=siguiente, previous_cursor=anterior)
+        return None, page, filas, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx['cursor_pagination'] = True
+        ctx['cursor_param'] = self.cursor_param
+
+        queryset = kwargs.get('object_list', self.object_list)
+        if self.cursor_count_limit is not None and isinstance(queryset, models.QuerySet):
+            total = queryset.order_by()[:self.cursor_count_limit + 1].count()
+            ctx['cursor_total'] = min(total, self.cursor_count_limit)
+            ctx['cursor_total_excede'] = total > self.cursor_count_limit
+        return ctx
@@ -0,0 +1,299 @@
+"""
+Utilidades para medir el rendimiento de las vistas
+
+* base_de_datos_temporal: crea (y destruye) una base de datos de pruebas para no tocar la real,
+  en memoria o en un archivo temporal
+* poblar: genera un conjunto de datos escalable usando inserciones masivas
+* poblar_espacio: crea un espacio con muchas reservas futuras (operaciones en cascada)
+* poblar_dia: crea muchos espacios con un día completo de reservas aprobadas
+* poblar_logs: genera logs de auditoría (y su visibilidad) para reservas existentes
+* medir: ejecuta una función varias veces y devuelve consultas, latencias y memoria pico
+* ContadorConsultas: cuenta las consultas ejecutadas sin límite de cantidad
+"""
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, time as dtime, timedelta
+
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.utils import timezone
+
+from apps.core.search import reconstruir as reconstruir_busqueda
+from apps.espacios.models import Espacio
+from apps.logs.visibility import registrar_visibilidad
+from apps.reservas.models import Reserva
+from apps.reservas.rollup import recalcular
+from apps.usuarios.models import Ubicacion, Usuario
+
+
+@contextmanager
+def base_de_datos_temporal(archivo=False):
+    """
+    Crea una base de datos de pruebas (con migraciones aplicadas) y la destruye al salir.
+
+    Con SQLite la base de pruebas es en memoria; con `archivo` se crea en un
+    directorio temporal, para medir escrituras concurrentes como en producción.
+    """
+    nombre_original = connection.settings_dict['NAME']
+    test_original = connection.settings_dict['TEST']
+    directorio = None
+    if archivo and connection.vendor == 'sqlite':
+        directorio = tempfile.mkdtemp(prefix='benchmark-')
+        connection.settings_dict['TEST'] = {**test_original, 'NAME': os.path.join(directorio, 'db.sqlite3')}
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(nombre_original, verbosity=0)
+        connection.settings_dict['TEST'] = test_original
+        if directorio:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+def poblar(reservas, ubicaciones=4, pisos=3, espacios_por_piso=10, usuarios_por_piso=20,
+           dias=180, batch_size=5000, semilla=0):
+    """
+    Genera ubicaciones, usuarios (un moderador por piso), espacios y `reservas`
+    reservas repartidas en `dias` días alrededor de hoy, con inserciones masivas.
+
+    Retorna:
+        dict: usuarios representativos de cada rol ('admin', 'moderador', 'usuario').
+    """
+    rnd = random.Random(semilla)
+    grupos = {g.name: g for g in Group.objects.all()}
+    password = make_password('benchmark')
+
+    sedes = Ubicacion.objects.bulk_create(
+        [Ubicacion(nombre=f'sede{i}') for i in range(ubicaciones)]
+    )
+
+    nuevos = [Usuario(username='admin', email='admin@example.com', password=password)]
+    roles = [settings.GRUPOS.ADMINISTRADOR]
+    for sede in sedes:
+        for piso in range(1, pisos + 1):
+            nuevos.append(Usuario(
+                username=f'mod_{sede.nombre}_{piso}', email=f'mod_{sede.nombre}_{piso}@example.com',
+                password=password, ubicacion=sede, piso=piso))
+            roles.append(settings.GRUPOS.MODERADOR)
+            for i in range(usuarios_por_piso):
+                username = f'u{i}_{sede.nombre}_{piso}'
+                nuevos.append(Usuario(
+                    username=username, email=f'{username}@example.com',
+                    password=password, ubicacion=sede, piso=piso))
+                roles.append(settings.GRUPOS.USUARIO)
+    usuarios = Usuario.objects.bulk_create(nuevos, batch_size=batch_size)
+    Usuario.groups.through.objects.bulk_create(
+        [Usuario.groups.through(usuario_id=u.pk, group_id=grupos[rol].pk)
+         for u, rol in zip(usuarios, roles)],
+        batch_size=batch_size,
+    )
+
+    espacios = Espacio.objects.bulk_create(
+        [Espacio(nombre=f'E{sede.pk}P{piso}N{n}', ubicacion=sede, piso=piso,
+                 capacidad=rnd.randint(10, 200), tipo=rnd.choice(Espacio.Tipo.values))
+         for sede in sedes for piso in range(1, pisos + 1) for n in range(espacios_por_piso)],
+        batch_size=batch_size,
+    )
+
+    moderadores = {(u.ubicacion_id, u.piso): u for u, rol in zip(usuarios, roles)
+                   if rol == settings.GRUPOS.MODERADOR}
+    comunes = [u for u, rol in zip(usuarios, roles) if rol == settings.GRUPOS.USUARIO]
+    estados = Reserva.Estado.values
+    hoy = date.today()
+
+    # La restricción única (usuario, espacio, fecha) se respeta llevando la cuenta en memoria
+    usados = set()
+    lote = []
+    while len(usados) < reservas:
+        usuario = rnd.choice(comunes)
+        espacio = rnd.choice(espacios)
+        fecha = hoy + timedelta(days=rnd.randint(-dias // 2, dias // 2))
+        clave = (usuario.pk, espacio.pk, fecha)
+        if clave in usados:
+            continue
+        usados.add(clave)
+
+        inicio = rnd.randint(7, 19)
+        estado = rnd.choice(estados)
+        lote.append(Reserva(
+            usuario=usuario, espacio=espacio, fecha_uso=fecha,
+            ubicacion_id=espacio.ubicacion_id, piso=espacio.piso,
+            hora_inicio=dtime(inicio, 0), hora_fin=dtime(inicio + rnd.randint(1, 3), 0),
+            estado=estado, motivo='Benchmark',
+            aprobado_por=None if estado == Reserva.Estado.PENDIENTE
+            else moderadores[(espacio.ubicacion_id, espacio.piso)],
+        ))
+        if len(lote) >= batch_size:
+            Reserva.objects.bulk_create(lote)
+            lote = []
+    Reserva.objects.bulk_create(lote)
+
+    # bulk_create no dispara señales: el resumen diario y el índice de búsqueda se reconstruyen al final
+    recalcular()
+    reconstruir_busqueda()
+
+    return {
+        'admin': usuarios[0],
+        'moderador': usuarios[1],
+        'usuario': comunes[0],
+    }
+
+
+def poblar_espacio(reservas, nombre='Cascada', semilla=0):
+    """
+    Crea un espacio con `reservas` reservas futuras (pendientes y aprobadas) de
+    los usuarios existentes, para medir operaciones en cascada sobre un espacio.
+    """
+    rnd = random.Random(semilla)
+    espacio = Espacio.objects.create(
+        nombre=nombre, ubicacion=Ubicacion.objects.first(), piso=1,
+        capacidad=500, tipo=Espacio.Tipo.AUDITORIO)
+    usuarios = list(Usuario.objects.filter(groups__name=settings.GRUPOS.USUARIO))
+    admin = Usuario.objects.filter(groups__name=settings.GRUPOS.ADMINISTRADOR).first()
+
+    hoy = date.today()
+    lote = []
+    for i in range(reservas):
+        inicio = rnd.randint(7, 19)
+        aprobada = rnd.random() < 0.5
+        lote.append(Reserva(
+            usuario=usuarios[i % len(usuarios)], espacio=espacio,
+            fecha_uso=hoy + timedelta(days=1 + i // len(usuarios)),
+            ubicacion_id=espacio.ubicacion_id, piso=espacio.piso,
+            hora_inicio=dtime(inicio, 0), hora_fin=dtime(inicio + 1, 0), motivo='Benchmark',
+            estado=Reserva.Estado.APROBADA if aprobada else Reserva.Estado.PENDIENTE,
+            aprobado_por=admin if aprobada else None,
+        ))
+    Reserva.objects.bulk_create(lote, batch_size=5000)
+    recalcular(espacio_id=espacio.pk)
+    return espacio
+
+
+def poblar_dia(espacios, fecha, semilla=0):
+    """
+    Crea `espacios` espacios y, para cada uno, reservas aprobadas consecutivas
+    de 7:00 a 21:00 en `fecha` con huecos aleatorios, para medir búsquedas de disponibilidad.
+    """
+    rnd = random.Random(semilla)
+    sedes = list(Ubicacion.objects.all())
+    usuarios = list(Usuario.objects.filter(groups__name=settings.GRUPOS.USUARIO))
+    admin = Usuario.objects.filter(groups__name=settings.GRUPOS.ADMINISTRADOR).first()
+
+    nuevos = Espacio.objects.bulk_create(
+        [Espacio(nombre=f'Dia{i}', ubicacion=sedes[i % len(sedes)], piso=1 + i % 3,
+                 capacidad=rnd.randint(10, 200), tipo=rnd.choice(Espacio.Tipo.values))
+         for i in range(espacios)],
+        batch_size=5000,
+    )
+    lote = []
+    for espacio in nuevos:
+        # Un usuario distinto por franja respeta la restricción (usuario, espacio, fecha)
+        for hora, usuario in zip(range(7, 21), rnd.sample(usuarios, 14)):
+            if rnd.random() < 0.2:
+                continue
+            lote.append(Reserva(
+                usuario=usuario, espacio=espacio, fecha_uso=fecha,
+                ubicacion_id=espacio.ubicacion_id, piso=espacio.piso,
+                hora_inicio=dtime(hora, 0), hora_fin=dtime(hora + 1, 0), motivo='Benchmark',
+                estado=Reserva.Estado.APROBADA, aprobado_por=admin,
+            ))
+    Reserva.objects.bulk_create(lote, batch_size=5000)
+    recalcular(fecha_uso=fecha)
+    reconstruir_busqueda()
+    return nuevos
+
+
+def poblar_logs(cantidad, dias=90, batch_size=5000, semilla=0):
+    """
+    Crea `cantidad` logs de creación de reservas existentes (elegidas al azar),
+    repartidos en los últimos `dias` días, junto con su fila de visibilidad.
+    """
+    rnd = random.Random(semilla)
+    content_type = ContentType.objects.get_for_model(Reserva)
+    pks = list(Reserva.objects.values_list('pk', flat=True))
+    elegidas = rnd.sample(pks, min(cantidad, len(pks)))
+    ahora = timezone.now()
+
+    for inicio in range(0, len(elegidas), batch_size):
+        lote = (
+            Reserva.objects
+            .filter(pk__in=elegidas[inicio:inicio + batch_size])
+            .select_related('usuario', 'espacio')
+        )
+        entradas = LogEntry.objects.bulk_create([
+            LogEntry(
+                content_type=content_type, object_pk=str(r.pk), object_id=r.pk,
+                object_repr=str(r), action=LogEntry.Action.CREATE,
+                changes={'estado': ['None', r.estado]}, actor_id=r.usuario_id,
+                timestamp=ahora - timedelta(minutes=rnd.randint(0, dias * 24 * 60)),
+            )
+            for r in lote
+        ])
+        # SQLite devuelve los pks en bulk_create, que registrar_visibilidad necesita
+        registrar_visibilidad(entradas)
+
+
+def medir(funcion, repeticiones=20, calentamiento=2, memoria=True):
+    """
+    Ejecuta `funcion` varias veces y mide consultas SQL y latencia. Si `memoria`
+    es True, se hace una ejecución más bajo tracemalloc (que ralentiza el
+    código, por eso no se mezcla con las medidas de tiempo) para obtener la memoria pico.
+
+    Retorna:
+        dict: consultas de la última ejecución, latencias p50/p95/media en
+        milisegundos y memoria pico en KiB (None si no se midió).
+    """
+    for _ in range(calentamiento):
+        funcion()
+
+    tiempos = []
+    consultas = 0
+    for _ in range(repeticiones):
+        contador = ContadorConsultas()
+        with connection.execute_wrapper(contador):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        consultas = contador.total
+
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcion()
+            pico = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+
+    percentiles = statistics.quantiles(tiempos, n=100) if len(tiempos) > 1 else tiempos * 99
+    return {
+        'consultas': consultas,
+        'p50_ms': round(percentiles[49], 2),
+        'p95_ms': round(percentiles[94], 2),
+        'media_ms': round(statistics.mean(tiempos), 2),
+        'memoria_pico_kb': pico,
+    }
+
+
+class ContadorConsultas:
+    """
+    Envoltorio de ejecución (connection.execute_wrapper) que cuenta las consultas.
+    A diferencia de CaptureQueriesContext no guarda el SQL ni tiene límite de 9000 consultas.
+    """
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
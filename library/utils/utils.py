@@ -2,7 +2,8 @@ from apps.reservas.models import *
 from datetime import datetime
 from math import ceil, floor
 from auditlog.models import LogEntry
-from django.contrib.contenttypes.models import ContentType
+from apps.logs.enrichment import enriquecer_logs
+from apps.logs.visibility import filtro_visibilidad
 
 def get_user_groups(user):
     """
@@ -30,14 +31,14 @@ def get_all_cols(model):
     return [field.name for field in model._meta.get_fields()]
 
 
-from datetime import datetime
+from datetime import date, datetime
 from math import ceil, floor
 from django.db.models import Q, Count
 
 def get_stats(request):
     """Punto de entrada principal para obtener estadísticas según el tipo de usuario"""
     try:
-        logs = get_logs(request.user)[:5]
+        logs = enriquecer_logs(get_logs(request.user)[:5])
     except:
         logs = []
     
@@ -67,32 +68,49 @@ class StatsCalculator:
         self.year = datetime.now().year
         self.now = datetime.now()
     
-    def get_reserva_counts(self, base_filter=None):
-        """Obtiene conteos de reservas por estado"""
-        if base_filter is None:
-            base_filter = Q()
-            
-        return {
-            'pendientes': Reserva.objects.filter(base_filter, estado=Reserva.Estado.PENDIENTE).count(),
-            'aprobadas': Reserva.objects.filter(base_filter, estado=Reserva.Estado.APROBADA).count(),
-            'rechazadas': Reserva.objects.filter(base_filter, estado=Reserva.Estado.RECHAZADA).count()
-        }
-    
-    def get_reserva_counts_mes(self, base_filter=None):
-        """Obtiene conteos de reservas del mes actual por estado"""
-        month_filter = Q(fecha_uso__month=self.month, fecha_uso__year=self.year)
+    def get_month_filter(self):
+        """Filtro por rango de fechas del mes actual (aprovecha el índice de fecha_uso)"""
+        inicio = date(self.year, self.month, 1)
+        fin = date(self.year + 1, 1, 1) if self.month == 12 else date(self.year, self.month + 1, 1)
+        return Q(fecha_uso__gte=inicio, fecha_uso__lt=fin)
+
+    def get_reserva_counts(self, base_filter=None, filtros_estado=None):
+        """
+        Obtiene en una sola consulta los conteos por estado, históricos y del mes actual.
+
+        filtros_estado permite acotar cada estado con un filtro propio (por ejemplo,
+        el moderador cuenta pendientes por ubicación y aprobadas/rechazadas por
+        quién las gestionó); si no se indica, todos usan base_filter.
+
+        Retorna:
+            tuple: (counts, counts_mes)
+        """
         if base_filter is None:
             base_filter = Q()
-        
-        combined_filter = base_filter & month_filter
-        
-        return {
-            'total': Reserva.objects.filter(combined_filter).count(),
-            'aprobadas': Reserva.objects.filter(combined_filter, estado=Reserva.Estado.APROBADA).count(),
-            'pendientes': Reserva.objects.filter(combined_filter, estado=Reserva.Estado.PENDIENTE).count(),
-            'rechazadas': Reserva.objects.filter(combined_filter, estado=Reserva.Estado.RECHAZADA).count()
+        if filtros_estado is None:
+            filtros_estado = {}
+
+        month_filter = self.get_month_filter()
+        estados = {
+            'pendientes': Reserva.Estado.PENDIENTE,
+            'aprobadas': Reserva.Estado.APROBADA,
+            'rechazadas': Reserva.Estado.RECHAZADA,
         }
-    
+
+        agregados = {}
+        for clave, estado in estados.items():
+            filtro = filtros_estado.get(clave, Q()) & Q(estado=estado)
+            agregados[clave] = Count('id', filter=filtro)
+            agregados[f'mes_{clave}'] = Count('id', filter=filtro & month_filter)
+        agregados['mes_total'] = Count('id', filter=filtros_estado.get('total', Q()) & month_filter)
+
+        resultado = Reserva.objects.filter(base_filter).aggregate(**agregados)
+
+        counts = {clave: resultado[clave] for clave in estados}
+        counts_mes = {clave: resultado[f'mes_{clave}'] for clave in estados}
+        counts_mes['total'] = resultado['mes_total']
+        return counts, counts_mes
+
     def calculate_percentages(self, counts_mes):
         """Calcula porcentajes basados en conteos mensuales"""
         total = counts_mes['total']
@@ -159,13 +177,16 @@ def get_stats_administrador(request):
     calc = StatsCalculator(request)
     
     # Conteos generales
-    counts = calc.get_reserva_counts()
-    counts_mes = calc.get_reserva_counts_mes()
+    counts, counts_mes = calc.get_reserva_counts()
     percentages = calc.calculate_percentages(counts_mes)
     
     # Estadísticas adicionales específicas del admin
-    espacios_disponibles = Espacio.objects.filter(disponible=True).count()
-    espacios_no_disponibles = Espacio.objects.filter(disponible=False).count()
+    espacios = Espacio.objects.aggregate(
+        disponibles=Count('id', filter=Q(disponible=True)),
+        no_disponibles=Count('id', filter=Q(disponible=False)),
+    )
+    espacios_disponibles = espacios['disponibles']
+    espacios_no_disponibles = espacios['no_disponibles']
     usuarios = Usuario.objects.count()
     
     # Próximas reservas
@@ -194,8 +215,7 @@ def get_stats_usuario(request):
     user_filter = Q(usuario=request.user)
     
     # Conteos del usuario
-    counts = calc.get_reserva_counts(user_filter)
-    counts_mes = calc.get_reserva_counts_mes(user_filter)
+    counts, counts_mes = calc.get_reserva_counts(user_filter)
     percentages = calc.calculate_percentages(counts_mes)
     
     # Próximas reservas del usuario
@@ -218,24 +238,20 @@ def get_stats_moderador(request):
     calc = StatsCalculator(request)
     
     # Filtro base para la ubicación y piso del moderador
-    location_filter = Q(espacio__ubicacion=request.user.ubicacion, espacio__piso=request.user.piso)
+    location_filter = Q(ubicacion_id=request.user.ubicacion_id, piso=request.user.piso)
     approved_by_filter = Q(aprobado_por=request.user)
     
-    # Para pendientes usamos location_filter, para aprobadas/rechazadas usamos approved_by_filter
-    counts = {
-        'pendientes': Reserva.objects.filter(location_filter, estado=Reserva.Estado.PENDIENTE).count(),
-        'aprobadas': Reserva.objects.filter(approved_by_filter, estado=Reserva.Estado.APROBADA).count(),
-        'rechazadas': Reserva.objects.filter(approved_by_filter, estado=Reserva.Estado.RECHAZADA).count()
-    }
-    
-    # Para estadísticas mensuales
-    month_filter = Q(fecha_uso__month=calc.month, fecha_uso__year=calc.year)
-    counts_mes = {
-        'total': Reserva.objects.filter(location_filter & month_filter).count(),
-        'aprobadas': Reserva.objects.filter(approved_by_filter & month_filter, estado=Reserva.Estado.APROBADA).count(),
-        'rechazadas': Reserva.objects.filter(approved_by_filter & month_filter, estado=Reserva.Estado.RECHAZADA).count(),
-        'pendientes': Reserva.objects.filter(location_filter & month_filter, estado=Reserva.Estado.PENDIENTE).count()
-    }
+    # Para pendientes (y el total del mes) usamos location_filter,
+    # para aprobadas/rechazadas usamos approved_by_filter
+    counts, counts_mes = calc.get_reserva_counts(
+        location_filter | approved_by_filter,
+        filtros_estado={
+            'pendientes': location_filter,
+            'aprobadas': approved_by_filter,
+            'rechazadas': approved_by_filter,
+            'total': location_filter,
+        },
+    )
     
     percentages = calc.calculate_percentages(counts_mes)
     
@@ -254,44 +270,14 @@ def get_stats_moderador(request):
     return calc.create_base_response(cards, month_summary, proximas_reservas)
 
 def get_logs(user):
-    qs = LogEntry.objects.all()
-    ct_reserva = ContentType.objects.get_for_model(Reserva)
-
-    # Todos los logs de usuarios y moderadores, incluyendo a sí mismo
-    if user.is_admin:
-        filtro_usuario = Q(actor__groups__name__in=[ user.GRUPOS.MODERADOR, user.GRUPOS.USUARIO]) | Q(actor=user)
-        return qs.filter(filtro_usuario)
-    
-    # Todos los logs de reservas de mi ubicación y piso, o donde el actor es el usuario
-    if user.is_moderador:
-        filtro_usuario = Q(actor=user)
-
-        mis_reservas = Reserva.objects.filter(
-            Q(Q(espacio__ubicacion=user.ubicacion) & Q(espacio__piso=user.piso)) |
-            Q(usuario=user) |
-            Q(aprobado_por=user)
-        ).values_list('pk', flat=True)
+    """
+    Logs visibles para el usuario según su rol (ver apps.logs.visibility.filtro_visibilidad).
 
-        filtro_reserva_mi_ubicacion = Q(
-            Q(content_type=ct_reserva) &
-            Q(object_id__in=mis_reservas)
-        )
-        # Retornar todos los log donde actor es moderador o usuario
-        qs = qs.filter(filtro_usuario | filtro_reserva_mi_ubicacion)
-        return qs
-    
-    # Todos los logs de reservas de mi ubicación y piso, o donde el actor es el usuario
-    if user.is_usuario:
-        filtro_usuario = Q(actor=user)
-        mis_reservas = Reserva.objects.filter(
-            Q(usuario=user)
-        ).values_list('pk', flat=True)
-        
-        filtro_reserva_mi_ubicacion = Q(
-            Q(content_type=ct_reserva) &
-            Q(object_id__in=mis_reservas)
-        )
-        # Retornar todos los log donde actor es usuario
-        qs = qs.filter(filtro_usuario | filtro_reserva_mi_ubicacion)
-        return qs
+    Filtra sobre la tabla LogVisibilidad, que guarda las claves de cada log ya
+    desnormalizadas e indexadas. Retorna None si el usuario no tiene rol.
+    """
+    filtro = filtro_visibilidad(user)
+    if filtro is None:
+        return None
+    return LogEntry.objects.filter(filtro)
         
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Widgets de formulario compartidos
+
+* AutocompleteSelect: select de Select2 que busca las opciones en un endpoint remoto
+"""
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    Select que solo renderiza las opciones seleccionadas; el resto las busca
+    Select2 en `url` (nombre de una vista con AutocompleteMixin) a medida que se escribe.
+
+    La validación no cambia: ModelChoiceField sigue comprobando que el valor
+    enviado pertenezca a su queryset.
+    """
+
+    def __init__(self, url, attrs=None):
+        self.url = url
+        super().__init__(attrs)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = reverse(self.url)
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        seleccionados = [v for v in value if v not in (None, '')]
+        queryset = getattr(self.choices, 'queryset', None)
+        pks = self._pks(queryset, seleccionados) if queryset is not None else []
+        if not pks:
+            opciones = []
+        else:
+            opciones = [self.choices.choice(obj) for obj in queryset.filter(pk__in=pks)]
+
+        # Opción vacía para el placeholder de Select2
+        opciones.insert(0, ('', ''))
+        return [
+            (None, [self.create_option(name, valor, etiqueta, str(valor) in map(str, seleccionados), index, attrs=attrs)], index)
+            for index, (valor, etiqueta) in enumerate(opciones)
+        ]
+
+    @staticmethod
+    def _pks(queryset, valores):
+        """
+        Valores enviados convertidos al tipo de la pk; los inválidos se descartan
+        (el formulario ya los rechaza con su error de validación).
+        """
+        campo = queryset.model._meta.pk
+        pks = []
+        for valor in valores:
+            try:
+                pks.append(campo.to_python(valor))
+            except (ValueError, ValidationError):
+                continue
+        return pks
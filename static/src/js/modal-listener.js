@@ -38,14 +38,35 @@ function initializeSelect2() {
   $('#generic_modal_content .select2-container').remove();
   
   // Inicializar Select2 solo en elementos que no estén ya inicializados
-  $('#generic_modal_content .select2').not('.select2-hidden-accessible').select2({
-    placeholder: 'Buscar',
-    language: {
-      noResults: function(){
-        return "No se encontraron resultados";
+  $('#generic_modal_content .select2').not('.select2-hidden-accessible').each(function() {
+    const opciones = {
+      placeholder: 'Buscar',
+      language: {
+        noResults: function(){
+          return "No se encontraron resultados";
+        },
+        searching: function(){
+          return "Buscando...";
+        },
       },
-    },
-    dropdownParent: $('#generic_modal')
+      dropdownParent: $('#generic_modal')
+    };
+
+    // Si el select tiene endpoint de autocompletado, las opciones se piden al servidor
+    const url = $(this).data('autocomplete-url');
+    if (url) {
+      opciones.allowClear = true;
+      opciones.ajax = {
+        url: url,
+        dataType: 'json',
+        delay: 250,
+        data: function(params) {
+          return { q: params.term || '', page: params.page || 1 };
+        },
+      };
+    }
+
+    $(this).select2(opciones);
   });
 }
 